@@ -0,0 +1,121 @@
+"""
+Before/after benchmark for the JPEG blocking and edge-continuity checks.
+
+Compares the original per-block / per-vertex Python loops with the vectorized
+jpeg_block_variance and edge_discontinuity_counts on synthetic photos (or the
+image files given on the command line) and checks the scores agree.
+
+    cd ai-service
+    python benchmarks/bench_image_forensics.py
+    python benchmarks/bench_image_forensics.py claim_photo.jpg --repeat 3
+"""
+import os
+import sys
+import time
+import argparse
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from services.image_analysis_service import jpeg_block_variance, edge_discontinuity_counts  # noqa: E402
+
+SYNTHETIC_SIZES = {"1mp": (1000, 1000), "4mp": (1728, 2304), "12mp": (3000, 4000)}
+
+
+def loop_block_variance(gray: np.ndarray) -> float:
+    """Original _check_compression_artifacts block loop"""
+    block_variance = 0
+    h, w = gray.shape
+    for i in range(0, h-8, 8):
+        for j in range(0, w-8, 8):
+            block = gray[i:i+8, j:j+8]
+            block_variance += np.var(block)
+    return block_variance / ((h//8) * (w//8))
+
+
+def loop_edge_discontinuities(contours):
+    """Original _check_edge_discontinuities vertex loop"""
+    discontinuity_count = 0
+    total_edges = 0
+    for contour in contours:
+        if len(contour) > 10:
+            total_edges += 1
+            points = contour.reshape(-1, 2)
+            for i in range(2, len(points) - 2):
+                v1 = points[i] - points[i-1]
+                v2 = points[i+1] - points[i]
+                angle = np.arccos(np.clip(np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2) + 1e-8), -1, 1))
+                if angle > np.pi / 3:
+                    discontinuity_count += 1
+                    break
+    return discontinuity_count, total_edges
+
+
+def synthetic_photo(height: int, width: int, seed: int = 0) -> np.ndarray:
+    """Smooth gradients, shapes and sensor noise, round-tripped through JPEG"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    image = np.stack([x / width * 200, y / height * 200, (x + y) / (width + height) * 255], axis=-1)
+    for _ in range(300):
+        center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+        color = tuple(int(c) for c in rng.integers(0, 255, 3))
+        if rng.random() < 0.3:
+            cv2.rectangle(image, center, (center[0] + int(rng.integers(20, width // 6)), center[1] + int(rng.integers(20, height // 6))), color, -1)
+        else:
+            # Smooth curved outlines: long contours without sharp turns (the loop's worst case)
+            axes = (int(rng.integers(10, width // 6)), int(rng.integers(10, height // 6)))
+            cv2.ellipse(image, center, axes, float(rng.random() * 180), 0, 360, color, int(rng.integers(2, 6)))
+    image = cv2.GaussianBlur(image, (5, 5), 0) + rng.normal(0, 2, image.shape).astype(np.float32)
+    _, encoded = cv2.imencode(".jpg", np.clip(image, 0, 255).astype(np.uint8), [cv2.IMWRITE_JPEG_QUALITY, 85])
+    return cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+
+
+def best_time(func, *args, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def bench(name: str, image: np.ndarray, repeat: int):
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    contours, _ = cv2.findContours(cv2.Canny(gray, 50, 150), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    loop_blocks, before = best_time(loop_block_variance, gray, repeat=repeat)
+    fast_blocks, after = best_time(jpeg_block_variance, gray, repeat=repeat)
+    assert np.isclose(before, after, rtol=1e-9), (before, after)
+
+    loop_edges, before_edges = best_time(loop_edge_discontinuities, contours, repeat=repeat)
+    fast_edges, after_edges = best_time(edge_discontinuity_counts, contours, repeat=repeat)
+    assert tuple(before_edges) == tuple(after_edges), (before_edges, after_edges)
+
+    h, w = gray.shape
+    print(f"{name:<24} {w}x{h:<6} {'blocks':<7} {loop_blocks * 1000:>10.1f} {fast_blocks * 1000:>10.1f} {loop_blocks / fast_blocks:>8.1f}x")
+    print(f"{'':<24} {'':<11} {'edges':<7} {loop_edges * 1000:>10.1f} {fast_edges * 1000:>10.1f} {loop_edges / max(fast_edges, 1e-9):>8.1f}x"
+          f"  ({after_edges[0]}/{after_edges[1]} contours)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", nargs="*", help="Image files (default: synthetic 1/4/12 megapixel photos)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per check (best time is reported)")
+    args = parser.parse_args()
+
+    print(f"{'image':<24} {'size':<11} {'check':<7} {'loop ms':>10} {'numpy ms':>10} {'speedup':>9}")
+    if args.images:
+        for path in args.images:
+            image = cv2.imread(path, cv2.IMREAD_COLOR)
+            if image is None:
+                print(f"{path}: not a readable image")
+                continue
+            bench(os.path.basename(path), image, args.repeat)
+    else:
+        for name, (height, width) in SYNTHETIC_SIZES.items():
+            bench(f"synthetic-{name}", synthetic_photo(height, width), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Before/after benchmark for the keyword and regex scans of fraud detection and validation.
+
+For the PatternSet of FraudDetectionService and of DocumentValidator, compares
+evaluating every keyword (`kw in text_lower`) and every regex (re.findall) one by
+one, as the services used to, with PatternSet.scan (one keyword pass, then only
+the regexes whose literals occur). Checks both give the same hits, then times the
+whole fraud and validation pipelines, and both together with and without a shared
+TextAnalysisContext. Runs on synthetic 100-page OCR output, or on the text files
+given on the command line.
+
+    cd ai-service
+    python benchmarks/bench_text_patterns.py
+    python benchmarks/bench_text_patterns.py ocr_output.txt --repeat 5
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from services.fraud_detection_service import FraudDetectionService  # noqa: E402
+from services.document_validator import DocumentValidator  # noqa: E402
+from utils.text_patterns import ahocorasick  # noqa: E402
+from utils.text_context import TextAnalysisContext  # noqa: E402
+
+WORDS = (
+    "the patient service bill medical treatment vehicle repair estimate damage parts labor invoice payment "
+    "total due receipt paid transaction report incident officer accident provider hospital charge amount "
+    "procedure replace vendor company minor severe new used working claim policy insured coverage"
+).split()
+
+
+def synthetic_ocr(pages: int = 100, lines_per_page: int = 40, seed: int = 0) -> str:
+    """Tesseract-like pages: prose lines with amounts and dates, joined by the OCR page break"""
+    rng = random.Random(seed)
+    page_texts = []
+    for _ in range(pages):
+        lines = []
+        for _ in range(lines_per_page):
+            words = " ".join(rng.choice(WORDS) + rng.choice(["", "", ",", "."]) for _ in range(10))
+            amount = f"${rng.randint(1, 9999)}.{rng.randint(10, 99)}"
+            date = f"{rng.randint(1, 12)}/{rng.randint(1, 28)}/20{rng.randint(10, 24)}"
+            lines.append(f"{words} {amount} {date}")
+        page_texts.append("\n".join(lines))
+    return "\n\n--- PAGE BREAK ---\n\n".join(page_texts)
+
+
+def naive_scan(pattern_set, text: str):
+    """Every keyword and every regex separately (the services' previous behaviour)"""
+    text_lower = text.lower()
+    keywords = {word for words in pattern_set.keyword_lists.values() for word in words if word in text_lower}
+    return keywords, {name: regex.findall(text) for name, regex in pattern_set.compiled.items()}
+
+
+def set_scan(pattern_set, text: str):
+    scan = pattern_set.scan(text)
+    keywords = {word for words in pattern_set.keyword_lists.values() for word in words if word in scan.present}
+    return keywords, {name: scan.findall(name) for name in pattern_set.compiled}
+
+
+def best_time(func, *args, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def bench(name: str, text: str, repeat: int):
+    fraud = FraudDetectionService()
+    validator = DocumentValidator()
+    print(f"{name}: {len(text)} characters")
+
+    for label, pattern_set in (("fraud patterns", fraud.text_patterns), ("validator patterns", validator.text_patterns)):
+        before, expected = best_time(naive_scan, pattern_set, text, repeat=repeat)
+        after, result = best_time(set_scan, pattern_set, text, repeat=repeat)
+        assert result == expected, label
+        print(f"  {label:<28} {before * 1000:>9.1f} {after * 1000:>9.1f} {before / after:>8.1f}x"
+              f"  ({len(pattern_set.vocabulary)} literals, {len(pattern_set.compiled)} regexes)")
+
+    fraud_time, _ = best_time(fraud._analyze_text_sync, text, "vehicle", 1000.0, repeat=repeat)
+    print(f"  {'fraud pipeline':<28} {'':>9} {fraud_time * 1000:>9.1f}")
+    for document_type in ("medical_bill", "vehicle_estimate", "invoice", "police_report"):
+        validate = lambda: asyncio.run(validator._validate_document(name, document_type, TextAnalysisContext(text)))  # noqa: E731
+        validation_time, _ = best_time(validate, repeat=repeat)
+        print(f"  {'validation ' + document_type:<28} {'':>9} {validation_time * 1000:>9.1f}")
+
+    # Both services on the same text: a context each, then one shared TextAnalysisContext
+    def both(shared: bool):
+        ctx = TextAnalysisContext(text)
+        asyncio.run(validator._validate_document(name, "medical_bill", ctx))
+        fraud._analyze_text_sync(text, "health", 1000.0, ctx if shared else None)
+
+    separate_time, _ = best_time(both, False, repeat=repeat)
+    shared_time, _ = best_time(both, True, repeat=repeat)
+    print(f"  {'validation + fraud':<28} {separate_time * 1000:>9.1f} {shared_time * 1000:>9.1f}"
+          f" {separate_time / shared_time:>8.1f}x  (separate vs shared text context)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("texts", nargs="*", help="OCR text files (default: synthetic 100-page output)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best time is reported)")
+    args = parser.parse_args()
+
+    print(f"keyword matcher: {'pyahocorasick' if ahocorasick else 'substring search (pyahocorasick not installed)'}")
+    print(f"{'':<30} {'naive ms':>9} {'scan ms':>9} {'speedup':>9}")
+    if args.texts:
+        for path in args.texts:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                bench(os.path.basename(path), f.read(), args.repeat)
+    else:
+        bench("synthetic-100-pages", synthetic_ocr(), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
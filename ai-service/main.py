@@ -14,12 +14,20 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 
 # Import our services
-from services.ocr_service import OCRService
+from services.ocr_service import OCRService, init_ocr_worker
 from services.fraud_detection_service import FraudDetectionService
 from services.image_analysis_service import ImageAnalysisService
 from services.document_validator import DocumentValidator
+from services.field_extraction import FieldExtractor
+from services.job_manager import JobManager, JobQueueFullError, JOB_COMPLETED, JOB_FAILED
 from utils.logger import setup_logger, log_api_request, log_performance, log_error_with_context
-from utils.auth import verify_api_key, check_rate_limit
+from utils.auth import verify_api_key, check_rate_limit, validate_permissions, get_client_priority
+from utils.admission import AdmissionController, AdmissionRejected
+from utils.worker_pool import init_worker_pools, get_worker_pools, shutdown_worker_pools
+from utils.result_cache import init_result_cache, get_result_cache, content_digest
+from utils.hash_index import PerceptualHashIndex
+from utils.uploads import UploadBuffer, UploadTooLargeError, UploadLimitMiddleware, upload_limits
+from utils.text_context import TextAnalysisContext
 from models.analysis_models import *
 
 # Setup logger first - call the function, don't assign it
@@ -35,8 +43,101 @@ AI_SERVICE_CONFIG = {
     "max_file_size_mb": 50,
     "processing_timeout_seconds": 300,
     "use_gpu": False,  # CPU ONLY - NO GPU
-    "batch_size": 4,   # Smaller batch for CPU
+    "batch_size": 4,   # Smaller batch for CPU (also the per-request fan-out for /process-documents)
+    "max_batch_files": 20,
+    "max_batch_claims": 1000,  # Claims per /analyze-claims request (scored together in one vectorized pass)
     "log_level": "INFO",
+    # Execution layer for blocking work
+    "thread_pool_workers": min(8, (os.cpu_count() or 1) + 2),  # OpenCV / NumPy (GIL-releasing)
+    "process_pool_workers": max(1, (os.cpu_count() or 1) // 2),  # Tesseract / EasyOCR
+    "ocr_worker_threads": 1,  # Torch threads per OCR worker process
+    # PDF page streaming: pages rasterized per chunk and rendered pages held in memory at once
+    "pdf_render_chunk_pages": 2,
+    "pdf_max_inflight_pages": max(1, (os.cpu_count() or 1) // 2) + 2,
+    # Cross-request micro-batching of EasyOCR: images wait up to max_wait_ms (or until
+    # max_batch_size) and are recognized together in one OCR process call
+    "easyocr_batching": {
+        "enabled": True,
+        "max_batch_size": 8,
+        "max_wait_ms": 5,
+        "max_concurrent_batches": max(1, (os.cpu_count() or 1) // 2),  # Match process_pool_workers
+        "recognizer_batch_size": 16,  # Text-line crops per CRNN forward pass
+    },
+    # OCR engine strategy per document type: "cascade" (EasyOCR, then Tesseract if unsure),
+    # "race" (both at once, first confident result wins) or "cheapest_first" (Tesseract, then EasyOCR)
+    "ocr_strategy": {
+        "default": "cascade",
+        "by_document_type": {
+            "receipt": "cheapest_first",  # Short printed text, Tesseract is usually enough
+            "invoice": "cheapest_first",
+            "police_report": "race",  # Often poor scans that need both engines
+        },
+        "confidence_threshold": 0.5,
+    },
+    # Read born-digital PDF pages from their embedded text layer; OCR only pages without one
+    "pdf_text_layer": True,
+    "pdf_text_layer_min_chars": 20,
+    # Asynchronous jobs (/jobs)
+    "job_workers": 2,
+    "job_queue_size": 100,
+    "job_result_ttl_seconds": 3600,
+    # Longest a job may run, per job type (retraining on max_retrain_claims measured ~15s on one core;
+    # the rest is headroom for long claim descriptions)
+    "job_timeout_seconds": {
+        "document": 300,
+        "image": 300,
+        "fraud_model": 1800,
+    },
+    "job_state_dir": "temp/jobs",
+    # Content-addressed result cache: per-worker memory LRU + shared disk store
+    "result_cache": {
+        "enabled": True,
+        "memory_max_mb": 64,
+        "disk_max_mb": 1024,
+        "disk_dir": "temp/cache",
+    },
+    # Near-duplicate image detection across claims (perceptual hash index shared by all workers)
+    "duplicate_index": {
+        "enabled": True,
+        "dir": "temp/phash_index",
+        "max_distance": 8,        # pHash Hamming radius (of 64 bits)
+        "max_matches": 10,
+        "rebuild_threshold": 4096,  # Unindexed records scanned linearly before tables are rebuilt
+    },
+    # Trained fraud models: versioned artifacts written by `python -m services.fraud_models`,
+    # memory-mapped at startup (heuristic scoring only while the store is empty)
+    "fraud_models": {
+        "dir": os.getenv("FRAUD_MODEL_PATH", "models/fraud"),
+        "reload_check_seconds": 5.0,  # How often workers look for a version another worker swapped in
+        # POST /fraud-model/retrain: holdout share, and how far holdout AUC may drop before a
+        # retrained version is rejected
+        "retrain_holdout_fraction": 0.2,
+        "retrain_max_auc_drop": 0.01,
+        "max_retrain_claims": 50000,
+    },
+    # Independent image analyzers (forensic checks, object/scene/damage) run concurrently on
+    # the thread pool; at most this many of one image's analyzers at a time
+    "image_analysis_parallelism": 4,
+    # Images are decoded straight to this long side (JPEG DCT scaling, then resampling) and
+    # analyzed there; uploads whose decode would exceed max_decode_pixels are refused
+    "image_ingest": {
+        "analysis_max_side": 2048,
+        "max_decode_pixels": 64_000_000,
+    },
+    # Admission control per route class (per worker): requests beyond max_concurrent wait
+    # up to queue_timeout_seconds in a priority queue of max_queue, then get 503 + Retry-After
+    "admission": {
+        "process_document": {"max_concurrent": max(1, (os.cpu_count() or 1) // 2), "max_queue": 4, "queue_timeout_seconds": 30},
+        "analyze_image": {"max_concurrent": 4, "max_queue": 8, "queue_timeout_seconds": 15},
+        "analyze_claim": {"max_concurrent": 4, "max_queue": 8, "queue_timeout_seconds": 15},
+        # Batch re-scoring (up to max_batch_claims per request), kept apart from interactive claims
+        "analyze_claims": {"max_concurrent": 1, "max_queue": 4, "queue_timeout_seconds": 60},
+        "gemini_analyze": {"max_concurrent": 2, "max_queue": 4, "queue_timeout_seconds": 10},
+    },
+    # Serving: "development" (single process + reload) or "prefork" (models loaded once, N forked workers)
+    "serving_mode": os.getenv("AI_SERVICE_MODE", "development"),
+    "workers": int(os.getenv("AI_SERVICE_WORKERS", os.cpu_count() or 1)),
+    "worker_threads": int(os.getenv("AI_SERVICE_WORKER_THREADS", "2")),  # Native threads per worker
 }
 
 # Force CPU usage - no GPU shit
@@ -49,9 +150,121 @@ ocr_service = None
 fraud_service = None
 image_service = None
 document_validator = None
+field_extractor = None
+job_manager = None
+gemini_check = None
 
 # Security
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+admission_controller = AdmissionController(AI_SERVICE_CONFIG["admission"])
+
+async def initialize_services():
+    """Load every model and service (once per process, or once in the pre-fork master)"""
+    global ocr_service, fraud_service, image_service, document_validator, field_extractor
+    
+    # Initialize OCR Service (CPU only)
+    logger.info("📖 Initializing OCR Service...")
+    ocr_service = OCRService(
+        pdf_render_chunk_pages=AI_SERVICE_CONFIG["pdf_render_chunk_pages"],
+        pdf_max_inflight_pages=AI_SERVICE_CONFIG["pdf_max_inflight_pages"],
+        pdf_text_layer=AI_SERVICE_CONFIG["pdf_text_layer"],
+        pdf_text_layer_min_chars=AI_SERVICE_CONFIG["pdf_text_layer_min_chars"],
+        easyocr_batching=AI_SERVICE_CONFIG["easyocr_batching"],
+        ocr_strategy=AI_SERVICE_CONFIG["ocr_strategy"]
+    )
+    await ocr_service.initialize()
+    
+    # Initialize Fraud Detection Service (CPU only)
+    logger.info("🛡️ Initializing Fraud Detection Service...")
+    fraud_config = AI_SERVICE_CONFIG["fraud_models"]
+    fraud_service = FraudDetectionService(
+        model_dir=fraud_config["dir"],
+        reload_check_seconds=fraud_config["reload_check_seconds"],
+        retrain_holdout_fraction=fraud_config["retrain_holdout_fraction"],
+        retrain_max_auc_drop=fraud_config["retrain_max_auc_drop"]
+    )
+    await fraud_service.initialize()
+    
+    # Initialize Image Analysis Service (CPU only)
+    logger.info("🖼️ Initializing Image Analysis Service...")
+    duplicate_config = AI_SERVICE_CONFIG["duplicate_index"]
+    duplicate_index = None
+    if duplicate_config["enabled"]:
+        duplicate_index = PerceptualHashIndex(
+            duplicate_config["dir"],
+            max_distance=duplicate_config["max_distance"],
+            rebuild_threshold=duplicate_config["rebuild_threshold"]
+        )
+        logger.info(f"🗂️ Near-duplicate index: {len(duplicate_index)} images")
+    image_service = ImageAnalysisService(
+        duplicate_index,
+        max_duplicate_matches=duplicate_config["max_matches"],
+        max_parallel_analyzers=AI_SERVICE_CONFIG["image_analysis_parallelism"],
+        analysis_max_side=AI_SERVICE_CONFIG["image_ingest"]["analysis_max_side"],
+        max_decode_pixels=AI_SERVICE_CONFIG["image_ingest"]["max_decode_pixels"]
+    )
+    await image_service.initialize()
+    
+    # Initialize Document Validator
+    logger.info("📋 Initializing Document Validator...")
+    field_extractor = FieldExtractor()
+    document_validator = DocumentValidator(field_extractor)
+
+def test_gemini_connection():
+    """Test the optional Google Gemini connection (a blocking network call, run on the thread pool)"""
+    try:
+        from services.gemini_service import GeminiService
+        gemini_service = GeminiService()
+        test_result = asyncio.run(gemini_service.test_connection())
+        if test_result:
+            logger.info("✅ Google Gemini connected successfully!")
+        else:
+            logger.warning("⚠️ Google Gemini connection failed (optional)")
+    except Exception as e:
+        logger.warning(f"⚠️ Google Gemini not available (optional): {e}")
+
+async def start_job_manager():
+    """Create the job manager and register handlers for each job type"""
+    global job_manager
+    
+    job_manager = JobManager(
+        workers=AI_SERVICE_CONFIG["job_workers"],
+        max_queue_size=AI_SERVICE_CONFIG["job_queue_size"],
+        result_ttl_seconds=AI_SERVICE_CONFIG["job_result_ttl_seconds"],
+        job_timeout_seconds=AI_SERVICE_CONFIG["processing_timeout_seconds"],
+        state_dir=AI_SERVICE_CONFIG["job_state_dir"]
+    )
+    
+    async def run_document_job(job):
+        payload = job.payload
+        with payload["content"] as upload:
+            return await run_document_pipeline(
+                upload.view, payload["filename"], payload["document_type"],
+                progress_callback=lambda done, total: job.update_progress(done, total, "ocr")
+            )
+    
+    async def run_image_job(job):
+        payload = job.payload
+        job.update_progress(0, 1, "image_analysis")
+        with payload["content"] as upload:
+            result = await image_service.analyze_image(
+                upload.view, payload["filename"], payload["analysis_type"], depth=payload["depth"]
+            )
+        job.update_progress(1, 1, "image_analysis")
+        return result
+    
+    async def run_fraud_model_job(job):
+        job.update_progress(0, 1, "retraining")
+        result = await fraud_service.update_model(job.payload["claims"], deadline=job.deadline)
+        job.update_progress(1, 1, "retraining")
+        return result
+    
+    timeouts = AI_SERVICE_CONFIG["job_timeout_seconds"]
+    job_manager.register_handler(JobType.DOCUMENT.value, run_document_job, timeouts[JobType.DOCUMENT.value])
+    job_manager.register_handler(JobType.IMAGE.value, run_image_job, timeouts[JobType.IMAGE.value])
+    job_manager.register_handler(JobType.FRAUD_MODEL.value, run_fraud_model_job, timeouts[JobType.FRAUD_MODEL.value])
+    await job_manager.start()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -59,39 +272,32 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("🚀 Starting ChainSureAI AI Service (CPU Mode)...")
     
-    global ocr_service, fraud_service, image_service, document_validator
-    
     try:
-        # Initialize OCR Service (CPU only)
-        logger.info("📖 Initializing OCR Service...")
-        ocr_service = OCRService()
-        await ocr_service.initialize()
-        
-        # Initialize Fraud Detection Service (CPU only)
-        logger.info("🛡️ Initializing Fraud Detection Service...")
-        fraud_service = FraudDetectionService()
-        await fraud_service.initialize()
-        
-        # Initialize Image Analysis Service (CPU only)
-        logger.info("🖼️ Initializing Image Analysis Service...")
-        image_service = ImageAnalysisService()
-        await image_service.initialize()
-        
-        # Initialize Document Validator
-        logger.info("📋 Initializing Document Validator...")
-        document_validator = DocumentValidator()
-        
-        # Test Google Gemini connection (optional)
-        try:
-            from services.gemini_service import GeminiService
-            gemini_service = GeminiService()
-            test_result = await gemini_service.test_connection()
-            if test_result:
-                logger.info("✅ Google Gemini connected successfully!")
-            else:
-                logger.warning("⚠️ Google Gemini connection failed (optional)")
-        except Exception as e:
-            logger.warning(f"⚠️ Google Gemini not available (optional): {e}")
+        # Configure worker pools for CPU-bound work (per worker process)
+        init_worker_pools(
+            AI_SERVICE_CONFIG,
+            process_initializer=init_ocr_worker,
+            process_initargs=(AI_SERVICE_CONFIG["ocr_worker_threads"],),
+            process_preload=("services.ocr_service",)
+        )
+        # Fork the OCR processes while this process is still single-threaded
+        get_worker_pools().start_process_pool()
+        init_result_cache(AI_SERVICE_CONFIG["result_cache"])
+        
+        if ocr_service is None:
+            await initialize_services()
+        else:
+            # Pre-fork mode: models were loaded by the master and are shared copy-on-write
+            logger.info(f"♻️ Worker {os.getpid()} using models preloaded by the master process")
+        
+        # Start the job queue (per worker process)
+        await start_job_manager()
+        
+        # Not part of the pre-fork preload: it would delay the master and start client threads
+        # before forking. Run once per server (worker 0), without holding up startup.
+        global gemini_check
+        if os.environ.get("AI_SERVICE_WORKER_INDEX", "0") == "0":
+            gemini_check = asyncio.create_task(get_worker_pools().run_in_thread(test_gemini_connection))
         
         logger.info("✅ AI Service initialized successfully (CPU Mode)!")
         
@@ -103,6 +309,9 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("🛑 Shutting down AI Service...")
+    if job_manager:
+        await job_manager.stop()
+    shutdown_worker_pools()
 
 # Create FastAPI app with lifespan
 app = FastAPI(
@@ -115,6 +324,17 @@ app = FastAPI(
 )
 
 # CORS middleware for frontend integration
+# Reject oversize bodies while they stream in, before the multipart parser spools them
+UPLOAD_LIMITS = upload_limits(AI_SERVICE_CONFIG)
+app.add_middleware(
+    UploadLimitMiddleware,
+    max_body_bytes=UPLOAD_LIMITS["max_body_bytes"],
+    path_limits={
+        "/process-documents": UPLOAD_LIMITS["max_batch_body_bytes"],
+        "/batch-process": UPLOAD_LIMITS["max_batch_body_bytes"],
+    }
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3001", "http://localhost:3000"],  # Frontend and backend
@@ -139,6 +359,39 @@ async def get_client_info(credentials: HTTPAuthorizationCredentials = Depends(se
         # For development, allow basic access
         return {"client_name": "development", "api_key": "dev_key"}
 
+async def get_request_priority(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> int:
+    """Admission priority from the client's rate limit tier"""
+    return get_client_priority(credentials.credentials if credentials else None)
+
+@asynccontextmanager
+async def admitted(route_class: str, priority: int, weight: int = 1):
+    """Hold `weight` slots in the route class's admission gate, or fail with 503 + Retry-After"""
+    gate = admission_controller.gate(route_class)
+    try:
+        await gate.acquire(priority, weight)
+    except AdmissionRejected as e:
+        logger.warning(f"🚦 Rejected {route_class} request (priority {priority}, weight {weight}): {e.reason}")
+        raise HTTPException(
+            status_code=503,
+            detail=f"Service overloaded, retry in {e.retry_after}s",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    start_time = time.time()
+    try:
+        yield
+    finally:
+        gate.release(time.time() - start_time, weight)
+
+def admission_slot(route_class: str):
+    """Dependency that holds a slot in the route class's admission gate for the request"""
+    async def dependency(priority: int = Depends(get_request_priority)):
+        async with admitted(route_class, priority):
+            yield
+    
+    return dependency
+
 # Health check endpoints
 @app.get("/", tags=["Health"])
 async def root():
@@ -154,8 +407,11 @@ async def root():
             "health": "/health",
             "docs": "/docs",
             "analyze_claim": "/analyze-claim",
+            "analyze_claims": "/analyze-claims",
             "process_document": "/process-document",
+            "process_documents": "/process-documents",
             "analyze_image": "/analyze-image",
+            "jobs": "/jobs",
             "gemini_analyze": "/gemini-analyze"
         }
     }
@@ -177,6 +433,7 @@ async def health_check():
             "tesseract": ocr_service.tesseract_ready if ocr_service else False,
             "easyocr": ocr_service.easyocr_ready if ocr_service else False,
             "fraud_model": fraud_service.model_ready if fraud_service else False,
+            "fraud_model_version": fraud_service.model_version if fraud_service else None,
             "image_model": image_service.model_ready if image_service else False,
         },
         "system": {
@@ -184,8 +441,17 @@ async def health_check():
             "cpu_mode": True,
             "port": AI_SERVICE_CONFIG["port"],
             "max_file_size_mb": AI_SERVICE_CONFIG["max_file_size_mb"],
-            "processing_timeout": AI_SERVICE_CONFIG["processing_timeout_seconds"]
-        }
+            "processing_timeout": AI_SERVICE_CONFIG["processing_timeout_seconds"],
+            "serving_mode": AI_SERVICE_CONFIG["serving_mode"],
+            "worker_pid": os.getpid()
+        },
+        "worker_pools": get_worker_pools().get_stats(),
+        "jobs": job_manager.get_stats() if job_manager else None,
+        "admission": admission_controller.get_stats(),
+        "result_cache": get_result_cache().get_stats(),
+        "fraud_model": fraud_service.get_model_info() if fraud_service else None,
+        "ocr_batching": ocr_service.get_batching_stats() if ocr_service else None,
+        "duplicate_index": image_service.duplicate_index.get_stats() if image_service and image_service.duplicate_index else None
     }
     
     # Check if any critical service is down
@@ -195,11 +461,39 @@ async def health_check():
     
     return health_status
 
+def build_claim_response(
+    request: ClaimAnalysisRequest,
+    fraud_analysis: Dict[str, Any],
+    processing_time: float
+) -> ClaimAnalysisResponse:
+    """Claim analysis response from a fraud report (shared by the single and batch endpoints)"""
+    return ClaimAnalysisResponse(
+        claimId=request.claimId,
+        claimType=request.claimType,
+        fraudScore=fraud_analysis["fraud_score"],
+        authenticityScore=fraud_analysis.get("confidence", 0.8),
+        estimatedAmount=request.requestedAmount,
+        confidence=fraud_analysis.get("confidence", 0.8),
+        detectedIssues=fraud_analysis.get("issues", []),
+        fraudAnalysis=FraudAnalysisResult(
+            fraudScore=fraud_analysis["fraud_score"],
+            riskFactors=fraud_analysis.get("risk_factors", []),
+            consistencyCheck={},
+            anomalies=fraud_analysis.get("issues", []),
+            modelVersion=fraud_analysis.get("model_version")
+        ),
+        recommendation=fraud_analysis.get("recommendation", "manual_review"),
+        reasoning=f"CPU-based AI analysis completed with {fraud_analysis.get('confidence', 0.8):.1%} confidence",
+        processedAt=time.strftime("%Y-%m-%d %H:%M:%S"),
+        processingTime=processing_time
+    )
+
 # Main AI endpoints
 @app.post("/analyze-claim", response_model=ClaimAnalysisResponse, tags=["AI Analysis"])
 async def analyze_claim(
     request: ClaimAnalysisRequest,
-    background_tasks: BackgroundTasks = BackgroundTasks()
+    background_tasks: BackgroundTasks = BackgroundTasks(),
+    _admission: None = Depends(admission_slot("analyze_claim"))
 ):
     """Comprehensive claim analysis with AI"""
     start_time = time.time()
@@ -219,91 +513,235 @@ async def analyze_claim(
         )
         
         # Prepare response
-        response = ClaimAnalysisResponse(
-            claimId=request.claimId,
-            claimType=request.claimType,
-            fraudScore=fraud_analysis["fraud_score"],
-            authenticityScore=fraud_analysis.get("confidence", 0.8),
-            estimatedAmount=request.requestedAmount,
-            confidence=fraud_analysis.get("confidence", 0.8),
-            detectedIssues=fraud_analysis.get("issues", []),
-            fraudAnalysis=FraudAnalysisResult(
-                fraudScore=fraud_analysis["fraud_score"],
-                riskFactors=fraud_analysis.get("risk_factors", []),
-                consistencyCheck={},
-                anomalies=fraud_analysis.get("issues", [])
-            ),
-            recommendation=fraud_analysis.get("recommendation", "manual_review"),
-            reasoning=f"CPU-based AI analysis completed with {fraud_analysis.get('confidence', 0.8):.1%} confidence",
-            processedAt=time.strftime("%Y-%m-%d %H:%M:%S"),
-            processingTime=time.time() - start_time
-        )
+        response = build_claim_response(request, fraud_analysis, time.time() - start_time)
         
         logger.info(f"✅ Claim analysis completed in {time.time() - start_time:.2f}s")
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Error analyzing claim: {e}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+@app.post("/analyze-claims", response_model=BatchClaimAnalysisResponse, tags=["AI Analysis"])
+async def analyze_claims(
+    request: BatchClaimAnalysisRequest,
+    client_info: dict = Depends(get_client_info),
+    _admission: None = Depends(admission_slot("analyze_claims"))
+):
+    """Fraud analysis of many claims in one request, scored together (e.g. nightly re-scoring)"""
+    start_time = time.time()
+    
+    if not await validate_permissions(client_info, "batch_process"):
+        raise HTTPException(status_code=403, detail="Client is not allowed to batch process")
+    
+    if len(request.claims) > AI_SERVICE_CONFIG["max_batch_claims"]:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many claims: {len(request.claims)} (maximum: {AI_SERVICE_CONFIG['max_batch_claims']})"
+        )
+    
+    if not fraud_service or not fraud_service.is_ready():
+        raise HTTPException(status_code=503, detail="Fraud detection service not available")
+    
+    try:
+        logger.info(f"🔍 Analyzing batch of {len(request.claims)} claims")
+        
+        fraud_analyses = await fraud_service.analyze_texts([
+            {"text": claim.description, "claim_type": claim.claimType.value, "requested_amount": claim.requestedAmount}
+            for claim in request.claims
+        ])
+        
+        # Claims are scored together, so each gets an equal share of the batch time
+        total_time = time.time() - start_time
+        per_claim_time = total_time / len(request.claims)
+        results = [
+            build_claim_response(claim, fraud_analysis, per_claim_time)
+            for claim, fraud_analysis in zip(request.claims, fraud_analyses)
+        ]
+        
+        log_performance("batch_analyze_claims", total_time, {"claims": len(results)})
+        logger.info(f"✅ Batch of {len(results)} claims analyzed in {total_time:.2f}s")
+        
+        return BatchClaimAnalysisResponse(
+            totalClaims=len(results),
+            results=results,
+            totalProcessingTime=total_time
+        )
+        
+    except Exception as e:
+        logger.error(f"❌ Error analyzing claims: {e}")
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+async def run_document_pipeline(
+    content: Any,
+    filename: str,
+    document_type: str,
+    progress_callback=None
+) -> DocumentProcessingResponse:
+    """OCR + validation for one document (shared by single, batch and job endpoints).
+    
+    content is bytes, a memoryview or an UploadBuffer view; it is never copied.
+    """
+    start_time = time.time()
+    
+    # Hash once for both cache lookups
+    content_hash = await get_worker_pools().run_in_thread(content_digest, content)
+    
+    # Process document
+    ocr_result = await ocr_service.process_document(
+        content, filename, document_type, progress_callback, content_hash=content_hash
+    )
+    
+    # Tokens and statistics of the OCR text, computed once for every check that reads them
+    text_context = TextAnalysisContext(ocr_result["text"])
+    
+    # Structured fields, extracted once for the response and for validation
+    extracted_fields = await get_worker_pools().run_in_thread(field_extractor.extract, text_context, document_type)
+    
+    # Validate document
+    validation_result = await document_validator.validate_document(
+        content, filename, document_type, ocr_result["text"], content_hash=content_hash,
+        text_context=text_context, extracted_fields=extracted_fields
+    )
+    
+    return DocumentProcessingResponse(
+        filename=filename,
+        documentType=DocumentType(document_type),
+        status=AnalysisStatus.SUCCESS,
+        text=ocr_result["text"],
+        confidence=ocr_result["confidence"],
+        validation=DocumentValidation(
+            isValid=validation_result["is_valid"],
+            validationScore=validation_result["validation_score"],
+            issues=validation_result["issues"],
+            extractedData=validation_result["extracted_data"]
+        ),
+        extractedFields=extracted_fields,
+        metadata=ocr_result.get("metadata", {}),
+        processingTime=time.time() - start_time
+    )
+
 @app.post("/process-document", response_model=DocumentProcessingResponse, tags=["Document Processing"])
 async def process_document(
     file: UploadFile = File(...),
     document_type: str = Form("general"),
-    background_tasks: BackgroundTasks = BackgroundTasks()
+    background_tasks: BackgroundTasks = BackgroundTasks(),
+    _admission: None = Depends(admission_slot("process_document"))
 ):
     """Process document with OCR and validation"""
     start_time = time.time()
     
     try:
-        # File size check
-        content = await file.read()
-        if len(content) > AI_SERVICE_CONFIG["max_file_size_mb"] * 1024 * 1024:
-            raise HTTPException(status_code=413, detail="File too large")
+        # File size check (reads the spooled size, not the body)
+        upload = UploadBuffer.from_upload(file, UPLOAD_LIMITS["max_file_bytes"])
         
-        logger.info(f"📄 Processing document {file.filename}")
+        logger.info(f"📄 Processing document {file.filename} ({upload.size} bytes)")
         
         if not ocr_service or not ocr_service.is_ready():
             raise HTTPException(status_code=503, detail="OCR service not available")
         
-        # Process document
-        ocr_result = await ocr_service.process_document(content, file.filename, document_type)
-        
-        # Validate document
-        validation_result = await document_validator.validate_document(
-            content, file.filename, document_type, ocr_result["text"]
-        )
-        
-        # Prepare response
-        response = DocumentProcessingResponse(
-            filename=file.filename,
-            documentType=DocumentType(document_type),
-            status=AnalysisStatus.SUCCESS,
-            text=ocr_result["text"],
-            confidence=ocr_result["confidence"],
-            validation=DocumentValidation(
-                isValid=validation_result["is_valid"],
-                validationScore=validation_result["validation_score"],
-                issues=validation_result["issues"],
-                extractedData=validation_result["extracted_data"]
-            ),
-            extractedFields=ocr_result.get("structured_data", {}),
-            metadata=ocr_result.get("metadata", {}),
-            processingTime=time.time() - start_time
-        )
+        with upload:
+            response = await run_document_pipeline(upload.view, file.filename, document_type)
         
         logger.info(f"✅ Document processed in {time.time() - start_time:.2f}s")
         return response
         
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Error processing document: {e}")
         raise HTTPException(status_code=500, detail=f"Document processing failed: {str(e)}")
 
+@app.post("/process-documents", response_model=BatchProcessingResponse, tags=["Document Processing"])
+@app.post("/batch-process", response_model=BatchProcessingResponse, tags=["Document Processing"], include_in_schema=False)
+async def process_documents(
+    files: List[UploadFile] = File(...),
+    document_type: str = Form("general"),
+    document_types: List[str] = Form([]),
+    client_info: dict = Depends(get_client_info),
+    priority: int = Depends(get_request_priority)
+):
+    """Process many documents in one request with bounded concurrency"""
+    start_time = time.time()
+    
+    if not await validate_permissions(client_info, "batch_process"):
+        raise HTTPException(status_code=403, detail="Client is not allowed to batch process")
+    
+    if len(files) > AI_SERVICE_CONFIG["max_batch_files"]:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many files: {len(files)} (maximum: {AI_SERVICE_CONFIG['max_batch_files']})"
+        )
+    
+    if not ocr_service or not ocr_service.is_ready():
+        raise HTTPException(status_code=503, detail="OCR service not available")
+    
+    logger.info(f"📚 Batch processing {len(files)} documents")
+    
+    # Per-file types line up with files; missing entries fall back to document_type
+    types = list(document_types or [])
+    types += [document_type] * (len(files) - len(types))
+    
+    # The batch holds one process_document slot per document it runs at once
+    gate = admission_controller.gate("process_document")
+    concurrency = gate.weight_for(min(len(files), AI_SERVICE_CONFIG["batch_size"]))
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def process_one(file: UploadFile, file_document_type: str) -> DocumentProcessingResponse:
+        async with semaphore:
+            file_start = time.time()
+            try:
+                with UploadBuffer.from_upload(file, UPLOAD_LIMITS["max_file_bytes"]) as upload:
+                    return await run_document_pipeline(upload.view, file.filename, file_document_type)
+                
+            except Exception as e:
+                logger.error(f"❌ Error processing document {file.filename} in batch: {e}")
+                return DocumentProcessingResponse(
+                    filename=file.filename or "",
+                    documentType=DocumentType.GENERAL,
+                    status=AnalysisStatus.FAILED,
+                    text="",
+                    confidence=0.0,
+                    validation=DocumentValidation(isValid=False, validationScore=0.0, issues=[str(e)]),
+                    metadata={"error": str(e), "requested_document_type": file_document_type},
+                    processingTime=time.time() - file_start
+                )
+    
+    async with admitted("process_document", priority, concurrency):
+        results = await asyncio.gather(*(process_one(f, t) for f, t in zip(files, types)))
+    
+    successful = sum(1 for result in results if result.status == AnalysisStatus.SUCCESS)
+    total_time = time.time() - start_time
+    
+    log_performance("batch_process_documents", total_time, {
+        "documents": len(results),
+        "failed": len(results) - successful,
+        "concurrency": concurrency
+    })
+    logger.info(f"✅ Batch of {len(results)} documents processed in {total_time:.2f}s")
+    
+    return BatchProcessingResponse(
+        totalDocuments=len(results),
+        successfullyProcessed=successful,
+        failed=len(results) - successful,
+        results=results,
+        totalProcessingTime=total_time,
+        cumulativeProcessingTime=sum(result.processingTime for result in results),
+        maxConcurrency=concurrency
+    )
+
 @app.post("/analyze-image", tags=["Image Analysis"])
 async def analyze_image(
     file: UploadFile = File(...),
     analysis_type: str = Form("general"),
-    background_tasks: BackgroundTasks = BackgroundTasks()
+    claim_id: Optional[str] = Form(None),
+    depth: AnalysisDepth = Form(AnalysisDepth.FORENSIC),
+    background_tasks: BackgroundTasks = BackgroundTasks(),
+    _admission: None = Depends(admission_slot("analyze_image"))
 ):
     """Analyze image for authenticity and damage assessment"""
     start_time = time.time()
@@ -313,29 +751,156 @@ async def analyze_image(
         if not file.content_type.startswith('image/'):
             raise HTTPException(status_code=400, detail="File must be an image")
         
-        content = await file.read()
-        if len(content) > AI_SERVICE_CONFIG["max_file_size_mb"] * 1024 * 1024:
-            raise HTTPException(status_code=413, detail="File too large")
+        upload = UploadBuffer.from_upload(file, UPLOAD_LIMITS["max_file_bytes"])
         
-        logger.info(f"🖼️ Analyzing image {file.filename}")
+        logger.info(f"🖼️ Analyzing image {file.filename} ({upload.size} bytes, depth: {depth.value})")
         
         if not image_service or not image_service.is_ready():
             raise HTTPException(status_code=503, detail="Image analysis service not available")
         
         # Analyze image
-        analysis_result = await image_service.analyze_image(content, file.filename, analysis_type)
+        with upload:
+            analysis_result = await image_service.analyze_image(
+                upload.view, file.filename, analysis_type, claim_id, depth=depth.value
+            )
         
         logger.info(f"✅ Image analyzed in {time.time() - start_time:.2f}s")
         return analysis_result
         
+    except HTTPException:
+        raise
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         logger.error(f"❌ Error analyzing image: {e}")
         raise HTTPException(status_code=500, detail=f"Image analysis failed: {str(e)}")
 
+@app.post("/jobs", response_model=JobSubmissionResponse, status_code=202, tags=["Jobs"])
+async def submit_job(
+    file: UploadFile = File(...),
+    job_type: JobType = Form(JobType.DOCUMENT),
+    document_type: DocumentType = Form(DocumentType.GENERAL),
+    analysis_type: str = Form("general"),
+    depth: AnalysisDepth = Form(AnalysisDepth.FORENSIC)
+):
+    """Queue a long-running document or image analysis and return immediately"""
+    try:
+        upload = UploadBuffer.from_upload(file, UPLOAD_LIMITS["max_file_bytes"])
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    if job_type == JobType.FRAUD_MODEL:
+        raise HTTPException(status_code=400, detail="Submit fraud model retraining to /fraud-model/retrain")
+    if job_type == JobType.DOCUMENT:
+        if not ocr_service or not ocr_service.is_ready():
+            raise HTTPException(status_code=503, detail="OCR service not available")
+        payload = {"filename": file.filename, "document_type": document_type.value}
+    else:
+        if not file.content_type.startswith('image/'):
+            raise HTTPException(status_code=400, detail="File must be an image")
+        if not image_service or not image_service.is_ready():
+            raise HTTPException(status_code=503, detail="Image analysis service not available")
+        payload = {"filename": file.filename, "analysis_type": analysis_type, "depth": depth.value}
+    
+    # The request's spool is closed when the response is sent; jobs keep their own copy
+    payload["content"] = upload.detach()
+    try:
+        job = job_manager.submit(job_type.value, payload, description=file.filename)
+    except JobQueueFullError as e:
+        payload["content"].close()
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    return JobSubmissionResponse(
+        jobId=job.id,
+        jobType=job_type,
+        status=JobStatus(job.status),
+        statusUrl=f"/jobs/{job.id}",
+        resultUrl=f"/jobs/{job.id}/result"
+    )
+
+@app.post("/fraud-model/retrain", response_model=JobSubmissionResponse, status_code=202, tags=["Admin"])
+async def retrain_fraud_model(
+    request: FraudModelRetrainRequest,
+    client_info: dict = Depends(get_client_info)
+):
+    """Queue retraining of the fraud models on newly labeled claims (validated, then hot-swapped)"""
+    if not await validate_permissions(client_info, "admin_endpoints"):
+        raise HTTPException(status_code=403, detail="Client is not allowed to use admin endpoints")
+    
+    max_claims = AI_SERVICE_CONFIG["fraud_models"]["max_retrain_claims"]
+    if len(request.claims) > max_claims:
+        raise HTTPException(status_code=413, detail=f"Too many claims: {len(request.claims)} (maximum: {max_claims})")
+    
+    labels = [claim.isFraud for claim in request.claims]
+    if labels.count(True) < 2 or labels.count(False) < 2:
+        raise HTTPException(status_code=400, detail="Need at least 2 fraudulent and 2 legitimate claims")
+    
+    if not fraud_service or not fraud_service.is_ready():
+        raise HTTPException(status_code=503, detail="Fraud detection service not available")
+    
+    payload = {"claims": [
+        {
+            "text": claim.description,
+            "claim_type": claim.claimType.value,
+            "requested_amount": claim.requestedAmount,
+            "is_fraud": int(claim.isFraud),
+        }
+        for claim in request.claims
+    ]}
+    try:
+        job = job_manager.submit(JobType.FRAUD_MODEL.value, payload, description=f"{len(request.claims)} labeled claims")
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    return JobSubmissionResponse(
+        jobId=job.id,
+        jobType=JobType.FRAUD_MODEL,
+        status=JobStatus(job.status),
+        statusUrl=f"/jobs/{job.id}",
+        resultUrl=f"/jobs/{job.id}/result"
+    )
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse, tags=["Jobs"])
+async def get_job_status(job_id: str):
+    """Get job status and progress"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    
+    return JobStatusResponse(
+        jobId=job["job_id"],
+        jobType=JobType(job["job_type"]),
+        status=JobStatus(job["status"]),
+        progress=JobProgress(**job["progress"]),
+        error=job["error"],
+        createdAt=job["created_at"],
+        startedAt=job["started_at"],
+        finishedAt=job["finished_at"],
+        expiresAt=job["expires_at"]
+    )
+
+@app.get("/jobs/{job_id}/result", tags=["Jobs"])
+async def get_job_result(job_id: str):
+    """Get the result of a completed job (202 while it is still queued or running)"""
+    job = job_manager.get(job_id, include_result=True)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    
+    if job["status"] == JOB_FAILED:
+        raise HTTPException(status_code=500, detail=f"Job failed: {job['error']}")
+    if job["status"] != JOB_COMPLETED:
+        return JSONResponse(
+            status_code=202,
+            content={"jobId": job_id, "status": job["status"], "progress": job["progress"]}
+        )
+    
+    return job["result"]
+
 @app.post("/gemini-analyze", tags=["Advanced AI"])
 async def gemini_analyze(
     data: dict,
-    background_tasks: BackgroundTasks = BackgroundTasks()
+    background_tasks: BackgroundTasks = BackgroundTasks(),
+    _admission: None = Depends(admission_slot("gemini_analyze"))
 ):
     """Advanced analysis using Google Gemini"""
     start_time = time.time()
@@ -370,7 +935,8 @@ async def health_check_endpoint():
 async def http_exception_handler(request, exc):
     return JSONResponse(
         status_code=exc.status_code,
-        content={"error": exc.detail, "timestamp": time.time()}
+        content={"error": exc.detail, "timestamp": time.time()},
+        headers=getattr(exc, "headers", None)
     )
 
 @app.exception_handler(Exception)
@@ -387,11 +953,25 @@ if __name__ == "__main__":
     logger.info(f"📁 Max file size: {AI_SERVICE_CONFIG['max_file_size_mb']}MB")
     logger.info(f"⏱️ Processing timeout: {AI_SERVICE_CONFIG['processing_timeout_seconds']}s")
     
-    uvicorn.run(
-        "main:app",
-        host=AI_SERVICE_CONFIG["host"],
-        port=AI_SERVICE_CONFIG["port"],
-        reload=True,
-        log_level=AI_SERVICE_CONFIG["log_level"].lower(),
-        access_log=True,
-    ) 
\ No newline at end of file
+    if AI_SERVICE_CONFIG["serving_mode"] == "prefork":
+        from utils.prefork import PreforkServer
+        
+        logger.info(f"👷 Workers: {AI_SERVICE_CONFIG['workers']} x {AI_SERVICE_CONFIG['worker_threads']} threads")
+        PreforkServer(
+            app,
+            host=AI_SERVICE_CONFIG["host"],
+            port=AI_SERVICE_CONFIG["port"],
+            workers=AI_SERVICE_CONFIG["workers"],
+            worker_threads=AI_SERVICE_CONFIG["worker_threads"],
+            preload=initialize_services,
+            log_level=AI_SERVICE_CONFIG["log_level"].lower(),
+        ).run()
+    else:
+        uvicorn.run(
+            "main:app",
+            host=AI_SERVICE_CONFIG["host"],
+            port=AI_SERVICE_CONFIG["port"],
+            reload=True,
+            log_level=AI_SERVICE_CONFIG["log_level"].lower(),
+            access_log=True,
+        )
@@ -27,6 +27,22 @@ class AnalysisStatus(str, Enum):
     PARTIAL = "partial"
     FAILED = "failed"
 
+class AnalysisDepth(str, Enum):
+    QUICK = "quick"          # Quality and perceptual hashes, for triage
+    STANDARD = "standard"    # Adds the cheap authenticity, content and damage checks
+    FORENSIC = "forensic"    # Every analyzer
+
+class JobType(str, Enum):
+    DOCUMENT = "document"
+    IMAGE = "image"
+    FRAUD_MODEL = "fraud_model"  # Fraud model retraining (POST /fraud-model/retrain)
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
 # Request Models
 class ClaimAnalysisRequest(BaseModel):
     claimId: str = Field(..., description="Unique claim identifier")
@@ -87,6 +103,7 @@ class FraudAnalysisResult(BaseModel):
     riskFactors: List[str] = Field(default_factory=list, description="Identified risk factors")
     consistencyCheck: Dict[str, bool] = Field(default_factory=dict, description="Data consistency checks")
     anomalies: List[str] = Field(default_factory=list, description="Detected anomalies")
+    modelVersion: Optional[str] = Field(None, description="Trained fraud model version used (None: heuristics only)")
 
 class ClaimAnalysisResponse(BaseModel):
     claimId: str = Field(..., description="Claim identifier")
@@ -128,7 +145,7 @@ class DocumentProcessingResponse(BaseModel):
     validation: DocumentValidation = Field(..., description="Validation results")
     
     # Extracted data
-    extractedFields: Optional[Dict[str, str]] = Field(None, description="Extracted structured fields")
+    extractedFields: Optional[Dict[str, Any]] = Field(None, description="Extracted structured fields")
     detectedAmounts: Optional[List[float]] = Field(None, description="Monetary amounts found")
     detectedDates: Optional[List[str]] = Field(None, description="Dates found in document")
     
@@ -142,6 +159,45 @@ class BatchProcessingResponse(BaseModel):
     failed: int = Field(..., description="Failed processing count")
     results: List[DocumentProcessingResponse] = Field(..., description="Individual processing results")
     totalProcessingTime: float = Field(..., description="Total processing time")
+    cumulativeProcessingTime: Optional[float] = Field(None, description="Sum of per-document processing times")
+    maxConcurrency: Optional[int] = Field(None, description="Documents processed concurrently")
+
+class BatchClaimAnalysisRequest(BaseModel):
+    claims: List[ClaimAnalysisRequest] = Field(..., min_length=1, description="Claims to analyze")
+
+class LabeledClaim(ClaimAnalysisRequest):
+    isFraud: bool = Field(..., description="Confirmed outcome of the claim")
+
+class FraudModelRetrainRequest(BaseModel):
+    claims: List[LabeledClaim] = Field(..., min_length=4, description="Newly labeled claims to train on")
+
+class BatchClaimAnalysisResponse(BaseModel):
+    totalClaims: int = Field(..., description="Total claims analyzed")
+    results: List[ClaimAnalysisResponse] = Field(..., description="Individual claim results, in request order")
+    totalProcessingTime: float = Field(..., description="Total processing time")
+
+class JobProgress(BaseModel):
+    completed: int = Field(0, description="Units of work done (e.g. pages OCR'd)")
+    total: int = Field(0, description="Total units of work, 0 if not yet known")
+    stage: str = Field("queued", description="Current processing stage")
+
+class JobSubmissionResponse(BaseModel):
+    jobId: str = Field(..., description="Job identifier")
+    jobType: JobType = Field(..., description="Type of job")
+    status: JobStatus = Field(..., description="Job status")
+    statusUrl: str = Field(..., description="URL to poll for status")
+    resultUrl: str = Field(..., description="URL to fetch the result")
+
+class JobStatusResponse(BaseModel):
+    jobId: str = Field(..., description="Job identifier")
+    jobType: JobType = Field(..., description="Type of job")
+    status: JobStatus = Field(..., description="Job status")
+    progress: JobProgress = Field(default_factory=JobProgress, description="Job progress")
+    error: Optional[str] = Field(None, description="Error message if the job failed")
+    createdAt: float = Field(..., description="Submission timestamp")
+    startedAt: Optional[float] = Field(None, description="Start timestamp")
+    finishedAt: Optional[float] = Field(None, description="Completion timestamp")
+    expiresAt: Optional[float] = Field(None, description="Timestamp after which the result is discarded")
 
 class HealthClaimAnalysis(BaseModel):
     medicalValidity: float = Field(..., ge=0, le=1, description="Medical validity score")
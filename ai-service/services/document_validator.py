@@ -6,8 +6,51 @@ from datetime import datetime, timedelta
 from loguru import logger
 import hashlib
 
+from utils.result_cache import get_result_cache, content_digest
+from utils.worker_pool import get_worker_pools
+from utils.text_patterns import PatternSet, TextPattern, TextScan
+from utils.text_context import TextAnalysisContext
+from services.field_extraction import FieldExtractor, FIELD_EXTRACTION_VERSION
+
+# Bump when validation rules change (invalidates cached results)
+VALIDATION_RULES_VERSION = "rules-1"
+
+# Literals every match of the per-type rule patterns contains (the keyword pass decides whether to run them)
+RULE_PATTERN_ANCHORS = {"amount_pattern": ("$",), "date_pattern": ("/",)}
+
+# Placeholder text (case-insensitive regex, anchors); reported by regex
+PLACEHOLDER_PATTERNS = [
+    (r'xxx+', ("xxx",)),
+    (r'\[.*\]', ("[",)),
+    (r'<.*>', ("<",)),
+    (r'placeholder', ("placeholder",)),
+    (r'sample', ("sample",)),
+    (r'lorem ipsum', ("lorem ipsum",)),
+]
+
+# Sections each document type is expected to have: (section, any of these keywords)
+MEDICAL_BILL_ELEMENTS = [
+    ("patient information", ["patient", "name"]),
+    ("provider information", ["provider", "doctor", "hospital", "clinic"]),
+    ("service information", ["service", "treatment", "procedure"]),
+    ("billing information", ["bill", "charge", "amount", "total"])
+]
+VEHICLE_ESTIMATE_ELEMENTS = [
+    ("vehicle information", ["vehicle", "car", "truck", "vin", "year", "make", "model"]),
+    ("damage description", ["damage", "repair", "replace", "parts"]),
+    ("cost breakdown", ["labor", "parts", "total", "estimate"])
+]
+INVOICE_ELEMENTS = [
+    ("header", ["invoice", "receipt", "bill"]),
+    ("vendor info", ["from", "vendor", "company", "business"]),
+    ("amount", ["total", "amount", "due", "paid"])
+]
+
 class DocumentValidator:
-    def __init__(self):
+    def __init__(self, field_extractor: Optional[FieldExtractor] = None):
+        # Shared with OCR structuring (main.py passes the one that builds extractedFields)
+        self.field_extractor = field_extractor or FieldExtractor()
+        
         # Document type validation rules
         self.validation_rules = {
             "medical_bill": {
@@ -71,6 +114,35 @@ class DocumentValidator:
             "copy of copy",
             "duplicate"
         ]
+        
+        self.text_patterns = self._compile_patterns()
+    
+    def _compile_patterns(self) -> PatternSet:
+        """Every keyword list and regex above, compiled once; each document gets one keyword pass"""
+        keywords = {
+            "suspicious": self.suspicious_indicators,
+            "elements": [
+                keyword
+                for elements in (MEDICAL_BILL_ELEMENTS, VEHICLE_ESTIMATE_ELEMENTS, INVOICE_ELEMENTS)
+                for _, element_keywords in elements
+                for keyword in element_keywords
+            ],
+        }
+        for document_type, rules in self.validation_rules.items():
+            keywords[f"expected:{document_type}"] = rules.get("expected_keywords", [])
+        
+        patterns = [
+            TextPattern("numbers", r'\d+[,.]?\d*'),
+            TextPattern("repeated_chars", r'(.)\1{5,}'),
+        ]
+        for document_type, rules in self.validation_rules.items():
+            for key, anchors in RULE_PATTERN_ANCHORS.items():
+                if key in rules:
+                    patterns.append(TextPattern(f"{document_type}:{key}", rules[key], anchors=anchors))
+        for regex, anchors in PLACEHOLDER_PATTERNS:
+            patterns.append(TextPattern(f"placeholder:{regex}", regex, re.IGNORECASE, anchors))
+        
+        return PatternSet(keywords, patterns)
     
     def is_ready(self) -> bool:
         """Check if document validator is ready"""
@@ -81,46 +153,37 @@ class DocumentValidator:
         content: bytes, 
         filename: str, 
         document_type: str, 
-        extracted_text: str
+        extracted_text: str,
+        content_hash: Optional[str] = None,
+        text_context: Optional[TextAnalysisContext] = None,
+        extracted_fields: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Validate document based on type and content"""
+        """Validate document based on type and content (cached by content and text hash)
+
+        text_context is the TextAnalysisContext of extracted_text when the caller has
+        one (its tokens, statistics and scans are then shared with other services).
+        extracted_fields is self.field_extractor's output for that text when the caller
+        already extracted it (e.g. for the OCR response); otherwise it is extracted here.
+        """
+        ctx = text_context if text_context is not None else TextAnalysisContext(extracted_text)
+        cache = get_result_cache()
+        cache_key = cache.make_key(
+            "validation",
+            content_hash or await get_worker_pools().run_in_thread(content_digest, content),
+            VALIDATION_RULES_VERSION,
+            FIELD_EXTRACTION_VERSION,
+            document_type,
+            ctx.digest,
+            datetime.now().date()  # Date checks are relative to today
+        )
+        cached = await cache.get_async(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            logger.info(f"🔍 Validating document: {filename} (type: {document_type})")
-            
-            validation_result = {
-                "is_valid": True,
-                "validation_score": 1.0,
-                "issues": [],
-                "extracted_data": {},
-                "confidence": 1.0
-            }
-            
-            # Get validation rules for document type
-            rules = self.validation_rules.get(document_type, self.validation_rules["general"])
-            
-            # Basic text validation
-            text_validation = await self._validate_text_content(extracted_text, rules)
-            validation_result.update(text_validation)
-            
-            # Structure validation
-            structure_validation = await self._validate_document_structure(extracted_text, document_type, rules)
-            self._merge_validation_results(validation_result, structure_validation)
-            
-            # Content validation
-            content_validation = await self._validate_content_authenticity(extracted_text, document_type)
-            self._merge_validation_results(validation_result, content_validation)
-            
-            # Data extraction and validation
-            data_validation = await self._extract_and_validate_data(extracted_text, document_type, rules)
-            validation_result["extracted_data"] = data_validation["data"]
-            self._merge_validation_results(validation_result, data_validation)
-            
-            # Calculate final validation score
-            validation_result["validation_score"] = self._calculate_validation_score(validation_result)
-            validation_result["is_valid"] = validation_result["validation_score"] >= 0.6
-            
-            logger.info(f"✅ Document validation completed: {filename} (score: {validation_result['validation_score']:.2f})")
-            return validation_result
+            result = await self._validate_document(filename, document_type, ctx, extracted_fields)
+            await cache.set_async(cache_key, result)
+            return result
             
         except Exception as e:
             logger.error(f"❌ Error validating document {filename}: {e}")
@@ -132,9 +195,67 @@ class DocumentValidator:
                 "confidence": 0.0
             }
     
-    async def _validate_text_content(self, text: str, rules: Dict[str, Any]) -> Dict[str, Any]:
+    async def _validate_document(
+        self,
+        filename: str,
+        document_type: str,
+        ctx: TextAnalysisContext,
+        extracted_fields: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Run every validation step"""
+        logger.info(f"🔍 Validating document: {filename} (type: {document_type})")
+        
+        validation_result = {
+            "is_valid": True,
+            "validation_score": 1.0,
+            "issues": [],
+            "extracted_data": {},
+            "confidence": 1.0
+        }
+        
+        # Get validation rules for document type
+        rules_type = document_type if document_type in self.validation_rules else "general"
+        rules = self.validation_rules[rules_type]
+        
+        # Tokens and statistics computed once; one keyword pass, regexes only where their literals occur
+        scan = ctx.scan(self.text_patterns)
+        
+        # Structured fields (the same ones OCR returns), extracted once
+        if extracted_fields is None:
+            extracted_fields = self.field_extractor.extract(ctx, document_type)
+        
+        # Basic text validation
+        text_validation = await self._validate_text_content(ctx, scan, rules, rules_type)
+        validation_result.update(text_validation)
+        
+        # Structure validation
+        structure_validation = await self._validate_document_structure(
+            scan, extracted_fields, document_type, rules, rules_type
+        )
+        self._merge_validation_results(validation_result, structure_validation)
+        
+        # Content validation
+        content_validation = await self._validate_content_authenticity(ctx, scan, document_type)
+        self._merge_validation_results(validation_result, content_validation)
+        
+        # Extracted data validation
+        data_validation = await self._validate_extracted_data(extracted_fields, document_type, rules)
+        validation_result["extracted_data"] = data_validation["data"]
+        self._merge_validation_results(validation_result, data_validation)
+        
+        # Calculate final validation score
+        validation_result["validation_score"] = self._calculate_validation_score(validation_result)
+        validation_result["is_valid"] = validation_result["validation_score"] >= 0.6
+        
+        logger.info(f"✅ Document validation completed: {filename} (score: {validation_result['validation_score']:.2f})")
+        return validation_result
+    
+    async def _validate_text_content(
+        self, ctx: TextAnalysisContext, scan: TextScan, rules: Dict[str, Any], rules_type: str
+    ) -> Dict[str, Any]:
         """Validate basic text content"""
         issues = []
+        text = ctx.text
         
         # Check minimum text length
         min_length = rules.get("min_text_length", 10)
@@ -142,27 +263,24 @@ class DocumentValidator:
             issues.append(f"Text too short: {len(text)} characters (minimum: {min_length})")
         
         # Check for suspicious content
-        text_lower = text.lower()
-        for indicator in self.suspicious_indicators:
-            if indicator in text_lower:
-                issues.append(f"Suspicious content detected: {indicator}")
+        for indicator in scan.keywords("suspicious"):
+            issues.append(f"Suspicious content detected: {indicator}")
         
         # Check for expected keywords
         expected_keywords = rules.get("expected_keywords", [])
         if expected_keywords:
-            found_keywords = [kw for kw in expected_keywords if kw.lower() in text_lower]
+            found_keywords = scan.keywords(f"expected:{rules_type}")
             if len(found_keywords) < len(expected_keywords) * 0.5:  # At least 50% of keywords
                 issues.append(f"Missing expected keywords. Found: {found_keywords}")
         
         # Check text quality
-        word_count = len(text.split())
+        word_count = ctx.word_count
         if word_count < 5:
             issues.append("Text has too few words")
         
         # Check for excessive repetition
-        words = text.lower().split()
-        unique_words = set(words)
-        repetition_ratio = 1 - (len(unique_words) / len(words)) if words else 0
+        unique_words = ctx.unique_word_count
+        repetition_ratio = 1 - (unique_words / word_count) if word_count else 0
         if repetition_ratio > 0.7:
             issues.append("Excessive word repetition detected")
         
@@ -171,19 +289,21 @@ class DocumentValidator:
             "text_stats": {
                 "length": len(text),
                 "word_count": word_count,
-                "unique_words": len(unique_words),
+                "unique_words": unique_words,
                 "repetition_ratio": repetition_ratio
             }
         }
     
-    async def _validate_document_structure(self, text: str, document_type: str, rules: Dict[str, Any]) -> Dict[str, Any]:
+    async def _validate_document_structure(
+        self, scan: TextScan, fields: Dict[str, Any], document_type: str, rules: Dict[str, Any], rules_type: str
+    ) -> Dict[str, Any]:
         """Validate document structure based on type"""
         issues = []
         
         # Check for required patterns
         amount_pattern = rules.get("amount_pattern")
         if amount_pattern:
-            amounts = re.findall(amount_pattern, text)
+            amounts = scan.findall(f"{rules_type}:amount_pattern")
             if not amounts:
                 issues.append("No monetary amounts found in expected format")
             elif len(amounts) > 10:
@@ -191,7 +311,7 @@ class DocumentValidator:
         
         date_pattern = rules.get("date_pattern")
         if date_pattern:
-            dates = re.findall(date_pattern, text)
+            dates = scan.findall(f"{rules_type}:date_pattern")
             if not dates:
                 issues.append("No dates found in expected format")
             else:
@@ -202,49 +322,42 @@ class DocumentValidator:
         
         # Document type specific structure validation
         if document_type == "medical_bill":
-            structure_issues = await self._validate_medical_bill_structure(text)
+            structure_issues = await self._validate_medical_bill_structure(scan, fields)
             issues.extend(structure_issues)
         elif document_type == "vehicle_estimate":
-            structure_issues = await self._validate_vehicle_estimate_structure(text)
+            structure_issues = await self._validate_vehicle_estimate_structure(scan, fields)
             issues.extend(structure_issues)
         elif document_type in ["invoice", "receipt"]:
-            structure_issues = await self._validate_invoice_structure(text)
+            structure_issues = await self._validate_invoice_structure(scan)
             issues.extend(structure_issues)
         
         return {"structure_validation_issues": issues}
     
-    async def _validate_content_authenticity(self, text: str, document_type: str) -> Dict[str, Any]:
+    async def _validate_content_authenticity(
+        self, ctx: TextAnalysisContext, scan: TextScan, document_type: str
+    ) -> Dict[str, Any]:
         """Validate content authenticity"""
         issues = []
         authenticity_score = 1.0
         
         # Check for placeholder text
-        placeholder_patterns = [
-            r'xxx+',
-            r'\[.*\]',
-            r'<.*>',
-            r'placeholder',
-            r'sample',
-            r'lorem ipsum'
-        ]
-        
-        for pattern in placeholder_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
+        for pattern, _ in PLACEHOLDER_PATTERNS:
+            if scan.search(f"placeholder:{pattern}"):
                 issues.append(f"Placeholder text detected: {pattern}")
                 authenticity_score -= 0.2
         
         # Check for formatting inconsistencies
-        if self._has_formatting_inconsistencies(text):
+        if self._has_formatting_inconsistencies(ctx, scan):
             issues.append("Formatting inconsistencies detected")
             authenticity_score -= 0.1
         
         # Check for unusual character patterns
-        if self._has_unusual_characters(text):
+        if self._has_unusual_characters(ctx, scan):
             issues.append("Unusual character patterns detected")
             authenticity_score -= 0.1
         
         # Check for data integrity
-        if self._has_data_integrity_issues(text):
+        if self._has_data_integrity_issues(ctx):
             issues.append("Data integrity issues detected")
             authenticity_score -= 0.2
         
@@ -255,27 +368,12 @@ class DocumentValidator:
             "authenticity_score": authenticity_score
         }
     
-    async def _extract_and_validate_data(self, text: str, document_type: str, rules: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract and validate structured data"""
+    async def _validate_extracted_data(
+        self, fields: Dict[str, Any], document_type: str, rules: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Validate the structured fields extracted from the text"""
         issues = []
-        extracted_data = {}
-        
-        # Extract common patterns
-        extracted_data["emails"] = re.findall(self.patterns["email"], text)
-        extracted_data["phones"] = re.findall(self.patterns["phone"], text)
-        extracted_data["amounts"] = self._extract_amounts(text)
-        extracted_data["dates"] = self._extract_dates(text)
-        
-        # Document type specific extraction
-        if document_type == "medical_bill":
-            medical_data = await self._extract_medical_data(text)
-            extracted_data.update(medical_data)
-        elif document_type == "vehicle_estimate":
-            vehicle_data = await self._extract_vehicle_data(text)
-            extracted_data.update(vehicle_data)
-        elif document_type in ["invoice", "receipt"]:
-            invoice_data = await self._extract_invoice_data(text)
-            extracted_data.update(invoice_data)
+        extracted_data = dict(fields)
         
         # Validate required fields
         required_fields = rules.get("required_fields", [])
@@ -292,69 +390,43 @@ class DocumentValidator:
             "data": extracted_data
         }
     
-    async def _validate_medical_bill_structure(self, text: str) -> List[str]:
+    async def _validate_medical_bill_structure(self, scan: TextScan, fields: Dict[str, Any]) -> List[str]:
         """Validate medical bill specific structure"""
         issues = []
-        text_lower = text.lower()
         
         # Check for essential medical bill elements
-        medical_elements = [
-            ("patient information", ["patient", "name"]),
-            ("provider information", ["provider", "doctor", "hospital", "clinic"]),
-            ("service information", ["service", "treatment", "procedure"]),
-            ("billing information", ["bill", "charge", "amount", "total"])
-        ]
-        
-        for element_name, keywords in medical_elements:
-            if not any(keyword in text_lower for keyword in keywords):
+        for element_name, keywords in MEDICAL_BILL_ELEMENTS:
+            if not scan.any(keywords):
                 issues.append(f"Missing {element_name} section")
         
         # Check for medical codes
-        icd_codes = re.findall(r'\b[A-Z]\d{2}(?:\.\d{1,2})?\b', text)
-        cpt_codes = re.findall(r'\b\d{5}\b', text)
-        
-        if not icd_codes and not cpt_codes:
+        if not fields.get("diagnosis_codes") and not fields.get("procedure_codes"):
             issues.append("No medical billing codes (ICD/CPT) found")
         
         return issues
     
-    async def _validate_vehicle_estimate_structure(self, text: str) -> List[str]:
+    async def _validate_vehicle_estimate_structure(self, scan: TextScan, fields: Dict[str, Any]) -> List[str]:
         """Validate vehicle estimate specific structure"""
         issues = []
-        text_lower = text.lower()
         
         # Check for essential vehicle estimate elements
-        vehicle_elements = [
-            ("vehicle information", ["vehicle", "car", "truck", "vin", "year", "make", "model"]),
-            ("damage description", ["damage", "repair", "replace", "parts"]),
-            ("cost breakdown", ["labor", "parts", "total", "estimate"])
-        ]
-        
-        for element_name, keywords in vehicle_elements:
-            if not any(keyword in text_lower for keyword in keywords):
+        for element_name, keywords in VEHICLE_ESTIMATE_ELEMENTS:
+            if not scan.any(keywords):
                 issues.append(f"Missing {element_name} section")
         
         # Check for VIN
-        vin_pattern = self.patterns["vin"]
-        if not re.search(vin_pattern, text):
+        if not fields.get("vin"):
             issues.append("No VIN number found")
         
         return issues
     
-    async def _validate_invoice_structure(self, text: str) -> List[str]:
+    async def _validate_invoice_structure(self, scan: TextScan) -> List[str]:
         """Validate invoice/receipt structure"""
         issues = []
-        text_lower = text.lower()
         
         # Check for essential invoice elements
-        invoice_elements = [
-            ("header", ["invoice", "receipt", "bill"]),
-            ("vendor info", ["from", "vendor", "company", "business"]),
-            ("amount", ["total", "amount", "due", "paid"])
-        ]
-        
-        for element_name, keywords in invoice_elements:
-            if not any(keyword in text_lower for keyword in keywords):
+        for element_name, keywords in INVOICE_ELEMENTS:
+            if not scan.any(keywords):
                 issues.append(f"Missing {element_name} information")
         
         return issues
@@ -390,19 +462,17 @@ class DocumentValidator:
         except (ValueError, IndexError):
             return False
     
-    def _has_formatting_inconsistencies(self, text: str) -> bool:
+    def _has_formatting_inconsistencies(self, ctx: TextAnalysisContext, scan: TextScan) -> bool:
         """Check for formatting inconsistencies"""
-        lines = text.split('\n')
-        
         # Check for inconsistent spacing
-        space_counts = [len(line) - len(line.lstrip()) for line in lines if line.strip()]
+        space_counts = ctx.line_indents
         if space_counts:
             space_variance = np.var(space_counts) if 'np' in globals() else 0
             if space_variance > 100:  # High variance in indentation
                 return True
         
         # Check for mixed number formats
-        amounts = re.findall(r'\d+[,.]?\d*', text)
+        amounts = scan.findall("numbers")
         if amounts:
             comma_amounts = [a for a in amounts if ',' in a]
             dot_amounts = [a for a in amounts if '.' in a]
@@ -411,24 +481,22 @@ class DocumentValidator:
         
         return False
     
-    def _has_unusual_characters(self, text: str) -> bool:
+    def _has_unusual_characters(self, ctx: TextAnalysisContext, scan: TextScan) -> bool:
         """Check for unusual character patterns"""
         # Check for excessive special characters
-        special_char_count = sum(1 for c in text if not c.isalnum() and not c.isspace())
-        if special_char_count > len(text) * 0.3:  # More than 30% special characters
+        if ctx.char_counts["special"] > len(ctx.text) * 0.3:  # More than 30% special characters
             return True
         
         # Check for repeated character patterns
-        repeated_patterns = re.findall(r'(.)\1{5,}', text)
-        if repeated_patterns:
+        if scan.search("repeated_chars"):
             return True
         
         return False
     
-    def _has_data_integrity_issues(self, text: str) -> bool:
+    def _has_data_integrity_issues(self, ctx: TextAnalysisContext) -> bool:
         """Check for data integrity issues"""
         # Check for impossible values
-        amounts = self._extract_amounts(text)
+        amounts = ctx.amounts
         if amounts:
             # Check for unreasonably large amounts
             max_amount = max(amounts)
@@ -436,168 +504,14 @@ class DocumentValidator:
                 return True
         
         # Check for inconsistent dates
-        dates = self._extract_dates(text)
-        if len(dates) > 1:
-            try:
-                parsed_dates = []
-                for date_str in dates:
-                    parts = date_str.split('/')
-                    if len(parts) == 3:
-                        month, day, year = int(parts[0]), int(parts[1]), int(parts[2])
-                        parsed_dates.append(datetime(year, month, day))
-                
-                if parsed_dates:
-                    date_range = max(parsed_dates) - min(parsed_dates)
-                    if date_range > timedelta(days=365):  # More than a year apart
-                        return True
-            except (ValueError, IndexError):
+        if len(ctx.dates) > 1:
+            if ctx.parsed_slash_dates is None:
+                return True
+            if ctx.parsed_slash_dates and ctx.slash_date_range > timedelta(days=365):  # More than a year apart
                 return True
         
         return False
     
-    def _extract_amounts(self, text: str) -> List[float]:
-        """Extract monetary amounts"""
-        pattern = r'\$?\s*\d{1,3}(?:,\d{3})*(?:\.\d{2})?'
-        matches = re.findall(pattern, text)
-        
-        amounts = []
-        for match in matches:
-            try:
-                clean_amount = re.sub(r'[^\d.]', '', match)
-                if clean_amount and '.' in clean_amount:
-                    amounts.append(float(clean_amount))
-            except ValueError:
-                continue
-        
-        return amounts
-    
-    def _extract_dates(self, text: str) -> List[str]:
-        """Extract dates"""
-        date_patterns = [
-            r'\d{1,2}/\d{1,2}/\d{4}',
-            r'\d{1,2}-\d{1,2}-\d{4}',
-            r'\d{4}-\d{1,2}-\d{1,2}'
-        ]
-        
-        dates = []
-        for pattern in date_patterns:
-            matches = re.findall(pattern, text)
-            dates.extend(matches)
-        
-        return list(set(dates))
-    
-    async def _extract_medical_data(self, text: str) -> Dict[str, Any]:
-        """Extract medical bill specific data"""
-        data = {}
-        
-        # Patient name
-        patient_patterns = [
-            r'(?:Patient|Name):\s*([A-Za-z\s]+)',
-            r'Patient Name:\s*([A-Za-z\s]+)'
-        ]
-        
-        for pattern in patient_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                data["patient_name"] = match.group(1).strip()
-                break
-        
-        # Service date
-        service_patterns = [
-            r'(?:Service|Date of Service):\s*(\d{1,2}/\d{1,2}/\d{4})',
-            r'Date:\s*(\d{1,2}/\d{1,2}/\d{4})'
-        ]
-        
-        for pattern in service_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                data["service_date"] = match.group(1)
-                break
-        
-        # Provider
-        provider_patterns = [
-            r'(?:Provider|Doctor|Physician):\s*([A-Za-z\s]+)',
-            r'(?:Hospital|Clinic):\s*([A-Za-z\s]+)'
-        ]
-        
-        for pattern in provider_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                data["provider"] = match.group(1).strip()
-                break
-        
-        return data
-    
-    async def _extract_vehicle_data(self, text: str) -> Dict[str, Any]:
-        """Extract vehicle estimate specific data"""
-        data = {}
-        
-        # VIN
-        vin_match = re.search(self.patterns["vin"], text)
-        if vin_match:
-            data["vin"] = vin_match.group()
-        
-        # Vehicle info
-        vehicle_patterns = [
-            r'(\d{4})\s+([A-Za-z]+)\s+([A-Za-z]+)',  # Year Make Model
-            r'Vehicle:\s*([A-Za-z0-9\s]+)'
-        ]
-        
-        for pattern in vehicle_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                if len(match.groups()) == 3:
-                    data["vehicle_year"] = match.group(1)
-                    data["vehicle_make"] = match.group(2)
-                    data["vehicle_model"] = match.group(3)
-                else:
-                    data["vehicle_info"] = match.group(1).strip()
-                break
-        
-        # Damage description
-        damage_patterns = [
-            r'(?:Damage|Description):\s*([A-Za-z0-9\s,.-]+)',
-            r'(?:Repair|Fix):\s*([A-Za-z0-9\s,.-]+)'
-        ]
-        
-        for pattern in damage_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                data["damage_description"] = match.group(1).strip()
-                break
-        
-        return data
-    
-    async def _extract_invoice_data(self, text: str) -> Dict[str, Any]:
-        """Extract invoice/receipt specific data"""
-        data = {}
-        
-        # Invoice number
-        invoice_patterns = [
-            r'(?:Invoice|Receipt)\s*#?\s*(\w+)',
-            r'(?:Number|No):\s*(\w+)'
-        ]
-        
-        for pattern in invoice_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                data["invoice_number"] = match.group(1)
-                break
-        
-        # Vendor/Merchant
-        vendor_patterns = [
-            r'(?:From|Vendor|Company):\s*([A-Za-z\s]+)',
-            r'(?:Merchant|Business):\s*([A-Za-z\s]+)'
-        ]
-        
-        for pattern in vendor_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                data["vendor"] = match.group(1).strip()
-                break
-        
-        return data
-    
     async def _cross_validate_data(self, data: Dict[str, Any], document_type: str) -> List[str]:
         """Cross-validate extracted data for consistency"""
         issues = []
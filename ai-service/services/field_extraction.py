@@ -0,0 +1,186 @@
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.text_context import TextAnalysisContext
+from utils.text_patterns import PatternSet, TextPattern, TextScan
+
+# Bump when extracted fields for the same text change (invalidates cached validation results)
+FIELD_EXTRACTION_VERSION = "fields-1"
+
+EMAIL_PATTERN = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+PHONE_PATTERN = r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'
+MONTH_DATE_PATTERN = r'\w+ \d{1,2}, \d{4}'  # Month DD, YYYY
+ICD_CODE_PATTERN = r'\b[A-Z]\d{2}(?:\.\d{1,2})?\b'  # ICD-10 diagnosis codes
+CPT_CODE_PATTERN = r'\b\d{5}\b'  # CPT procedure codes
+VIN_PATTERN = r'\b[A-HJ-NPR-Z0-9]{17}\b'
+LICENSE_PLATE_PATTERN = r'\b[A-Z0-9]{2,8}\b'
+TAX_PATTERN = r'(?:Tax|GST|VAT):\s*\$?(\d+(?:\.\d{2})?)'
+
+# (regex, anchors) tried in order for each labelled field; all case-insensitive
+FIELD_PATTERNS = {
+    "patient_name": [
+        (r'(?:Patient|Name):\s*([A-Za-z\s]+)', ("patient:", "name:")),
+        (r'Patient Name:\s*([A-Za-z\s]+)', ("patient name:",)),
+    ],
+    "service_date": [
+        (r'(?:Service|Date of Service):\s*(\d{1,2}/\d{1,2}/\d{4})', ("service:",)),
+        (r'Date:\s*(\d{1,2}/\d{1,2}/\d{4})', ("date:",)),
+    ],
+    "provider": [
+        (r'(?:Provider|Doctor|Physician):\s*([A-Za-z\s]+)', ("provider:", "doctor:", "physician:")),
+        (r'(?:Hospital|Clinic):\s*([A-Za-z\s]+)', ("hospital:", "clinic:")),
+    ],
+    "vehicle": [
+        (r'(\d{4})\s+([A-Za-z]+)\s+([A-Za-z]+)', ()),  # Year Make Model
+        (r'Vehicle:\s*([A-Za-z0-9\s]+)', ("vehicle:",)),
+    ],
+    "damage_description": [
+        (r'(?:Damage|Description):\s*([A-Za-z0-9\s,.-]+)', ("damage:", "description:")),
+        (r'(?:Repair|Fix):\s*([A-Za-z0-9\s,.-]+)', ("repair:", "fix:")),
+    ],
+    "invoice_number": [
+        (r'(?:Invoice|Receipt|Bill)\s*#?\s*(\w+)', ("invoice", "receipt", "bill")),
+        (r'(?:Number|No):\s*(\w+)', ("number:", "no:")),
+    ],
+    "vendor": [
+        (r'(?:From|Vendor|Company):\s*([A-Za-z\s]+)', ("from:", "vendor:", "company:")),
+        (r'(?:Merchant|Business):\s*([A-Za-z\s]+)', ("merchant:", "business:")),
+    ],
+}
+
+
+class FieldExtractor:
+    """
+    Structured fields of a document's text, extracted once per document.
+
+    The same fields are returned as the OCR `extractedFields` and checked by
+    document validation: amounts (highest first), dates, phone numbers and emails
+    for every document, plus the fields of the document type's extractor. Regexes
+    are compiled once and run through the text's TextAnalysisContext, so amounts,
+    dates and the keyword pass are shared with the other checks of that text.
+    """
+
+    def __init__(self):
+        patterns = [
+            TextPattern("emails", EMAIL_PATTERN, anchors=("@",)),
+            TextPattern("phone_numbers", PHONE_PATTERN),
+            TextPattern("month_dates", MONTH_DATE_PATTERN, anchors=(", ",)),
+            TextPattern("diagnosis_codes", ICD_CODE_PATTERN),
+            TextPattern("procedure_codes", CPT_CODE_PATTERN),
+            TextPattern("vin", VIN_PATTERN),
+            TextPattern("license_plates", LICENSE_PLATE_PATTERN),
+            TextPattern("tax_amount", TAX_PATTERN, re.IGNORECASE, anchors=("tax:", "gst:", "vat:")),
+        ]
+        for field, field_patterns in FIELD_PATTERNS.items():
+            for i, (regex, anchors) in enumerate(field_patterns):
+                patterns.append(TextPattern(f"{field}:{i}", regex, re.IGNORECASE, anchors))
+        self.text_patterns = PatternSet(patterns=patterns)
+
+        # Fields extracted on top of the common ones, per document type
+        self.document_extractors: Dict[str, Callable[[TextScan], Dict[str, Any]]] = {
+            "medical_bill": self._extract_medical_fields,
+            "vehicle_estimate": self._extract_vehicle_fields,
+            "invoice": self._extract_invoice_fields,
+            "receipt": self._extract_invoice_fields,
+        }
+
+    def is_ready(self) -> bool:
+        return True
+
+    def extract(self, ctx: TextAnalysisContext, document_type: str) -> Dict[str, Any]:
+        """Common fields plus the document type's fields (a fresh dict; callers may modify it)"""
+        scan = ctx.scan(self.text_patterns)
+
+        fields: Dict[str, Any] = {
+            "amounts": sorted(ctx.amounts, reverse=True),  # Highest amounts first
+            "dates": self._extract_dates(ctx, scan),
+            "phone_numbers": list(scan.findall("phone_numbers")),
+            "emails": list(scan.findall("emails")),
+        }
+
+        extractor = self.document_extractors.get(document_type)
+        if extractor:
+            fields.update(extractor(scan))
+
+        return fields
+
+    def _extract_dates(self, ctx: TextAnalysisContext, scan: TextScan) -> List[str]:
+        """Distinct dates in the slash, dash, ISO and "Month DD, YYYY" layouts"""
+        month_dates = scan.findall("month_dates")
+        if not month_dates:
+            return list(ctx.dates)
+        return list(set(ctx.dates + month_dates))
+
+    def _first_match(self, scan: TextScan, field: str) -> Optional["re.Match"]:
+        """First match of a field's patterns, tried in order"""
+        for i in range(len(FIELD_PATTERNS[field])):
+            match = scan.search(f"{field}:{i}")
+            if match:
+                return match
+        return None
+
+    def _extract_medical_fields(self, scan: TextScan) -> Dict[str, Any]:
+        """Patient, service date, provider and billing codes"""
+        data = {}
+
+        match = self._first_match(scan, "patient_name")
+        if match:
+            data["patient_name"] = match.group(1).strip()
+
+        match = self._first_match(scan, "service_date")
+        if match:
+            data["service_date"] = match.group(1)
+
+        match = self._first_match(scan, "provider")
+        if match:
+            data["provider"] = match.group(1).strip()
+
+        data["diagnosis_codes"] = list(scan.findall("diagnosis_codes"))
+        data["procedure_codes"] = list(scan.findall("procedure_codes"))
+
+        return data
+
+    def _extract_vehicle_fields(self, scan: TextScan) -> Dict[str, Any]:
+        """VIN, license plates, vehicle and damage description"""
+        data = {}
+
+        vin_match = scan.search("vin")
+        if vin_match:
+            data["vin"] = vin_match.group()
+
+        plates = scan.findall("license_plates")
+        if plates:
+            data["license_plates"] = list(plates)
+
+        match = self._first_match(scan, "vehicle")
+        if match:
+            if len(match.groups()) == 3:
+                data["vehicle_year"] = match.group(1)
+                data["vehicle_make"] = match.group(2)
+                data["vehicle_model"] = match.group(3)
+            else:
+                data["vehicle_info"] = match.group(1).strip()
+
+        match = self._first_match(scan, "damage_description")
+        if match:
+            data["damage_description"] = match.group(1).strip()
+
+        return data
+
+    def _extract_invoice_fields(self, scan: TextScan) -> Dict[str, Any]:
+        """Invoice number, vendor and tax amount (invoices and receipts)"""
+        data = {}
+
+        match = self._first_match(scan, "invoice_number")
+        if match:
+            data["invoice_number"] = match.group(1)
+
+        match = self._first_match(scan, "vendor")
+        if match:
+            data["vendor"] = match.group(1).strip()
+
+        match = scan.search("tax_amount")
+        if match:
+            data["tax_amount"] = float(match.group(1))
+
+        return data
@@ -2,22 +2,150 @@ import asyncio
 import time
 import re
 import json
-from typing import Dict, Any, List, Optional
+import threading
+from functools import partial
+from typing import Dict, Any, List, Optional, Tuple
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import StandardScaler
 import pickle
 from loguru import logger
 from datetime import datetime, timedelta
 import hashlib
 
+from utils.worker_pool import get_worker_pools
+from utils.logger import log_performance
+from utils.text_patterns import PatternSet, TextPattern, TextScan
+from utils.text_context import TextAnalysisContext
+from services.fraud_models import (
+    FraudModels, anomaly_feature_matrix, current_model_version, load_fraud_models, retrain_fraud_models
+)
+from sklearn.metrics import roc_auc_score
+
+# Terms the per-claim-type consistency checks look for
+HEALTH_CONSISTENCY_TERMS = ["surgery", "outpatient", "minor", "same day", "emergency", "routine", "chronic", "sudden"]
+VEHICLE_CONSISTENCY_TERMS = [
+    "minor damage", "total loss", "severe", "major", "low speed", "extensive damage", "parking lot", "high speed"
+]
+GENERAL_CONTRADICTIONS = [
+    (["new", "brand new"], ["old", "used", "worn"]),
+    (["expensive", "costly"], ["cheap", "inexpensive"]),
+    (["working", "functional"], ["broken", "damaged"]),
+]
+
+# Features combined into the fraud score, in summation order: (weight, normalization)
+FRAUD_SCORE_WEIGHTS = {
+    "fraud_keyword_ratio": (0.25, "ratio"),
+    "amount_anomaly_score": (0.20, "unit"),
+    "suspicious_pattern_count": (0.15, "count"),
+    "consistency_score": (0.15, "inverse"),
+    "amount_consistency": (0.10, "capped"),
+    "round_amount_ratio": (0.10, "ratio"),
+    "missing_info_count": (0.05, "count"),
+    # Trained models (services/fraud_models.py); absent, and not weighted, until models are loaded
+    "text_model_score": (0.20, "unit"),
+    "anomaly_score": (0.15, "unit"),
+}
+
+
+_MISSING = object()
+
+
+def _at_most_one(values: np.ndarray) -> np.ndarray:
+    """min(1.0, v) element-wise, with Python's NaN behaviour (min(1.0, nan) is 1.0)"""
+    return np.where(values < 1.0, values, 1.0)
+
+
+def _at_least_zero(values: np.ndarray) -> np.ndarray:
+    """max(0.0, v) element-wise, with Python's NaN behaviour (max(0.0, nan) is 0.0)"""
+    return np.where(values > 0.0, values, 0.0)
+
+
+# How each kind of feature maps to [0, 1] fraud risk
+SCORE_NORMALIZATIONS = {
+    "inverse": lambda v: 1.0 - v,  # Lower consistency = higher risk
+    "ratio": lambda v: _at_most_one(v * 5),  # Scale up small ratios
+    "count": lambda v: _at_most_one(v * 0.2),  # Scale down counts
+    "capped": _at_most_one,  # Higher inconsistency = higher risk
+    "unit": lambda v: _at_most_one(_at_least_zero(v)),
+}
+
+
+def fraud_feature_matrix(features: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """N x F matrix of the scored features of N claims (columns in FRAUD_SCORE_WEIGHTS order),
+    and whether each claim has each feature"""
+    values = np.zeros((len(features), len(FRAUD_SCORE_WEIGHTS)), dtype=np.float64)
+    present = np.zeros((len(features), len(FRAUD_SCORE_WEIGHTS)), dtype=bool)
+    for j, name in enumerate(FRAUD_SCORE_WEIGHTS):
+        column = [claim_features.get(name, _MISSING) for claim_features in features]
+        present[:, j] = [value is not _MISSING for value in column]
+        values[:, j] = [0.0 if value is _MISSING else value for value in column]
+    return values, present
+
+
+def score_fraud_features(values: np.ndarray, present: np.ndarray) -> np.ndarray:
+    """
+    Fraud scores of N claims at once from their feature matrix.
+
+    Each column is normalized and weighted as a whole and the columns are summed in
+    FRAUD_SCORE_WEIGHTS order, so every claim's score goes through exactly the
+    floating-point operations of scoring it alone: batch and single scores are equal.
+    """
+    scores = np.zeros(values.shape[0], dtype=np.float64)
+    weight_sums = np.zeros(values.shape[0], dtype=np.float64)
+    for j, (weight, normalization) in enumerate(FRAUD_SCORE_WEIGHTS.values()):
+        column_present = present[:, j]
+        normalized = SCORE_NORMALIZATIONS[normalization](values[:, j])
+        scores = np.where(column_present, scores + weight * normalized, scores)
+        weight_sums = np.where(column_present, weight_sums + weight, weight_sums)
+    
+    # Normalize final score
+    has_weight = weight_sums > 0
+    scores = np.where(has_weight, scores / np.where(has_weight, weight_sums, 1.0), scores)
+    return _at_most_one(_at_least_zero(scores))
+
+
+def add_model_scores(models: FraudModels, features: List[Dict[str, Any]], texts: List[str]):
+    """Add the models' text and anomaly scores to each claim's features
+    (all claims' isolation-forest walks in one vectorized pass)"""
+    text_scores = [models.text_score(text) for text in texts]
+    anomaly_scores = models.anomaly_scores(anomaly_feature_matrix(features)).tolist()
+    for claim_features, text_score, anomaly_score in zip(features, text_scores, anomaly_scores):
+        claim_features["text_model_score"] = text_score
+        claim_features["anomaly_score"] = anomaly_score
+
+
+def holdout_fraud_auc(
+    models: Optional[FraudModels],
+    claims: List[Dict[str, Any]],
+    features: List[Dict[str, Any]]
+) -> float:
+    """ROC AUC of the full fraud score of labeled claims, scored with the given models
+    (None: heuristics only; features as _extract_claim_features returned them)"""
+    features = [dict(claim_features) for claim_features in features]
+    if models is not None:
+        add_model_scores(models, features, [claim["text"] for claim in claims])
+    scores = score_fraud_features(*fraud_feature_matrix(features))
+    return round(float(roc_auc_score([claim["is_fraud"] for claim in claims], scores)), 4)
+
 class FraudDetectionService:
-    def __init__(self):
+    def __init__(
+        self,
+        model_dir: Optional[str] = None,
+        reload_check_seconds: float = 5.0,
+        retrain_holdout_fraction: float = 0.2,
+        retrain_max_auc_drop: float = 0.01
+    ):
         self.model_ready = False
-        self.tfidf_vectorizer = None
-        self.isolation_forest = None
-        self.scaler = None
+        self.model_dir = model_dir
+        self.models: Optional[FraudModels] = None
+        self.model_loaded_at: Optional[float] = None
+        
+        # Hot-swap of model versions made current by retraining (here or in another worker)
+        self.reload_check_seconds = reload_check_seconds
+        self.retrain_holdout_fraction = retrain_holdout_fraction
+        self.retrain_max_auc_drop = retrain_max_auc_drop
+        self._model_swap_lock = threading.Lock()
+        self._model_checked_at = time.monotonic()
+        self.last_retrain: Optional[Dict[str, Any]] = None
         
         # Fraud indicators and patterns
         self.fraud_keywords = [
@@ -29,7 +157,6 @@ class FraudDetectionService:
         self.suspicious_patterns = {
             "round_numbers": r'\b\d+00\.00\b',  # Suspicious round amounts
             "duplicate_amounts": r'(\$\d+\.?\d*)',  # Check for duplicate amounts
-            "inconsistent_dates": r'\d{1,2}/\d{1,2}/\d{4}',
             "missing_info": [r'N/A', r'Unknown', r'TBD', r'--'],
         }
         
@@ -43,6 +170,24 @@ class FraudDetectionService:
             "agricultural": {"low": 1000, "high": 500000, "avg": 25000}
         }
         
+        # Keyword lists and regexes above, compiled once and scanned in one keyword pass per text
+        self.text_patterns = PatternSet(
+            keywords={
+                "fraud": self.fraud_keywords,
+                "consistency": HEALTH_CONSISTENCY_TERMS + VEHICLE_CONSISTENCY_TERMS + [
+                    term for terms in GENERAL_CONTRADICTIONS for group in terms for term in group
+                ],
+            },
+            patterns=[
+                TextPattern("round_numbers", self.suspicious_patterns["round_numbers"], anchors=("00.00",)),
+                TextPattern("duplicate_amounts", self.suspicious_patterns["duplicate_amounts"], anchors=("$",)),
+            ] + [
+                # Plain literals, so the lowercased literal is its own anchor
+                TextPattern(f"missing_info:{pattern}", pattern, re.IGNORECASE, anchors=(pattern.lower(),))
+                for pattern in self.suspicious_patterns["missing_info"]
+            ]
+        )
+        
         # Fraud score cache
         self.fraud_cache = {}
     
@@ -51,24 +196,8 @@ class FraudDetectionService:
         try:
             logger.info("🔧 Initializing Fraud Detection Service...")
             
-            # Initialize TF-IDF vectorizer for text analysis
-            self.tfidf_vectorizer = TfidfVectorizer(
-                max_features=1000,
-                stop_words='english',
-                ngram_range=(1, 2)
-            )
-            
-            # Initialize Isolation Forest for anomaly detection
-            self.isolation_forest = IsolationForest(
-                contamination=0.1,  # Expect 10% anomalies
-                random_state=42
-            )
-            
-            # Initialize scaler
-            self.scaler = StandardScaler()
-            
-            # Load pre-trained models if available
-            await self._load_models()
+            # Load trained models if available (heuristic scoring otherwise)
+            self._load_models()
             
             self.model_ready = True
             logger.info("✅ Fraud Detection Service initialized")
@@ -81,97 +210,194 @@ class FraudDetectionService:
         """Check if fraud detection service is ready"""
         return self.model_ready
     
-    async def analyze_text(self, text: str, claim_type: str, requested_amount: float) -> Dict[str, Any]:
-        """Analyze text content for fraud indicators"""
+    @property
+    def model_version(self) -> Optional[str]:
+        """Version of the trained models in use (None: heuristics only)"""
+        models = self.models
+        return models.version if models is not None else None
+    
+    async def analyze_text(
+        self,
+        text: str,
+        claim_type: str,
+        requested_amount: float,
+        text_context: Optional[TextAnalysisContext] = None
+    ) -> Dict[str, Any]:
+        """Analyze text content for fraud indicators (runs on the CPU thread pool)
+
+        Pass the TextAnalysisContext already built for this text (e.g. by validation)
+        to reuse its tokens, statistics and scans.
+        """
+        return await get_worker_pools().run_in_thread(
+            self._analyze_text_sync, text, claim_type, requested_amount, text_context
+        )
+    
+    def _analyze_text_sync(
+        self,
+        text: str,
+        claim_type: str,
+        requested_amount: float,
+        text_context: Optional[TextAnalysisContext] = None
+    ) -> Dict[str, Any]:
+        """Run the full fraud feature pipeline on one text"""
         try:
             logger.info(f"🔍 Analyzing text for fraud (claim_type: {claim_type}, amount: {requested_amount})")
             
-            # Generate text features
-            text_features = await self._extract_text_features(text)
-            
-            # Analyze amounts
-            amount_features = await self._analyze_amounts(text, claim_type, requested_amount)
-            
-            # Check for suspicious patterns
-            pattern_features = await self._check_suspicious_patterns(text)
-            
-            # Consistency analysis
-            consistency_features = await self._analyze_consistency(text, claim_type)
-            
-            # Combine all features
-            combined_features = {
-                **text_features,
-                **amount_features,
-                **pattern_features,
-                **consistency_features
-            }
+            combined_features = self._extract_claim_features(text, claim_type, requested_amount, text_context)
+            model_version = self._add_model_scores([combined_features], [text])
             
             # Calculate overall fraud score
-            fraud_score = await self._calculate_fraud_score(combined_features)
+            fraud_score = self._calculate_fraud_score(combined_features)
             
             # Generate fraud analysis report
-            report = await self._generate_fraud_report(combined_features, fraud_score, claim_type)
+            report = self._generate_fraud_report(combined_features, fraud_score, claim_type, model_version)
             
             return report
             
         except Exception as e:
             logger.error(f"❌ Error in fraud analysis: {e}")
-            return {
-                "fraud_score": 0.5,  # Neutral score on error
-                "issues": [f"Analysis error: {str(e)}"],
-                "confidence": 0.0
-            }
+            return self._error_report(e)
     
-    async def _extract_text_features(self, text: str) -> Dict[str, Any]:
+    async def analyze_texts(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Analyze many claims at once (runs on the CPU thread pool)
+
+        Each item has "text", "claim_type" and "requested_amount" (and optionally
+        "text_context"). Returns one report per item, in order, identical to what
+        analyze_text returns for that item.
+        """
+        return await get_worker_pools().run_in_thread(self._analyze_texts_sync, batch)
+    
+    def _analyze_texts_sync(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Extract every claim's features, then score all of them in one vectorized pass"""
+        start_time = time.perf_counter()
+        reports: List[Optional[Dict[str, Any]]] = [None] * len(batch)
+        scored: List[int] = []
+        features: List[Dict[str, Any]] = []
+        
+        for i, item in enumerate(batch):
+            try:
+                features.append(self._extract_claim_features(
+                    item["text"], item["claim_type"], item["requested_amount"], item.get("text_context")
+                ))
+                scored.append(i)
+            except Exception as e:
+                logger.error(f"❌ Error in fraud analysis of batch item {i}: {e}")
+                reports[i] = self._error_report(e)
+        
+        model_version = self._add_model_scores(features, [batch[i]["text"] for i in scored])
+        
+        feature_seconds = time.perf_counter() - start_time
+        try:
+            scores = score_fraud_features(*fraud_feature_matrix(features)).tolist()
+        except Exception as e:
+            logger.error(f"❌ Error calculating fraud scores: {e}")
+            scores = [self._calculate_fraud_score(claim_features) for claim_features in features]
+        
+        for i, claim_features, fraud_score in zip(scored, features, scores):
+            try:
+                reports[i] = self._generate_fraud_report(
+                    claim_features, fraud_score, batch[i]["claim_type"], model_version
+                )
+            except Exception as e:
+                logger.error(f"❌ Error in fraud analysis of batch item {i}: {e}")
+                reports[i] = self._error_report(e)
+        
+        logger.info(
+            f"🔍 Analyzed {len(batch)} claims for fraud in {time.perf_counter() - start_time:.2f}s "
+            f"(features {feature_seconds:.2f}s)"
+        )
+        return reports
+    
+    def _extract_claim_features(
+        self,
+        text: str,
+        claim_type: str,
+        requested_amount: float,
+        text_context: Optional[TextAnalysisContext] = None
+    ) -> Dict[str, Any]:
+        """Every feature of one claim (text, amounts, suspicious patterns, consistency)"""
+        # Tokens and statistics computed once; one keyword pass, regexes only where their literals occur
+        ctx = text_context if text_context is not None else TextAnalysisContext(text)
+        scan = ctx.scan(self.text_patterns)
+        
+        # Generate text features
+        text_features = self._extract_text_features(ctx, scan)
+        
+        # Analyze amounts
+        amount_features = self._analyze_amounts(ctx, claim_type, requested_amount)
+        
+        # Check for suspicious patterns
+        pattern_features = self._check_suspicious_patterns(ctx, scan)
+        
+        # Consistency analysis
+        consistency_features = self._analyze_consistency(scan, claim_type)
+        
+        # Combine all features
+        return {
+            **text_features,
+            **amount_features,
+            **pattern_features,
+            **consistency_features
+        }
+    
+    def _add_model_scores(self, features: List[Dict[str, Any]], texts: List[str]) -> Optional[str]:
+        """Add the current models' scores to each claim's features (add_model_scores).
+        Returns the version that scored them, None if claims were scored on heuristics only."""
+        self._refresh_models()
+        models = self.models  # One version for every claim, even if another is swapped in meanwhile
+        if models is None or not features:
+            return None
+        try:
+            add_model_scores(models, features, texts)
+        except Exception as e:
+            for claim_features in features:
+                claim_features.pop("text_model_score", None)
+                claim_features.pop("anomaly_score", None)
+            logger.warning(f"⚠️ Fraud model scoring failed, using heuristics only: {e}")
+            return None
+        return models.version
+    
+    def _error_report(self, error: Exception) -> Dict[str, Any]:
+        return {
+            "fraud_score": 0.5,  # Neutral score on error
+            "issues": [f"Analysis error: {str(error)}"],
+            "confidence": 0.0,
+            "model_version": None
+        }
+    
+    def _extract_text_features(self, ctx: TextAnalysisContext, scan: TextScan) -> Dict[str, Any]:
         """Extract features from text content"""
         features = {}
         
         # Basic text statistics
-        features["text_length"] = len(text)
-        features["word_count"] = len(text.split())
-        features["sentence_count"] = len(text.split('.'))
+        features["text_length"] = len(ctx.text)
+        features["word_count"] = ctx.word_count
+        features["sentence_count"] = ctx.sentence_count
         
         # Fraud keyword analysis
-        fraud_keyword_count = 0
-        detected_keywords = []
-        text_lower = text.lower()
-        
-        for keyword in self.fraud_keywords:
-            if keyword in text_lower:
-                fraud_keyword_count += 1
-                detected_keywords.append(keyword)
+        detected_keywords = scan.keywords("fraud")
+        fraud_keyword_count = len(detected_keywords)
         
         features["fraud_keyword_count"] = fraud_keyword_count
         features["fraud_keyword_ratio"] = fraud_keyword_count / max(features["word_count"], 1)
         features["detected_fraud_keywords"] = detected_keywords
         
         # Language analysis
-        features["uppercase_ratio"] = sum(1 for c in text if c.isupper()) / max(len(text), 1)
-        features["punctuation_ratio"] = sum(1 for c in text if c in '!@#$%^&*()') / max(len(text), 1)
+        char_counts = ctx.char_counts
+        features["uppercase_ratio"] = char_counts["upper"] / max(len(ctx.text), 1)
+        features["punctuation_ratio"] = char_counts["punctuation"] / max(len(ctx.text), 1)
         
         # Repetition analysis
-        words = text.lower().split()
-        unique_words = set(words)
-        features["word_repetition_ratio"] = 1 - (len(unique_words) / max(len(words), 1))
+        features["word_repetition_ratio"] = 1 - (ctx.unique_word_count / max(ctx.word_count, 1))
         
         return features
     
-    async def _analyze_amounts(self, text: str, claim_type: str, requested_amount: float) -> Dict[str, Any]:
+    def _analyze_amounts(self, ctx: TextAnalysisContext, claim_type: str, requested_amount: float) -> Dict[str, Any]:
         """Analyze monetary amounts for fraud indicators"""
         features = {}
         
-        # Extract all amounts from text
-        amount_pattern = r'\$?\s*\d{1,3}(?:,\d{3})*(?:\.\d{2})?'
-        amounts_text = re.findall(amount_pattern, text)
-        
-        amounts = []
-        for amount_str in amounts_text:
-            try:
-                clean_amount = re.sub(r'[^\d.]', '', amount_str)
-                if clean_amount and '.' in clean_amount:
-                    amounts.append(float(clean_amount))
-            except ValueError:
-                continue
+        # All amounts in the text (parsed once per text)
+        amounts = list(ctx.amounts)
         
         features["extracted_amounts"] = amounts
         features["amount_count"] = len(amounts)
@@ -204,184 +430,129 @@ class FraudDetectionService:
         
         return features
     
-    async def _check_suspicious_patterns(self, text: str) -> Dict[str, Any]:
+    def _check_suspicious_patterns(self, ctx: TextAnalysisContext, scan: TextScan) -> Dict[str, Any]:
         """Check for suspicious patterns in text"""
         features = {}
         suspicious_indicators = []
         
         # Check for round numbers
-        round_pattern = self.suspicious_patterns["round_numbers"]
-        round_matches = re.findall(round_pattern, text)
+        round_matches = scan.findall("round_numbers")
         if round_matches:
             suspicious_indicators.append(f"Round number amounts: {round_matches}")
         
         # Check for missing information patterns
         missing_info_count = 0
         for pattern in self.suspicious_patterns["missing_info"]:
-            if re.search(pattern, text, re.IGNORECASE):
+            if scan.search(f"missing_info:{pattern}"):
                 missing_info_count += 1
                 suspicious_indicators.append(f"Missing information indicator: {pattern}")
         
         features["missing_info_count"] = missing_info_count
         
         # Check for duplicate amounts
-        amounts = re.findall(self.suspicious_patterns["duplicate_amounts"], text)
+        amounts = scan.findall("duplicate_amounts")
         if len(amounts) != len(set(amounts)) and len(amounts) > 1:
             suspicious_indicators.append("Duplicate amounts detected")
         
         # Date consistency check
-        dates = re.findall(self.suspicious_patterns["inconsistent_dates"], text)
-        if len(dates) > 1:
+        if len(ctx.slash_dates) > 1:
             # Check if dates are inconsistent (basic check)
-            try:
-                parsed_dates = []
-                for date_str in dates:
-                    parts = date_str.split('/')
-                    if len(parts) == 3:
-                        month, day, year = int(parts[0]), int(parts[1]), int(parts[2])
-                        parsed_dates.append(datetime(year, month, day))
-                
-                if parsed_dates:
-                    date_range = max(parsed_dates) - min(parsed_dates)
-                    if date_range > timedelta(days=365):  # More than a year apart
-                        suspicious_indicators.append("Inconsistent dates detected")
-            except (ValueError, IndexError):
+            if ctx.parsed_slash_dates is None:
                 suspicious_indicators.append("Invalid date format detected")
+            elif ctx.parsed_slash_dates:
+                if ctx.slash_date_range > timedelta(days=365):  # More than a year apart
+                    suspicious_indicators.append("Inconsistent dates detected")
         
         features["suspicious_indicators"] = suspicious_indicators
         features["suspicious_pattern_count"] = len(suspicious_indicators)
         
         return features
     
-    async def _analyze_consistency(self, text: str, claim_type: str) -> Dict[str, Any]:
+    def _analyze_consistency(self, scan: TextScan, claim_type: str) -> Dict[str, Any]:
         """Analyze internal consistency of the claim"""
         features = {}
         consistency_issues = []
         
         # Claim type specific consistency checks
         if claim_type == "health":
-            consistency_issues.extend(await self._check_health_consistency(text))
+            consistency_issues.extend(self._check_health_consistency(scan))
         elif claim_type == "vehicle":
-            consistency_issues.extend(await self._check_vehicle_consistency(text))
+            consistency_issues.extend(self._check_vehicle_consistency(scan))
         elif claim_type in ["travel", "product_warranty", "pet", "agricultural"]:
-            consistency_issues.extend(await self._check_general_consistency(text))
+            consistency_issues.extend(self._check_general_consistency(scan))
         
         features["consistency_issues"] = consistency_issues
         features["consistency_score"] = max(0, 1 - (len(consistency_issues) * 0.2))
         
         return features
     
-    async def _check_health_consistency(self, text: str) -> List[str]:
+    def _check_health_consistency(self, scan: TextScan) -> List[str]:
         """Check health claim specific consistency"""
         issues = []
-        text_lower = text.lower()
         
         # Check for medical terminology consistency
-        if "surgery" in text_lower and "outpatient" in text_lower:
-            if "minor" not in text_lower and "same day" not in text_lower:
+        if scan.has("surgery") and scan.has("outpatient"):
+            if not scan.has("minor") and not scan.has("same day"):
                 issues.append("Surgery and outpatient treatment may be inconsistent")
         
         # Check for emergency vs routine
-        if "emergency" in text_lower and "routine" in text_lower:
+        if scan.has("emergency") and scan.has("routine"):
             issues.append("Emergency and routine treatment mentioned together")
         
         # Check for date consistency
-        if "chronic" in text_lower and "sudden" in text_lower:
+        if scan.has("chronic") and scan.has("sudden"):
             issues.append("Chronic and sudden condition mentioned together")
         
         return issues
     
-    async def _check_vehicle_consistency(self, text: str) -> List[str]:
+    def _check_vehicle_consistency(self, scan: TextScan) -> List[str]:
         """Check vehicle claim specific consistency"""
         issues = []
-        text_lower = text.lower()
         
         # Check damage vs severity
-        if "minor damage" in text_lower and any(word in text_lower for word in ["total loss", "severe", "major"]):
+        if scan.has("minor damage") and scan.any(["total loss", "severe", "major"]):
             issues.append("Minor damage inconsistent with severity indicators")
         
         # Check speed vs damage
-        if "low speed" in text_lower and "extensive damage" in text_lower:
+        if scan.has("low speed") and scan.has("extensive damage"):
             issues.append("Low speed inconsistent with extensive damage")
         
         # Check location consistency
-        if "parking lot" in text_lower and "high speed" in text_lower:
+        if scan.has("parking lot") and scan.has("high speed"):
             issues.append("High speed in parking lot seems inconsistent")
         
         return issues
     
-    async def _check_general_consistency(self, text: str) -> List[str]:
+    def _check_general_consistency(self, scan: TextScan) -> List[str]:
         """Check general consistency issues"""
         issues = []
-        text_lower = text.lower()
         
         # Check for contradictory statements
-        contradictions = [
-            (["new", "brand new"], ["old", "used", "worn"]),
-            (["expensive", "costly"], ["cheap", "inexpensive"]),
-            (["working", "functional"], ["broken", "damaged"]),
-        ]
-        
-        for positive_terms, negative_terms in contradictions:
-            has_positive = any(term in text_lower for term in positive_terms)
-            has_negative = any(term in text_lower for term in negative_terms)
+        for positive_terms, negative_terms in GENERAL_CONTRADICTIONS:
+            has_positive = scan.any(positive_terms)
+            has_negative = scan.any(negative_terms)
             
             if has_positive and has_negative:
                 issues.append(f"Contradictory terms detected: {positive_terms} vs {negative_terms}")
         
         return issues
     
-    async def _calculate_fraud_score(self, features: Dict[str, Any]) -> float:
+    def _calculate_fraud_score(self, features: Dict[str, Any]) -> float:
         """Calculate overall fraud score from features"""
         try:
-            fraud_score = 0.0
-            weight_sum = 0.0
-            
-            # Weight different feature categories
-            weights = {
-                "fraud_keyword_ratio": 0.25,
-                "amount_anomaly_score": 0.20,
-                "suspicious_pattern_count": 0.15,
-                "consistency_score": 0.15,
-                "amount_consistency": 0.10,
-                "round_amount_ratio": 0.10,
-                "missing_info_count": 0.05
-            }
-            
-            for feature_name, weight in weights.items():
-                if feature_name in features:
-                    value = features[feature_name]
-                    
-                    # Normalize different feature types
-                    if feature_name == "consistency_score":
-                        # Lower consistency score = higher fraud risk
-                        normalized_value = 1.0 - value
-                    elif feature_name in ["fraud_keyword_ratio", "round_amount_ratio"]:
-                        # Higher ratio = higher fraud risk
-                        normalized_value = min(1.0, value * 5)  # Scale up small ratios
-                    elif feature_name in ["suspicious_pattern_count", "missing_info_count"]:
-                        # Higher count = higher fraud risk
-                        normalized_value = min(1.0, value * 0.2)  # Scale down counts
-                    elif feature_name == "amount_consistency":
-                        # Higher inconsistency = higher fraud risk
-                        normalized_value = min(1.0, value)
-                    else:
-                        normalized_value = min(1.0, max(0.0, value))
-                    
-                    fraud_score += weight * normalized_value
-                    weight_sum += weight
-            
-            # Normalize final score
-            if weight_sum > 0:
-                fraud_score = fraud_score / weight_sum
-            
-            return min(1.0, max(0.0, fraud_score))
+            return float(score_fraud_features(*fraud_feature_matrix([features]))[0])
             
         except Exception as e:
             logger.error(f"❌ Error calculating fraud score: {e}")
             return 0.5  # Neutral score on error
     
-    async def _generate_fraud_report(self, features: Dict[str, Any], fraud_score: float, claim_type: str) -> Dict[str, Any]:
+    def _generate_fraud_report(
+        self,
+        features: Dict[str, Any],
+        fraud_score: float,
+        claim_type: str,
+        model_version: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Generate comprehensive fraud analysis report"""
         issues = []
         risk_factors = []
@@ -423,7 +594,8 @@ class FraudDetectionService:
             "issues": issues,
             "recommendation": self._get_recommendation(fraud_score, confidence),
             "feature_analysis": features,
-            "claim_type": claim_type
+            "claim_type": claim_type,
+            "model_version": model_version
         }
     
     def _calculate_confidence(self, features: Dict[str, Any], fraud_score: float) -> float:
@@ -464,23 +636,124 @@ class FraudDetectionService:
         else:
             return "standard_review"
     
-    async def _load_models(self):
-        """Load pre-trained models if available"""
+    def _load_models(self):
+        """Memory-map the current trained models of the model store, if any"""
+        if not self.model_dir:
+            logger.info("📂 No fraud model store configured, scoring with heuristics only")
+            return
         try:
-            # In a real implementation, load saved models
-            # For now, just log that we're using default models
-            logger.info("📂 Using default fraud detection models")
+            start_time = time.perf_counter()
+            models = load_fraud_models(self.model_dir)
+            if models is None:
+                logger.info(f"📂 No trained fraud models in {self.model_dir}, scoring with heuristics only")
+                return
+            self.models = models
+            self.model_loaded_at = time.time()
+            load_time = time.perf_counter() - start_time
+            logger.info(
+                f"📂 Loaded fraud models {models.version} in {load_time * 1000:.1f}ms "
+                f"({models.nbytes / 1e6:.1f}MB memory-mapped, {len(models.vocabulary)} terms)"
+            )
+            log_performance("fraud_model_load", load_time, {"version": models.version, "bytes": models.nbytes})
         except Exception as e:
-            logger.warning(f"⚠️ Could not load pre-trained models: {e}")
+            logger.warning(f"⚠️ Could not load trained fraud models from {self.model_dir}: {e}")
     
-    async def update_model(self, training_data: List[Dict[str, Any]]):
-        """Update fraud detection model with new data"""
+    def _swap_models(self, models: FraudModels):
+        """
+        Make a new model version current without blocking analyses.
+
+        The swap is one reference assignment: analyses already running keep the
+        version they started with, and new ones get the new version. Versions are
+        memory-mapped, so the new one costs no copy and the old one's pages are
+        released once its last analysis finishes.
+        """
+        previous_version = self.model_version
+        self.models = models
+        self.model_loaded_at = time.time()
+        logger.info(f"🔁 Fraud models swapped: {previous_version or 'heuristics only'} → {models.version}")
+    
+    def _refresh_models(self):
+        """Pick up a version made current by another worker's retraining (the store's
+        CURRENT file is checked at most every reload_check_seconds, by one thread)"""
+        if not self.model_dir or time.monotonic() - self._model_checked_at < self.reload_check_seconds:
+            return
+        if not self._model_swap_lock.acquire(blocking=False):
+            return  # Another thread is checking; keep scoring with the current version
         try:
-            logger.info("🔄 Updating fraud detection model...")
-            # In a real implementation, retrain models with new data
-            logger.info("✅ Model updated successfully")
+            self._model_checked_at = time.monotonic()
+            version = current_model_version(self.model_dir)
+            if version and version != self.model_version:
+                self._swap_models(load_fraud_models(self.model_dir, version))
         except Exception as e:
-            logger.error(f"❌ Error updating model: {e}")
+            logger.warning(f"⚠️ Could not load fraud models made current in {self.model_dir}: {e}")
+        finally:
+            self._model_swap_lock.release()
+    
+    async def update_model(self, training_data: List[Dict[str, Any]], deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Retrain on newly labeled claims and hot-swap the result in.
+
+        training_data items have "text", "claim_type", "requested_amount" and
+        "is_fraud". Training and holdout validation run on the process pool
+        (retrain_fraud_models), so analyses keep running at full speed on the
+        current version meanwhile. An accepted version is written to the model
+        store, swapped in here, and picked up by the other workers on their next
+        reload check. deadline (epoch seconds) is when the caller gives up: a
+        retraining still running then never makes its version current. Returns the
+        validation summary.
+        """
+        if not self.model_dir:
+            raise ValueError("No fraud model store configured")
+        
+        logger.info(f"🔄 Retraining fraud models on {len(training_data)} claims (current: {self.model_version})...")
+        start_time = time.perf_counter()
+        try:
+            result = await get_worker_pools().run_in_process(
+                partial(retrain_fraud_models, deadline=deadline), self.model_dir, training_data,
+                self.retrain_holdout_fraction, self.retrain_max_auc_drop
+            )
+        except asyncio.CancelledError:
+            # Timed out: the process keeps running but will not save past the deadline
+            self.last_retrain = {
+                "accepted": False, "reason": "Retraining timed out", "version": None, "finished_at": time.time()
+            }
+            logger.error(f"❌ Fraud model retraining on {len(training_data)} claims timed out")
+            raise
+        except Exception as e:
+            logger.error(f"❌ Error retraining fraud models: {e}")
+            raise
+        
+        if result["accepted"]:
+            with self._model_swap_lock:
+                self._swap_models(load_fraud_models(self.model_dir, result["version"]))
+            logger.info(
+                f"✅ Fraud models {result['version']} accepted "
+                f"(holdout AUC {result['holdout_auc']} vs {result['previous_holdout_auc']})"
+            )
+        elif result["reason"]:
+            logger.warning(f"⚠️ Fraud models not retrained: {result['reason']}")
+        else:
+            logger.warning(
+                f"⚠️ Retrained fraud models rejected: holdout AUC {result['holdout_auc']} "
+                f"vs {result['previous_holdout_auc']} for {result['previous_version'] or 'heuristics only'}"
+            )
+        
+        self.last_retrain = {**result, "finished_at": time.time()}
+        log_performance("fraud_model_retrain", time.perf_counter() - start_time, {
+            "claims": len(training_data), "accepted": result["accepted"], "version": result["version"]
+        })
+        return result
+    
+    def get_model_info(self) -> Dict[str, Any]:
+        """Trained model version in use and the last retraining (health endpoint)"""
+        models = self.models
+        return {
+            "version": models.version if models is not None else None,
+            "loaded_at": self.model_loaded_at,
+            "trained_at": models.manifest.get("created_at") if models is not None else None,
+            "metrics": models.manifest.get("metrics") if models is not None else None,
+            "last_retrain": self.last_retrain,
+        }
     
     def get_fraud_statistics(self) -> Dict[str, Any]:
         """Get fraud detection statistics"""
@@ -0,0 +1,594 @@
+import os
+import csv
+import json
+import time
+import argparse
+from contextlib import contextmanager
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import numpy as np
+from loguru import logger
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.ensemble import IsolationForest
+from sklearn.preprocessing import StandardScaler
+from sklearn.metrics import roc_auc_score
+from sklearn.utils.class_weight import compute_sample_weight
+
+from utils.file_lock import file_lock
+
+# Bump when the artifact layout changes (older artifacts are then ignored)
+FRAUD_MODEL_FORMAT = 1
+
+# File in the model store naming the version the service loads
+CURRENT_VERSION_FILE = "CURRENT"
+
+# A retraining with a deadline stops this long before it, so writing the version can't outlast it
+RETRAIN_DEADLINE_MARGIN_SECONDS = 1.0
+RETRAIN_LOCK_FILE = ".retrain.lock"
+
+TFIDF_PARAMS = {"max_features": 1000, "stop_words": "english", "ngram_range": (1, 2)}
+ISOLATION_FOREST_PARAMS = {"n_estimators": 100, "contamination": 0.1, "random_state": 42}
+# Samples each isolation tree draws (fewer when fewer legitimate claims are available). Training
+# from scratch needs this many legitimate claims; a forest of single-sample trees cannot score.
+FOREST_MAX_SAMPLES = 256
+MIN_FOREST_SAMPLES = 2
+
+# Heuristic claim features the isolation forest sees, in column order
+ANOMALY_FEATURES = [
+    "text_length", "word_count", "sentence_count", "fraud_keyword_count", "fraud_keyword_ratio",
+    "uppercase_ratio", "punctuation_ratio", "word_repetition_ratio", "amount_count",
+    "max_extracted_amount", "amount_consistency", "round_amount_ratio", "amount_anomaly_score",
+    "missing_info_count", "suspicious_pattern_count", "consistency_score",
+]
+
+# Arrays of a model version, one .npy file each (memory-mapped when loaded)
+MODEL_ARRAYS = [
+    "idf", "text_coef",                         # TF-IDF weights and the text classifier over them
+    "scaler_mean", "scaler_scale",              # StandardScaler of the anomaly features
+    "tree_roots", "tree_left", "tree_right",    # Isolation forest: every tree's nodes, concatenated
+    "tree_feature", "tree_threshold", "tree_path_length",
+]
+
+
+def average_path_length(n_samples: np.ndarray) -> np.ndarray:
+    """Average path length of an unsuccessful binary-search-tree search among n samples
+    (isolation forest's c(n): the depth a leaf of n samples still stands for)"""
+    n = np.asarray(n_samples, dtype=np.float64)
+    lengths = np.zeros_like(n)
+    lengths[n == 2] = 1.0
+    large = n > 2
+    lengths[large] = 2.0 * (np.log(n[large] - 1.0) + np.euler_gamma) - 2.0 * (n[large] - 1.0) / n[large]
+    return lengths
+
+
+def anomaly_feature_matrix(features: List[Dict[str, Any]]) -> np.ndarray:
+    """N x len(ANOMALY_FEATURES) matrix of claim features (missing or non-finite values clamped)"""
+    values = np.array(
+        [[float(claim_features.get(name, 0.0)) for name in ANOMALY_FEATURES] for claim_features in features],
+        dtype=np.float64
+    ).reshape(len(features), len(ANOMALY_FEATURES))
+    return np.nan_to_num(values, nan=0.0, posinf=1e12, neginf=-1e12)
+
+
+def _fraud_label(value: Any) -> int:
+    if isinstance(value, str):
+        return int(value.strip().lower() in ("1", "true", "yes", "fraud"))
+    return int(bool(value))
+
+
+def load_claims_corpus(path: str) -> List[Dict[str, Any]]:
+    """
+    Labeled claims from a JSONL or CSV file.
+
+    Each record has the claim "text" (or "description"), "claim_type",
+    "requested_amount" and "is_fraud" (true/false, 1/0 or "fraud").
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    return [
+        {
+            "text": row.get("text") or row.get("description") or "",
+            "claim_type": row.get("claim_type") or "health",
+            "requested_amount": float(row.get("requested_amount") or 0.0),
+            "is_fraud": _fraud_label(row.get("is_fraud", 0)),
+        }
+        for row in rows
+    ]
+
+
+def _export_forest(forest: IsolationForest) -> Dict[str, np.ndarray]:
+    """Every tree's nodes as flat arrays, children as global node indices.
+
+    Leaves are their own children, so walking a fixed number of levels is safe for
+    every tree, and each leaf stores its depth plus c(samples in the leaf).
+    """
+    roots, lefts, rights, features, thresholds, path_lengths = [], [], [], [], [], []
+    offset = 0
+    for estimator, estimator_features in zip(forest.estimators_, forest.estimators_features_):
+        tree = estimator.tree_
+        node_ids = np.arange(tree.node_count)
+        is_leaf = tree.children_left == -1
+
+        # Parents precede their children in sklearn's node order
+        depth = np.zeros(tree.node_count, dtype=np.float64)
+        for node in node_ids[~is_leaf]:
+            depth[tree.children_left[node]] = depth[node] + 1
+            depth[tree.children_right[node]] = depth[node] + 1
+
+        roots.append(offset)
+        lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+        rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+        features.append(np.asarray(estimator_features)[np.where(is_leaf, 0, tree.feature)])
+        thresholds.append(tree.threshold)
+        path_lengths.append(np.where(is_leaf, depth + average_path_length(tree.n_node_samples), 0.0))
+        offset += tree.node_count
+
+    return {
+        "tree_roots": np.array(roots, dtype=np.int64),
+        "tree_left": np.concatenate(lefts).astype(np.int64),
+        "tree_right": np.concatenate(rights).astype(np.int64),
+        "tree_feature": np.concatenate(features).astype(np.int64),
+        "tree_threshold": np.concatenate(thresholds).astype(np.float64),
+        "tree_path_length": np.concatenate(path_lengths),
+    }
+
+
+def train_fraud_models(
+    claims: List[Dict[str, Any]],
+    features: List[Dict[str, Any]],
+    holdout_fraction: float = 0.2,
+    random_state: int = 42
+) -> Dict[str, Any]:
+    """
+    Fit the text classifier, scaler and isolation forest on labeled claims.
+
+    `features` are the heuristic features FraudDetectionService extracts from each
+    claim. TF-IDF + logistic-loss SGD learns fraud language from the text; the
+    isolation forest learns what legitimate claims' features look like. A stratified
+    holdout is kept out of training to report ROC AUC. Returns the arrays and
+    manifest that save_fraud_models writes.
+    """
+    labels = np.array([claim["is_fraud"] for claim in claims], dtype=np.int64)
+    if len(set(labels.tolist())) < 2:
+        raise ValueError("Training corpus needs both fraudulent and legitimate claims")
+
+    texts = [claim["text"] for claim in claims]
+    X_features = anomaly_feature_matrix(features)
+    indices = np.arange(len(claims))
+    holdout = np.array([], dtype=np.int64)
+    split = stratified_holdout(labels, holdout_fraction, random_state) if holdout_fraction > 0 else None
+    if split is not None:
+        indices, holdout = split
+
+    vectorizer = TfidfVectorizer(**TFIDF_PARAMS)
+    X_text = vectorizer.fit_transform([texts[i] for i in indices])
+    classifier = SGDClassifier(loss="log_loss", alpha=1e-4, max_iter=50, tol=None, random_state=random_state)
+    classifier.fit(X_text, labels[indices], sample_weight=compute_sample_weight("balanced", labels[indices]))
+
+    # Anomalies are measured against legitimate claims
+    legitimate = indices[labels[indices] == 0]
+    scaler = StandardScaler().fit(X_features[legitimate])
+    forest = IsolationForest(max_samples=min(FOREST_MAX_SAMPLES, len(legitimate)), **ISOLATION_FOREST_PARAMS)
+    forest.fit(scaler.transform(X_features[legitimate]))
+
+    arrays = {
+        "idf": vectorizer.idf_.astype(np.float64),
+        "text_coef": classifier.coef_[0].astype(np.float64),
+        "scaler_mean": scaler.mean_.astype(np.float64),
+        "scaler_scale": scaler.scale_.astype(np.float64),
+        **_export_forest(forest),
+    }
+    manifest = {
+        "format": FRAUD_MODEL_FORMAT,
+        "tfidf": TFIDF_PARAMS,
+        "text_intercept": float(classifier.intercept_[0]),
+        "text_sgd_t": float(classifier.t_),  # SGD step counter, so updates continue the learning-rate schedule
+        "anomaly_features": ANOMALY_FEATURES,
+        "scaler": {"samples": int(scaler.n_samples_seen_), "var": scaler.var_.tolist()},
+        "isolation_forest": {
+            **ISOLATION_FOREST_PARAMS,
+            "max_samples": int(forest.max_samples_),
+            "depth": int(max(estimator.get_depth() for estimator in forest.estimators_)),
+            "threshold": float(-forest.offset_),  # Raw scores above this are the contamination share
+        },
+        "training": {
+            "claims": int(len(indices)),
+            "fraudulent": int(labels[indices].sum()),
+            "holdout_claims": int(len(holdout)),
+        },
+        "metrics": {},
+    }
+    vocabulary = {term: int(index) for term, index in vectorizer.vocabulary_.items()}
+
+    trained = {"manifest": manifest, "vocabulary": vocabulary, "arrays": arrays}
+    if len(holdout) and len(set(labels[holdout].tolist())) == 2:
+        models = FraudModels.from_trained(trained)
+        y = labels[holdout]
+        text_scores = np.array([models.text_score(texts[i]) for i in holdout])
+        anomaly_scores = models.anomaly_scores(X_features[holdout])
+        manifest["metrics"] = {
+            "text_model_auc": round(float(roc_auc_score(y, text_scores)), 4),
+            "anomaly_auc": round(float(roc_auc_score(y, anomaly_scores)), 4),
+        }
+    return trained
+
+
+def update_fraud_models(
+    base: "FraudModels",
+    claims: List[Dict[str, Any]],
+    features: List[Dict[str, Any]],
+    epochs: int = 5,
+    random_state: int = 42
+) -> Dict[str, Any]:
+    """
+    Continue training base models on newly labeled claims.
+
+    The text classifier resumes from the base coefficients with partial_fit, over
+    the base vocabulary and IDF (which stay fixed). An isolation forest cannot be
+    updated, so when the new legitimate claims can fill a tree's samples, the
+    scaler's running statistics absorb them and the forest is refit on them.
+    Otherwise the base scaler and forest are kept. Returns trained models in the
+    form train_fraud_models does.
+    """
+    labels = np.array([claim["is_fraud"] for claim in claims], dtype=np.int64)
+    manifest = json.loads(json.dumps({
+        key: value for key, value in base.manifest.items() if key not in ("version", "created_at", "source", "metrics")
+    }))
+    arrays = dict(base.arrays)
+
+    vectorizer = base.vectorizer()
+    X_text = vectorizer.transform([claim["text"] for claim in claims])
+    classifier = SGDClassifier(loss="log_loss", alpha=1e-4, random_state=random_state)
+    classifier.classes_ = np.array([0, 1])
+    classifier.n_features_in_ = X_text.shape[1]
+    classifier.coef_ = np.array(base.arrays["text_coef"], dtype=np.float64).reshape(1, -1)
+    classifier.intercept_ = np.array([manifest["text_intercept"]], dtype=np.float64)
+    classifier.t_ = manifest.get("text_sgd_t", 1.0)
+    sample_weight = compute_sample_weight("balanced", labels)
+    for _ in range(epochs):
+        classifier.partial_fit(X_text, labels, classes=classifier.classes_, sample_weight=sample_weight)
+    arrays["text_coef"] = classifier.coef_[0].copy()
+    manifest["text_intercept"] = float(classifier.intercept_[0])
+    manifest["text_sgd_t"] = float(classifier.t_)
+
+    X_legitimate = anomaly_feature_matrix([f for f, label in zip(features, labels) if label == 0])
+    forest_refit = len(X_legitimate) >= manifest["isolation_forest"]["max_samples"]
+    if forest_refit:
+        scaler_state = manifest.get("scaler") or {
+            "samples": manifest["training"]["claims"], "var": (np.asarray(base.arrays["scaler_scale"]) ** 2).tolist()
+        }
+        scaler = StandardScaler()
+        scaler.n_features_in_ = X_legitimate.shape[1]
+        scaler.n_samples_seen_ = np.int64(scaler_state["samples"])
+        scaler.mean_ = np.array(base.arrays["scaler_mean"], dtype=np.float64)
+        scaler.var_ = np.array(scaler_state["var"], dtype=np.float64)
+        scaler.scale_ = np.array(base.arrays["scaler_scale"], dtype=np.float64)
+        scaler.partial_fit(X_legitimate)
+
+        forest = IsolationForest(max_samples=min(FOREST_MAX_SAMPLES, len(X_legitimate)), **ISOLATION_FOREST_PARAMS)
+        forest.fit(scaler.transform(X_legitimate))
+        arrays.update(scaler_mean=scaler.mean_.copy(), scaler_scale=scaler.scale_.copy(), **_export_forest(forest))
+        manifest["scaler"] = {"samples": int(scaler.n_samples_seen_), "var": scaler.var_.tolist()}
+        manifest["isolation_forest"].update(
+            max_samples=int(forest.max_samples_),
+            depth=int(max(estimator.get_depth() for estimator in forest.estimators_)),
+            threshold=float(-forest.offset_),
+        )
+
+    training = manifest["training"]
+    manifest["training"] = {
+        "claims": training["claims"] + len(claims),
+        "fraudulent": training["fraudulent"] + int(labels.sum()),
+        "holdout_claims": training["holdout_claims"],
+        "updates": training.get("updates", 0) + 1,
+        "forest_refit": forest_refit,
+    }
+    return {"manifest": manifest, "vocabulary": base.vocabulary, "arrays": arrays}
+
+
+@contextmanager
+def _retrain_lock(store_dir: str):
+    """Serialize retraining across worker processes, so each builds on the last one's version"""
+    os.makedirs(store_dir, exist_ok=True)
+    with file_lock(os.path.join(store_dir, RETRAIN_LOCK_FILE)):
+        yield
+
+
+def stratified_holdout(labels: np.ndarray, holdout_fraction: float, random_state: int = 42):
+    """
+    Train and holdout indices with at least one claim of each class on both sides.
+
+    Each class is split on its own (holdout_fraction of it, at least one claim and
+    never all of them), so even a batch with two fraudulent claims among hundreds
+    holds one out. Returns None when a class has fewer than two claims.
+    """
+    rng = np.random.RandomState(random_state)
+    train, holdout = [], []
+    for label in (0, 1):
+        members = rng.permutation(np.flatnonzero(labels == label))
+        if len(members) < 2:
+            return None
+        n_holdout = min(max(1, int(round(len(members) * holdout_fraction))), len(members) - 1)
+        holdout.append(members[:n_holdout])
+        train.append(members[n_holdout:])
+    return np.sort(np.concatenate(train)), np.sort(np.concatenate(holdout))
+
+
+def retrain_fraud_models(
+    store_dir: str,
+    claims: List[Dict[str, Any]],
+    holdout_fraction: float = 0.2,
+    max_auc_drop: float = 0.01,
+    random_state: int = 42,
+    deadline: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Retrain the store's current models on newly labeled claims and make the result
+    current if it validates (runs in a background process: see
+    FraudDetectionService.update_model).
+
+    A stratified holdout of the claims, with claims of both classes, is kept out
+    of training (the retraining is rejected when the batch cannot provide one). The candidate is
+    the current version updated incrementally (update_fraud_models), or models
+    trained from scratch when the store is empty (which needs FOREST_MAX_SAMPLES
+    legitimate training claims). It replaces the current version unless its
+    holdout ROC AUC of the full fraud score is more than max_auc_drop below the
+    current version's, or below heuristics-only scoring's when the store is empty.
+    A candidate whose isolation trees draw fewer than MIN_FOREST_SAMPLES claims is
+    rejected. A run past its deadline (epoch seconds; the caller's job timeout)
+    never saves its version, since the caller has already reported it timed out.
+    Returns the validation summary and, if accepted, the new version.
+    """
+    from services.fraud_detection_service import FraudDetectionService, holdout_fraud_auc
+
+    start_time = time.perf_counter()
+    result = {
+        "accepted": False,
+        "reason": None,
+        "version": None,
+        "previous_version": None,
+        "incremental": False,
+        "training_claims": 0,
+        "holdout_claims": 0,
+        "holdout_auc": None,
+        "previous_holdout_auc": None,
+    }
+    labels = np.array([claim["is_fraud"] for claim in claims], dtype=np.int64)
+    split = stratified_holdout(labels, holdout_fraction, random_state)
+    if split is None:
+        result["reason"] = (
+            f"Need at least 2 fraudulent and 2 legitimate claims to hold out one of each "
+            f"(got {int(labels.sum())} fraudulent, {int(len(labels) - labels.sum())} legitimate)"
+        )
+        return result
+    train, holdout = split
+
+    with _retrain_lock(store_dir):
+        base = load_fraud_models(store_dir)
+        legitimate_training_claims = int(len(train) - labels[train].sum())
+        if base is None and legitimate_training_claims < FOREST_MAX_SAMPLES:
+            result["reason"] = (
+                f"Training from scratch needs at least {FOREST_MAX_SAMPLES} legitimate training claims "
+                f"(got {legitimate_training_claims})"
+            )
+            return result
+        service = FraudDetectionService()  # Heuristic features only: no models loaded
+        features = [
+            service._extract_claim_features(claim["text"], claim["claim_type"], claim["requested_amount"])
+            for claim in claims
+        ]
+        train_claims = [claims[i] for i in train]
+        train_features = [features[i] for i in train]
+        if base is None:
+            trained = train_fraud_models(train_claims, train_features, holdout_fraction=0.0)
+        else:
+            trained = update_fraud_models(base, train_claims, train_features, random_state=random_state)
+
+        forest_samples = trained["manifest"]["isolation_forest"]["max_samples"]
+        if forest_samples < MIN_FOREST_SAMPLES:
+            result["reason"] = f"Isolation forest trees would draw {forest_samples} claim(s) (minimum {MIN_FOREST_SAMPLES})"
+            return result
+
+        # An empty store is compared with heuristics-only scoring, which is what it replaces
+        holdout_claims = [claims[i] for i in holdout]
+        holdout_features = [features[i] for i in holdout]
+        candidate_auc = holdout_fraud_auc(FraudModels.from_trained(trained), holdout_claims, holdout_features)
+        previous_auc = holdout_fraud_auc(base, holdout_claims, holdout_features)
+        accepted = candidate_auc >= previous_auc - max_auc_drop
+
+        result.update(
+            accepted=accepted,
+            previous_version=base.version if base else None,
+            incremental=base is not None,
+            training_claims=len(train),
+            holdout_claims=len(holdout),
+            holdout_auc=candidate_auc,
+            previous_holdout_auc=previous_auc,
+        )
+        if accepted and deadline is not None and time.time() > deadline - RETRAIN_DEADLINE_MARGIN_SECONDS:
+            result.update(accepted=False, reason="Retraining passed its deadline; the version was not saved")
+        elif accepted:
+            trained["manifest"]["parent"] = result["previous_version"]
+            trained["manifest"]["metrics"] = {"holdout_auc": candidate_auc, "previous_holdout_auc": previous_auc}
+            result["version"] = save_fraud_models(trained, store_dir, source="retrain")
+        result["training_seconds"] = round(time.perf_counter() - start_time, 3)
+        return result
+
+
+def save_fraud_models(trained: Dict[str, Any], store_dir: str, source: Optional[str] = None) -> str:
+    """
+    Write trained models as a new version directory of the store and make it current.
+
+    The version is written to a temporary directory and renamed into place, and the
+    CURRENT file is replaced atomically, so a loading worker never sees half a version.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    created_at = datetime.now(timezone.utc)
+    version = f"fraud-{created_at:%Y%m%d-%H%M%S}"
+    suffix = 1
+    while os.path.exists(os.path.join(store_dir, version)):
+        suffix += 1
+        version = f"fraud-{created_at:%Y%m%d-%H%M%S}-{suffix}"
+
+    manifest = {**trained["manifest"], "version": version, "created_at": created_at.isoformat(), "source": source}
+    staging_dir = os.path.join(store_dir, f".{version}.tmp")
+    os.makedirs(staging_dir)
+    for name in MODEL_ARRAYS:
+        np.save(os.path.join(staging_dir, f"{name}.npy"), np.ascontiguousarray(trained["arrays"][name]))
+    with open(os.path.join(staging_dir, "vocabulary.json"), "w", encoding="utf-8") as f:
+        json.dump(trained["vocabulary"], f)
+    with open(os.path.join(staging_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.rename(staging_dir, os.path.join(store_dir, version))
+
+    pointer_tmp = os.path.join(store_dir, f".{CURRENT_VERSION_FILE}.tmp")
+    with open(pointer_tmp, "w", encoding="utf-8") as f:
+        f.write(version + "\n")
+    os.replace(pointer_tmp, os.path.join(store_dir, CURRENT_VERSION_FILE))
+    return version
+
+
+def current_model_version(store_dir: str) -> Optional[str]:
+    """Version named by the store's CURRENT file (None when nothing was trained yet)"""
+    try:
+        with open(os.path.join(store_dir, CURRENT_VERSION_FILE), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def load_fraud_models(store_dir: str, version: Optional[str] = None) -> Optional["FraudModels"]:
+    """Memory-map a version of the store (the current one by default); None if there is none"""
+    version = version or current_model_version(store_dir)
+    if not version:
+        return None
+    return FraudModels.load(os.path.join(store_dir, version))
+
+
+class FraudModels:
+    """
+    Trained fraud models of one artifact version, ready for inference.
+
+    Arrays are memory-mapped read-only from the version's .npy files, so every worker
+    process serving the same version shares one copy in the page cache (and pre-fork
+    workers inherit the master's mappings). Inference needs no sklearn estimator: the
+    text score is the TF-IDF vector of the claim's text through the logistic-loss
+    classifier, and the anomaly score walks all isolation trees at once with NumPy,
+    level by level, exactly as sklearn's IsolationForest scores samples.
+    """
+
+    def __init__(self, manifest: Dict[str, Any], vocabulary: Dict[str, int], arrays: Dict[str, np.ndarray]):
+        if manifest.get("format") != FRAUD_MODEL_FORMAT:
+            raise ValueError(f"Unsupported fraud model format: {manifest.get('format')}")
+        self.manifest = manifest
+        self.version = manifest.get("version")
+        self.vocabulary = vocabulary
+        self.arrays = arrays
+
+        tfidf_params = dict(manifest["tfidf"], ngram_range=tuple(manifest["tfidf"]["ngram_range"]))
+        self._analyzer = TfidfVectorizer(**tfidf_params).build_analyzer()
+        self._text_intercept = manifest["text_intercept"]
+
+        forest = manifest["isolation_forest"]
+        self._depth = forest["depth"]
+        self._threshold = forest["threshold"]
+        self._path_normalizer = len(arrays["tree_roots"]) * float(average_path_length([forest["max_samples"]])[0])
+
+    @classmethod
+    def load(cls, model_dir: str) -> "FraudModels":
+        with open(os.path.join(model_dir, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        with open(os.path.join(model_dir, "vocabulary.json"), encoding="utf-8") as f:
+            vocabulary = json.load(f)
+        arrays = {name: np.load(os.path.join(model_dir, f"{name}.npy"), mmap_mode="r") for name in MODEL_ARRAYS}
+        return cls(manifest, vocabulary, arrays)
+
+    @classmethod
+    def from_trained(cls, trained: Dict[str, Any]) -> "FraudModels":
+        """In-memory models straight from train_fraud_models (e.g. to evaluate before saving)"""
+        return cls(trained["manifest"], trained["vocabulary"], trained["arrays"])
+
+    def vectorizer(self) -> TfidfVectorizer:
+        """A fitted TfidfVectorizer with this version's vocabulary and IDF (for retraining)"""
+        tfidf_params = dict(self.manifest["tfidf"], ngram_range=tuple(self.manifest["tfidf"]["ngram_range"]))
+        vectorizer = TfidfVectorizer(**tfidf_params)
+        vectorizer.vocabulary_ = dict(self.vocabulary)
+        vectorizer.idf_ = np.array(self.arrays["idf"], dtype=np.float64)
+        return vectorizer
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self.arrays.values())
+
+    def text_score(self, text: str) -> float:
+        """Probability the text model gives the claim text of being fraudulent"""
+        counts = Counter()
+        for term in self._analyzer(text):
+            index = self.vocabulary.get(term)
+            if index is not None:
+                counts[index] += 1
+
+        decision = self._text_intercept
+        if counts:
+            indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+            weights = np.fromiter(counts.values(), dtype=np.float64, count=len(counts)) * self.arrays["idf"][indices]
+            weights /= np.sqrt(np.dot(weights, weights))
+            decision += float(np.dot(weights, self.arrays["text_coef"][indices]))
+        return float(1.0 / (1.0 + np.exp(-decision)))
+
+    def raw_anomaly_scores(self, X: np.ndarray) -> np.ndarray:
+        """Isolation-forest anomaly scores of N feature rows (sklearn's -score_samples, in (0, 1])"""
+        arrays = self.arrays
+        # Trees split float32 features, as sklearn does
+        X = ((X - arrays["scaler_mean"]) / arrays["scaler_scale"]).astype(np.float32)
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(np.asarray(arrays["tree_roots"]), (X.shape[0], len(arrays["tree_roots"])))
+        for _ in range(self._depth):
+            go_left = X[rows, arrays["tree_feature"][nodes]] <= arrays["tree_threshold"][nodes]
+            nodes = np.where(go_left, arrays["tree_left"][nodes], arrays["tree_right"][nodes])
+        path_lengths = arrays["tree_path_length"][nodes].sum(axis=1)
+        return 2.0 ** (-path_lengths / self._path_normalizer)
+
+    def anomaly_scores(self, X: np.ndarray) -> np.ndarray:
+        """Anomaly of N feature rows in [0, 1]: 0 up to the training contamination threshold,
+        rising to 1 for the most isolated claims"""
+        raw = self.raw_anomaly_scores(X)
+        return np.clip((raw - self._threshold) / (1.0 - self._threshold), 0.0, 1.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Train the fraud text model and isolation forest on a labeled claims corpus "
+                    "and save them as a new version of the model store"
+    )
+    parser.add_argument("corpus", help="Labeled claims (.jsonl or .csv): text, claim_type, requested_amount, is_fraud")
+    parser.add_argument("--store", default=os.getenv("FRAUD_MODEL_PATH", "models/fraud"), help="Model store directory")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Share of claims held out for evaluation")
+    args = parser.parse_args()
+
+    from services.fraud_detection_service import FraudDetectionService
+
+    start_time = time.perf_counter()
+    claims = load_claims_corpus(args.corpus)
+    service = FraudDetectionService()  # Heuristic features only: no trained models loaded
+    features = [
+        service._extract_claim_features(claim["text"], claim["claim_type"], claim["requested_amount"])
+        for claim in claims
+    ]
+    trained = train_fraud_models(claims, features, holdout_fraction=args.holdout)
+    version = save_fraud_models(trained, args.store, source=os.path.abspath(args.corpus))
+
+    logger.info(
+        f"✅ Trained fraud models {version} on {len(claims)} claims in {time.perf_counter() - start_time:.1f}s "
+        f"(metrics: {trained['manifest']['metrics'] or 'no holdout'})"
+    )
+
+
+if __name__ == "__main__":
+    main()
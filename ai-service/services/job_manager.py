@@ -0,0 +1,378 @@
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Set
+from fastapi.encoders import jsonable_encoder
+from loguru import logger
+
+from utils.worker_pool import get_worker_pools
+
+# Job states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+FINISHED_STATES = (JOB_COMPLETED, JOB_FAILED)
+
+# Progress-only snapshot writes happen at most this often per job (seconds); status changes go out at once
+PROGRESS_PERSIST_INTERVAL = 1.0
+
+# Windows process query (see _windows_process_alive)
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+ERROR_ACCESS_DENIED = 5
+STILL_ACTIVE = 259
+
+
+class JobQueueFullError(Exception):
+    """Raised when the job queue cannot accept more work"""
+
+
+class Job:
+    """A long-running analysis tracked by the JobManager"""
+
+    def __init__(self, job_type: str, payload: Dict[str, Any], description: str = ""):
+        self.id = uuid.uuid4().hex
+        self.job_type = job_type
+        self.description = description
+        self.payload = payload
+        self.status = JOB_QUEUED
+        self.progress = {"completed": 0, "total": 0, "stage": "queued"}
+        self.result: Optional[Any] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.expires_at: Optional[float] = None
+        self.deadline: Optional[float] = None  # Epoch time the running job times out at
+        self.worker_pid = os.getpid()
+        self.on_update: Optional[Callable[["Job"], None]] = None
+
+    def update_progress(self, completed: int, total: int, stage: Optional[str] = None):
+        """Record progress (e.g. pages OCR'd out of total)"""
+        self.progress = {
+            "completed": completed,
+            "total": total,
+            "stage": stage or self.progress.get("stage", "running")
+        }
+        if self.on_update:
+            self.on_update(self)
+
+    def to_dict(self, include_result: bool = False) -> Dict[str, Any]:
+        data = {
+            "job_id": self.id,
+            "job_type": self.job_type,
+            "description": self.description,
+            "status": self.status,
+            "progress": dict(self.progress),
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "expires_at": self.expires_at,
+            "worker_pid": self.worker_pid
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
+
+
+class JobManager:
+    """
+    In-process job queue with a bounded number of workers.
+
+    Job state is mirrored to a shared directory so any pre-forked worker can
+    answer status and result polls for a job running in another worker.
+    Snapshots are deleted only once their job has finished and its expires_at
+    has passed; a queued or running job keeps its snapshot however long it
+    waits. Each job type can have its own timeout (register_handler), falling
+    back to job_timeout_seconds. Snapshots are written on the thread pool, one
+    writer per job that always writes the latest state, so progress updates and
+    large results never block the event loop.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_queue_size: int = 100,
+        result_ttl_seconds: int = 3600,
+        job_timeout_seconds: int = 300,
+        state_dir: str = "temp/jobs",
+    ):
+        self.workers = max(1, workers)
+        self.max_queue_size = max_queue_size
+        self.result_ttl_seconds = result_ttl_seconds
+        self.job_timeout_seconds = job_timeout_seconds
+        self.state_dir = state_dir
+
+        self.jobs: Dict[str, Job] = {}
+        self.handlers: Dict[str, Callable[[Job], Awaitable[Any]]] = {}
+        self.timeouts: Dict[str, int] = {}
+        self.queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._writers: Dict[str, asyncio.Task] = {}  # job id -> task writing its snapshots
+        self._dirty: Dict[str, bool] = {}  # job id -> unwritten change (True: progress only)
+        self._wakeups: Dict[str, asyncio.Event] = {}
+        self._last_writes: Dict[str, float] = {}  # job id -> when its snapshot was last written
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "expired": 0}
+
+    def register_handler(
+        self, job_type: str, handler: Callable[[Job], Awaitable[Any]], timeout_seconds: Optional[int] = None
+    ):
+        """Register the coroutine that executes jobs of a given type (and how long it may run)"""
+        self.handlers[job_type] = handler
+        self.timeouts[job_type] = timeout_seconds or self.job_timeout_seconds
+
+    async def start(self):
+        """Start worker and cleanup tasks"""
+        os.makedirs(self.state_dir, exist_ok=True)
+        self.queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._cleanup_loop()))
+        logger.info(f"🗂️ Job manager started with {self.workers} workers")
+
+    async def stop(self):
+        """Cancel workers; queued jobs are marked failed"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for job in self.jobs.values():
+            if job.status not in FINISHED_STATES:
+                self._finish(job, error="Service shutting down")
+        await asyncio.gather(*self._writers.values(), return_exceptions=True)
+
+    def submit(self, job_type: str, payload: Dict[str, Any], description: str = "") -> Job:
+        """Queue a job, raising JobQueueFullError when the queue is full"""
+        if job_type not in self.handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+
+        job = Job(job_type, payload, description)
+        job.on_update = lambda updated: self._persist(updated, progress_only=True)
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            raise JobQueueFullError(f"Job queue is full ({self.max_queue_size} jobs)")
+
+        self.jobs[job.id] = job
+        self.stats["submitted"] += 1
+        self._persist(job)
+        logger.info(f"🗂️ Job {job.id} queued ({job_type}: {description})")
+        return job
+
+    def get(self, job_id: str, include_result: bool = False) -> Optional[Dict[str, Any]]:
+        """Get a job snapshot from this worker or from the shared state directory"""
+        job = self.jobs.get(job_id)
+        if job is not None:
+            return job.to_dict(include_result)
+
+        path = self._state_path(job_id)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if data.get("expires_at") and data["expires_at"] < time.time():
+            return None
+        if not include_result:
+            data.pop("result", None)
+        return data
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and counters for the health endpoint"""
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "max_queue_size": self.max_queue_size,
+            "running": sum(1 for job in self.jobs.values() if job.status == JOB_RUNNING),
+            "tracked_jobs": len(self.jobs),
+            **self.stats
+        }
+
+    async def _worker(self, index: int):
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job: Job):
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+        job.progress["stage"] = "running"
+        self._persist(job)
+
+        timeout = self.timeouts.get(job.job_type, self.job_timeout_seconds)
+        job.deadline = job.started_at + timeout
+        try:
+            handler = self.handlers[job.job_type]
+            result = await asyncio.wait_for(handler(job), timeout=timeout)
+            job.result = jsonable_encoder(result)
+            self._finish(job)
+            logger.info(f"✅ Job {job.id} completed in {job.finished_at - job.started_at:.2f}s")
+        except asyncio.TimeoutError:
+            self._finish(job, error=f"Job timed out after {timeout}s")
+            logger.error(f"❌ Job {job.id} timed out")
+        except Exception as e:
+            self._finish(job, error=str(e))
+            logger.error(f"❌ Job {job.id} failed: {e}")
+
+    def _finish(self, job: Job, error: Optional[str] = None):
+        job.status = JOB_FAILED if error else JOB_COMPLETED
+        job.error = error
+        job.finished_at = time.time()
+        job.expires_at = job.finished_at + self.result_ttl_seconds
+        job.progress["stage"] = job.status
+        job.payload = None  # Release the uploaded content
+        self.stats["failed" if error else "completed"] += 1
+        self._persist(job)
+
+    def _persist(self, job: Job, progress_only: bool = False):
+        """Schedule a write of the job snapshot to the shared state directory"""
+        self._dirty[job.id] = self._dirty.get(job.id, True) and progress_only
+        if not progress_only and job.id in self._wakeups:
+            self._wakeups[job.id].set()
+        if job.id not in self._writers:
+            self._wakeups[job.id] = asyncio.Event()
+            self._writers[job.id] = asyncio.get_running_loop().create_task(self._write_snapshots(job))
+
+    async def _write_snapshots(self, job: Job):
+        """Write the job's latest state until no change is left unwritten (progress throttled)"""
+        wakeup = self._wakeups[job.id]
+        try:
+            while job.id in self._dirty:
+                delay = self._last_writes.get(job.id, 0.0) + PROGRESS_PERSIST_INTERVAL - time.time()
+                if self._dirty[job.id] and delay > 0:
+                    wakeup.clear()
+                    try:
+                        await asyncio.wait_for(wakeup.wait(), delay)  # Cut short by a status change
+                    except asyncio.TimeoutError:
+                        pass
+                del self._dirty[job.id]
+                snapshot = job.to_dict(include_result=job.status == JOB_COMPLETED)
+                await get_worker_pools().run_in_thread(self._write_snapshot, job.id, snapshot)
+                self._last_writes[job.id] = time.time()
+        finally:
+            self._writers.pop(job.id, None)
+            self._wakeups.pop(job.id, None)
+            if job.status in FINISHED_STATES:
+                self._last_writes.pop(job.id, None)
+
+    def _write_snapshot(self, job_id: str, snapshot: Dict[str, Any]):
+        """Atomically write a job snapshot (runs on the thread pool)"""
+        path = self._state_path(job_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"⚠️ Could not persist job {job_id}: {e}")
+
+    def _state_path(self, job_id: str) -> Optional[str]:
+        # Job ids are uuid4 hex; reject anything else before touching the filesystem
+        if len(job_id) != 32 or not all(c in "0123456789abcdef" for c in job_id):
+            return None
+        return os.path.join(self.state_dir, f"{job_id}.json")
+
+    async def _cleanup_loop(self):
+        while True:
+            await asyncio.sleep(60)
+            try:
+                self._expire_jobs()
+                await get_worker_pools().run_in_thread(self._expire_snapshots, set(self.jobs))
+            except Exception as e:
+                logger.warning(f"⚠️ Job cleanup failed: {e}")
+
+    def _expire_jobs(self):
+        now = time.time()
+        for job_id in [jid for jid, job in self.jobs.items() if job.expires_at and job.expires_at < now]:
+            del self.jobs[job_id]
+            self.stats["expired"] += 1
+
+    def _expire_snapshots(self, local_job_ids: Set[str]):
+        """
+        Remove expired snapshots left by any worker (runs on the thread pool).
+
+        A finished job's snapshot was last written when it finished, so only files
+        older than the TTL can have expired. Jobs in local_job_ids belong to this worker.
+        """
+        now = time.time()
+        for name in os.listdir(self.state_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.state_dir, name)
+            try:
+                if os.path.getmtime(path) + self.result_ttl_seconds >= now:
+                    continue
+                with open(path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            if data.get("status") in FINISHED_STATES:
+                if data.get("expires_at") and data["expires_at"] < now:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        continue
+            elif data.get("job_id") not in local_job_ids and not _process_alive(data.get("worker_pid")):
+                self._fail_orphan(path, data, now)
+
+    def _fail_orphan(self, path: str, data: Dict[str, Any], now: float):
+        """Mark a queued or running job whose worker is gone as failed, so it expires like any other"""
+        data.update(
+            status=JOB_FAILED,
+            error="Worker exited before the job finished",
+            finished_at=now,
+            expires_at=now + self.result_ttl_seconds,
+        )
+        data["progress"] = {**(data.get("progress") or {}), "stage": JOB_FAILED}
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+            logger.warning(f"⚠️ Job {data.get('job_id')} failed: worker {data.get('worker_pid')} exited")
+        except OSError as e:
+            logger.warning(f"⚠️ Could not persist job {data.get('job_id')}: {e}")
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    if sys.platform == "win32":
+        return _windows_process_alive(pid)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Exists, owned by another user
+    return True
+
+
+def _windows_process_alive(pid: int) -> bool:
+    # os.kill(pid, 0) would call TerminateProcess on Windows; query the process instead
+    import ctypes
+    from ctypes import wintypes
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if not handle:
+        return ctypes.get_last_error() == ERROR_ACCESS_DENIED  # Exists, owned by another user
+    try:
+        exit_code = wintypes.DWORD()
+        if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+            return True
+        return exit_code.value == STILL_ACTIVE
+    finally:
+        kernel32.CloseHandle(handle)
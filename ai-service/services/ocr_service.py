@@ -2,21 +2,297 @@ import asyncio
 import time
 import os
 import io
-from typing import Dict, Any, List, Optional
+import tempfile
+import threading
+import subprocess
+from collections import defaultdict
+from functools import partial
+from typing import Dict, Any, List, Optional, Callable, Union
 import cv2
 import numpy as np
 from PIL import Image
 import pytesseract
 import easyocr
-from pdf2image import convert_from_bytes
+from pdf2image import convert_from_path, pdfinfo_from_path
 from loguru import logger
 import re
 
+try:
+    import tesserocr  # In-process Tesseract API (optional, falls back to the pytesseract CLI)
+except ImportError:
+    tesserocr = None
+
+from utils.worker_pool import get_worker_pools
+from utils.uploads import DocumentContent, as_memoryview
+from utils.result_cache import get_result_cache, content_digest
+from utils.micro_batcher import MicroBatcher
+from utils.image_ingest import ingest_image, as_image_array
+from utils.logger import log_performance
+
+# Bump when OCR output for the same bytes changes (invalidates cached results)
+OCR_PIPELINE_VERSION = "ocr-7"
+
+# PDF page streaming defaults (overridden by AI_SERVICE_CONFIG in main.py)
+PDF_RENDER_DPI = 300
+PDF_RENDER_CHUNK_PAGES = 2     # Pages rasterized per pdftoppm call
+PDF_MAX_INFLIGHT_PAGES = 4     # Rendered pages held in memory at once (~25MB each at 300 dpi)
+PDF_TEXT_LAYER_MIN_CHARS = 20  # Embedded text shorter than this is treated as a scanned page
+
+# OCR engine strategies (selected per document_type by AI_SERVICE_CONFIG["ocr_strategy"])
+OCR_STRATEGIES = {
+    "cascade": ("easyocr", "tesseract"),         # EasyOCR, Tesseract only if EasyOCR is unsure
+    "cheapest_first": ("tesseract", "easyocr"),  # Fast Tesseract pass, escalate to EasyOCR if unsure
+    "race": ("easyocr", "tesseract"),            # Both at once, first confident result wins
+}
+DEFAULT_OCR_STRATEGY = "cascade"
+OCR_CONFIDENCE_THRESHOLD = 0.5  # A result must be strictly above this to stop other engines
+
+
+def extract_pdf_text_layer(pdf_path: str, page_count: int, timeout: int = 60) -> List[str]:
+    """Embedded text of every page via poppler's pdftotext ('' where a page has none)"""
+    completed = subprocess.run(
+        ["pdftotext", "-layout", "-enc", "UTF-8", pdf_path, "-"],
+        capture_output=True, timeout=timeout, check=True
+    )
+    # pdftotext ends every page with a form feed
+    pages = completed.stdout.decode("utf-8", errors="replace").split("\f")
+    return (pages + [""] * page_count)[:page_count]
+
+
+def is_usable_text_layer(text: str, min_chars: int = PDF_TEXT_LAYER_MIN_CHARS) -> bool:
+    """True if a page's embedded text looks like real text rather than a scan or broken encoding"""
+    visible = [c for c in text if not c.isspace()]
+    if len(visible) < min_chars:
+        return False
+    return sum(c.isalnum() for c in visible) / len(visible) >= 0.5
+
+
+def _page_ranges(pages: List[int], chunk_size: int):
+    """Group sorted page numbers into consecutive (first, last) ranges of at most chunk_size"""
+    start = 0
+    while start < len(pages):
+        end = start
+        while end + 1 < len(pages) and pages[end + 1] == pages[end] + 1 and end + 1 - start < chunk_size:
+            end += 1
+        yield pages[start], pages[end]
+        start = end + 1
+
+# EasyOCR reader shared with OCR worker processes. OCRService.initialize()
+# loads it in the parent, forked workers inherit it; otherwise each worker
+# creates its own on first use.
+_easyocr_reader = None
+
+
+def init_ocr_worker(torch_threads: int = 1):
+    """Process pool initializer: keep each OCR worker to a fixed thread budget"""
+    try:
+        import torch
+        torch.set_num_threads(max(1, torch_threads))
+    except Exception:
+        pass
+    cv2.setNumThreads(1)
+
+
+def _get_easyocr_reader():
+    global _easyocr_reader
+    if _easyocr_reader is None:
+        _easyocr_reader = easyocr.Reader(['en'], gpu=False)
+    return _easyocr_reader
+
+
+def easyocr_readtext(image: np.ndarray) -> List[Any]:
+    """Run EasyOCR in an OCR worker process"""
+    return _get_easyocr_reader().readtext(image, detail=1)
+
+
+def easyocr_readtext_batch(images: List[np.ndarray], recognizer_batch_size: int = 16) -> List[List[Any]]:
+    """Run EasyOCR over several images in an OCR worker process, batching recognition across them"""
+    reader = _get_easyocr_reader()
+    try:
+        return _easyocr_recognize_batched(reader, images, recognizer_batch_size)
+    except Exception as e:
+        logger.warning(f"⚠️ Batched EasyOCR recognition failed, falling back to per-image readtext: {e}")
+        return [reader.readtext(image, detail=1) for image in images]
+
+
+def _easyocr_recognize_batched(reader, images: List[np.ndarray], recognizer_batch_size: int) -> List[List[Any]]:
+    """
+    Detect text boxes per image, then recognize every box of every image in a few forward passes.
+    
+    On CPU, Reader.readtext() recognizes one box per forward pass, padding each crop to its
+    own width bucket. Crops are grouped by that same bucket here, so each crop is padded
+    exactly as in readtext() and results match. Each group then runs as one batched pass.
+    """
+    from easyocr import easyocr as easyocr_module
+    from easyocr.recognition import get_text
+    from easyocr.utils import get_image_list, reformat_input
+    
+    model_height = easyocr_module.imgH
+    ignore_char = ''.join(set(reader.character) - set(reader.lang_char))
+    
+    results: List[List[Any]] = []
+    groups = defaultdict(list)  # padded width -> [(image index, slot, (box, crop))]
+    for index, image in enumerate(images):
+        img, img_cv_grey = reformat_input(image)
+        horizontal_list, free_list = reader.detect(img, reformat=False)
+        horizontal_list, free_list = horizontal_list[0], free_list[0]
+        
+        slots: List[Any] = []
+        # Same order as Reader.recognize(): horizontal boxes, then free-form boxes
+        for h_list, f_list in [([box], []) for box in horizontal_list] + [([], [box]) for box in free_list]:
+            image_list, max_width = get_image_list(h_list, f_list, img_cv_grey, model_height=model_height)
+            for entry in image_list:
+                groups[int(max_width)].append((index, len(slots), entry))
+                slots.append(None)
+        results.append(slots)
+    
+    for max_width, entries in groups.items():
+        predictions = get_text(
+            reader.character, model_height, max_width, reader.recognizer, reader.converter,
+            [entry for _, _, entry in entries], ignore_char, 'greedy', 5, recognizer_batch_size,
+            0.1, 0.5, 0.003, 0, reader.device
+        )
+        for (index, slot, _), prediction in zip(entries, predictions):
+            results[index][slot] = prediction
+    
+    return results
+
+
+# Warm tesserocr engines of the current thread, one per page segmentation mode
+_tesseract_engines = threading.local()
+
+
+def _parse_psm(config: str) -> int:
+    match = re.search(r'--psm\s+(\d+)', config)
+    return int(match.group(1)) if match else 3
+
+
+def _get_tesseract_engine(psm: int):
+    engines = getattr(_tesseract_engines, "by_psm", None)
+    if engines is None:
+        engines = _tesseract_engines.by_psm = {}
+    if psm not in engines:
+        engines[psm] = tesserocr.PyTessBaseAPI(lang='eng', psm=psm)
+    return engines[psm]
+
+
+def tesseract_read(image: np.ndarray, config: str):
+    """
+    Run Tesseract once in an OCR worker process, returning (text, image_to_data-style dict).
+    
+    With tesserocr, each worker thread keeps a warm engine per PSM, recognizes the page once
+    and reads both the text and the word boxes from that result. Without it, one
+    image_to_data call is made and the text is rebuilt from its lines.
+    """
+    if tesserocr is not None:
+        return _tesserocr_read(image, _parse_psm(config))
+    data = pytesseract.image_to_data(image, config=config, output_type=pytesseract.Output.DICT)
+    return _text_from_data(data), data
+
+
+def _tesserocr_read(image: np.ndarray, psm: int):
+    api = _get_tesseract_engine(psm)
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    height, width = image.shape[:2]
+    channels = 1 if image.ndim == 2 else image.shape[2]
+    api.SetImageBytes(image.tobytes(), width, height, channels, width * channels)
+    try:
+        api.Recognize()
+        text = api.GetUTF8Text()
+        
+        data = {key: [] for key in ('block_num', 'par_num', 'line_num', 'word_num', 'left', 'top', 'width', 'height', 'conf', 'text')}
+        iterator = api.GetIterator()
+        if iterator is not None:
+            level = tesserocr.RIL.WORD
+            block_num = par_num = line_num = word_num = 0
+            for word in tesserocr.iterate_level(iterator, level):
+                if word.IsAtBeginningOf(tesserocr.RIL.BLOCK):
+                    block_num, par_num, line_num, word_num = block_num + 1, 0, 0, 0
+                if word.IsAtBeginningOf(tesserocr.RIL.PARA):
+                    par_num, line_num, word_num = par_num + 1, 0, 0
+                if word.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+                    line_num, word_num = line_num + 1, 0
+                word_num += 1
+                box = word.BoundingBox(level)
+                if box is None:
+                    continue
+                left, top, right, bottom = box
+                data['block_num'].append(block_num)
+                data['par_num'].append(par_num)
+                data['line_num'].append(line_num)
+                data['word_num'].append(word_num)
+                data['left'].append(left)
+                data['top'].append(top)
+                data['width'].append(right - left)
+                data['height'].append(bottom - top)
+                data['conf'].append(word.Confidence(level))
+                data['text'].append(word.GetUTF8Text(level) or '')
+        return text, data
+    finally:
+        api.Clear()
+
+
+def _text_from_data(data: Dict[str, List[Any]]) -> str:
+    """Rebuild image_to_string-style text from image_to_data word rows"""
+    paragraphs: List[List[List[str]]] = []
+    current_paragraph = current_line = None
+    for i, word in enumerate(data['text']):
+        if not str(word).strip():
+            continue
+        paragraph = (data['block_num'][i], data['par_num'][i])
+        line = paragraph + (data['line_num'][i],)
+        if paragraph != current_paragraph:
+            paragraphs.append([])
+            current_paragraph, current_line = paragraph, None
+        if line != current_line:
+            paragraphs[-1].append([])
+            current_line = line
+        paragraphs[-1][-1].append(str(word))
+    return '\n\n'.join('\n'.join(' '.join(words) for words in lines) for lines in paragraphs)
+
+
 class OCRService:
-    def __init__(self):
+    def __init__(
+        self,
+        pdf_render_chunk_pages: int = PDF_RENDER_CHUNK_PAGES,
+        pdf_max_inflight_pages: int = PDF_MAX_INFLIGHT_PAGES,
+        pdf_text_layer: bool = True,
+        pdf_text_layer_min_chars: int = PDF_TEXT_LAYER_MIN_CHARS,
+        easyocr_batching: Optional[Dict[str, Any]] = None,
+        ocr_strategy: Optional[Dict[str, Any]] = None
+    ):
         self.tesseract_ready = False
         self.easyocr_ready = False
         self.easyocr_reader = None
+        self.tesseract_version = None
+        self.tesseract_backend = "tesserocr" if tesserocr is not None else "pytesseract"
+        self.pdf_render_chunk_pages = max(1, pdf_render_chunk_pages)
+        # A whole chunk must fit in the in-flight budget or rendering would deadlock
+        self.pdf_max_inflight_pages = max(self.pdf_render_chunk_pages, pdf_max_inflight_pages)
+        self.pdf_text_layer = pdf_text_layer
+        self.pdf_text_layer_min_chars = pdf_text_layer_min_chars
+        
+        # Cross-request micro-batching of EasyOCR calls (None = one process call per image)
+        self.easyocr_batcher: Optional[MicroBatcher] = None
+        self.recognizer_batch_size = 16
+        if easyocr_batching and easyocr_batching.get("enabled", True):
+            self.recognizer_batch_size = easyocr_batching.get("recognizer_batch_size", 16)
+            self.easyocr_batcher = MicroBatcher(
+                "easyocr",
+                self._run_easyocr_batch,
+                max_batch_size=easyocr_batching.get("max_batch_size", 8),
+                max_wait_ms=easyocr_batching.get("max_wait_ms", 5),
+                max_concurrent_batches=easyocr_batching.get("max_concurrent_batches", 1)
+            )
+        
+        # Engine strategy per document type
+        ocr_strategy = ocr_strategy or {}
+        self.default_strategy = ocr_strategy.get("default", DEFAULT_OCR_STRATEGY)
+        self.strategies = dict(ocr_strategy.get("by_document_type", {}))
+        self.confidence_threshold = ocr_strategy.get("confidence_threshold", OCR_CONFIDENCE_THRESHOLD)
+        for document_type, strategy in {"default": self.default_strategy, **self.strategies}.items():
+            if strategy not in OCR_STRATEGIES:
+                raise ValueError(f"Unknown OCR strategy for {document_type}: {strategy}")
         
     async def initialize(self):
         """Initialize OCR engines"""
@@ -39,8 +315,12 @@ class OCRService:
         """Initialize Tesseract OCR"""
         try:
             # Test Tesseract installation
-            version = pytesseract.get_tesseract_version()
-            logger.info(f"📖 Tesseract version: {version}")
+            if tesserocr is not None:
+                version = tesserocr.tesseract_version().splitlines()[0]
+            else:
+                version = pytesseract.get_tesseract_version()
+            logger.info(f"📖 Tesseract version: {version} (via {self.tesseract_backend})")
+            self.tesseract_version = str(version)
             self.tesseract_ready = True
         except Exception as e:
             logger.warning(f"⚠️ Tesseract not available: {e}")
@@ -48,9 +328,11 @@ class OCRService:
     
     async def _init_easyocr(self):
         """Initialize EasyOCR"""
+        global _easyocr_reader
         try:
             # Initialize EasyOCR reader
             self.easyocr_reader = easyocr.Reader(['en'], gpu=False)  # Set gpu=True if CUDA available
+            _easyocr_reader = self.easyocr_reader
             logger.info("📖 EasyOCR initialized")
             self.easyocr_ready = True
         except Exception as e:
@@ -61,8 +343,40 @@ class OCRService:
         """Check if OCR service is ready"""
         return self.tesseract_ready or self.easyocr_ready
     
-    async def process_document(self, content: bytes, filename: str, document_type: str = "general") -> Dict[str, Any]:
-        """Process document with OCR"""
+    @property
+    def pools(self):
+        """Shared worker pools for blocking OCR work"""
+        return get_worker_pools()
+    
+    @property
+    def cache_version(self) -> str:
+        """Engine version tag for cached OCR results"""
+        return (
+            f"{OCR_PIPELINE_VERSION}:tesseract={f'{self.tesseract_backend}/{self.tesseract_version}' if self.tesseract_ready else None}:"
+            f"easyocr={getattr(easyocr, '__version__', 'unknown') if self.easyocr_ready else None}:"
+            f"dpi={PDF_RENDER_DPI}:text_layer={self.pdf_text_layer}/{self.pdf_text_layer_min_chars}:"
+            f"strategy={self.default_strategy}/{sorted(self.strategies.items())}/{self.confidence_threshold}"
+        )
+    
+    def strategy_for(self, document_type: str) -> str:
+        """OCR engine strategy configured for a document type"""
+        return self.strategies.get(document_type, self.default_strategy)
+    
+    async def process_document(
+        self,
+        content: DocumentContent,
+        filename: str,
+        document_type: str = "general",
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        content_hash: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Process document with OCR, reporting (pages done, total pages) to progress_callback.
+        
+        content may be bytes, a memoryview or a file object; it is never copied into memory.
+        Results are cached by content hash (pass content_hash if already computed).
+        Structured fields are extracted from the text by services/field_extraction.py.
+        """
         start_time = time.time()
         
         try:
@@ -71,91 +385,304 @@ class OCRService:
             # Determine file type
             file_ext = filename.lower().split('.')[-1] if '.' in filename else ''
             
+            cache = get_result_cache()
+            if content_hash is None:
+                content_hash = await self.pools.run_in_thread(content_digest, content)
+            cache_key = cache.make_key("ocr", content_hash, self.cache_version, document_type, file_ext)
+            cached = await cache.get_async(cache_key)
+            if cached is not None:
+                logger.info(f"🗄️ OCR cache hit for {filename}")
+                cached["metadata"].update(filename=filename, cached=True)
+                cached["processing_time"] = time.time() - start_time
+                if progress_callback:
+                    pages = cached["metadata"]["pages_processed"]
+                    progress_callback(pages, pages)
+                return cached
+            
             if file_ext == 'pdf':
-                images = await self._pdf_to_images(content)
-                text_results = []
-                confidence_scores = []
-                
-                for i, image in enumerate(images):
-                    result = await self._process_image(image, document_type)
-                    text_results.append(result['text'])
-                    confidence_scores.append(result['confidence'])
+                page_results = await self._process_pdf_pages(content, document_type, progress_callback)
+                text_results = [result['text'] for result in page_results]
+                confidence_scores = [result['confidence'] for result in page_results]
                 
                 combined_text = '\n\n--- PAGE BREAK ---\n\n'.join(text_results)
                 avg_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0
                 
             elif file_ext in ['jpg', 'jpeg', 'png', 'bmp', 'tiff']:
-                image = Image.open(io.BytesIO(content))
-                result = await self._process_image(image, document_type)
+                # Decoded straight to grayscale from the upload buffer (any source mode), at full resolution
+                ingested = await self.pools.run_in_thread(ingest_image, content, "gray", None)
+                log_performance("ocr_image_decode", ingested.decode_seconds, ingested.stats)
+                result = await self._process_image(ingested.array, document_type)
                 combined_text = result['text']
                 avg_confidence = result['confidence']
+                page_results = [result]
+                if progress_callback:
+                    progress_callback(1, 1)
             
             else:
                 raise ValueError(f"Unsupported file type: {file_ext}")
             
-            # Extract structured data based on document type
-            structured_data = await self._extract_structured_data(combined_text, document_type)
-            
             processing_time = time.time() - start_time
             
-            return {
+            result = {
                 "text": combined_text,
                 "confidence": avg_confidence,
-                "structured_data": structured_data,
                 "metadata": {
                     "filename": filename,
                     "document_type": document_type,
                     "file_type": file_ext,
-                    "pages_processed": len(images) if file_ext == 'pdf' else 1
+                    "pages_processed": len(page_results) if file_ext == 'pdf' else 1,
+                    **(self._page_source_metadata(page_results) if file_ext == 'pdf' else {}),
+                    **self._engine_metadata(page_results, document_type)
                 },
                 "processing_time": processing_time
             }
             
+            # Empty text usually means an engine failure; don't pin it in the cache
+            if combined_text.strip():
+                await cache.set_async(cache_key, result)
+            
+            return result
+            
         except Exception as e:
             logger.error(f"❌ Error processing document {filename}: {e}")
             raise
     
-    async def _pdf_to_images(self, pdf_bytes: bytes) -> List[Image.Image]:
-        """Convert PDF to images"""
+    async def _process_pdf_pages(
+        self,
+        pdf_content: DocumentContent,
+        document_type: str,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Extract a PDF's text, page by page, in page order.
+        
+        Pages with a usable embedded text layer are read directly (source
+        "text_layer"). The rest are rasterized in chunks and OCR'd in parallel
+        (source "ocr"): the next chunk renders while earlier pages are being
+        OCR'd, and at most pdf_max_inflight_pages rendered pages exist at once.
+        Pages the renderer did not return get an empty "missing" entry, so the
+        result always has one entry per page.
+        """
+        pdf_path = await self.pools.run_in_thread(self._write_temp_pdf, as_memoryview(pdf_content))
+        tasks: List[asyncio.Task] = []
+        
+        try:
+            page_count = (await self.pools.run_in_thread(pdfinfo_from_path, pdf_path))["Pages"]
+            logger.info(f"📄 Streaming {page_count} PDF pages ({self.pdf_render_chunk_pages} per chunk, "
+                        f"{self.pdf_max_inflight_pages} in flight)")
+            
+            results: List[Optional[Dict[str, Any]]] = [None] * page_count
+            for index, text in enumerate(await self._read_text_layer(pdf_path, page_count)):
+                if is_usable_text_layer(text, self.pdf_text_layer_min_chars):
+                    results[index] = {"text": text.strip(), "confidence": 1.0, "source": "text_layer"}
+            
+            ocr_pages = [index + 1 for index, result in enumerate(results) if result is None]
+            completed = page_count - len(ocr_pages)
+            if progress_callback and completed:
+                progress_callback(completed, page_count)
+            if completed:
+                logger.info(f"📄 {completed}/{page_count} pages read from the PDF text layer, OCR for {len(ocr_pages)}")
+            
+            inflight = asyncio.Semaphore(self.pdf_max_inflight_pages)
+            
+            async def ocr_page(index: int, image: Image.Image):
+                nonlocal completed
+                try:
+                    results[index] = {**await self._process_image(image, document_type), "source": "ocr"}
+                finally:
+                    image.close()
+                    inflight.release()
+                completed += 1
+                if progress_callback:
+                    progress_callback(completed, page_count)
+            
+            for first_page, last_page in _page_ranges(ocr_pages, self.pdf_render_chunk_pages):
+                chunk_size = last_page - first_page + 1
+                for _ in range(chunk_size):
+                    await inflight.acquire()
+                
+                images = await self.pools.run_in_thread(partial(
+                    convert_from_path, pdf_path, dpi=PDF_RENDER_DPI, first_page=first_page, last_page=last_page
+                ))
+                for offset, image in enumerate(images[:chunk_size]):
+                    tasks.append(asyncio.create_task(ocr_page(first_page - 1 + offset, image)))
+                missing = chunk_size - min(len(images), chunk_size)
+                if missing:
+                    # Keep a placeholder per page so list positions stay page numbers
+                    logger.warning(f"⚠️ Rendering pages {first_page}-{last_page} returned {len(images)} images, "
+                                   f"{missing} page(s) missing")
+                    for index in range(first_page - 1 + len(images), last_page):
+                        results[index] = {"text": "", "confidence": 0.0, "source": "missing"}
+                    completed += missing
+                    if progress_callback:
+                        progress_callback(completed, page_count)
+                for _ in range(missing):
+                    inflight.release()
+            
+            await asyncio.gather(*tasks)
+            return results
+            
+        except BaseException as e:
+            for task in tasks:
+                task.cancel()
+            if isinstance(e, Exception):
+                logger.error(f"❌ Error converting PDF: {e}")
+            raise
+        finally:
+            os.remove(pdf_path)
+    
+    async def _read_text_layer(self, pdf_path: str, page_count: int) -> List[str]:
+        """Embedded text per page, or all '' if disabled or pdftotext is unavailable"""
+        if not self.pdf_text_layer:
+            return [""] * page_count
         try:
-            images = convert_from_bytes(pdf_bytes, dpi=300)
-            logger.info(f"📄 Converted PDF to {len(images)} images")
-            return images
+            return await self.pools.run_in_thread(extract_pdf_text_layer, pdf_path, page_count)
         except Exception as e:
-            logger.error(f"❌ Error converting PDF: {e}")
-            raise
+            logger.warning(f"⚠️ Could not read PDF text layer, using OCR for every page: {e}")
+            return [""] * page_count
+    
+    @staticmethod
+    def _page_source_metadata(page_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Which pages came from the text layer and which were OCR'd (1-based page numbers)"""
+        sources = [result.get("source", "ocr") for result in page_results]
+        return {
+            "page_sources": sources,
+            "text_layer_pages": [i + 1 for i, source in enumerate(sources) if source == "text_layer"],
+            "ocr_pages": [i + 1 for i, source in enumerate(sources) if source == "ocr"],
+            "missing_pages": [i + 1 for i, source in enumerate(sources) if source == "missing"]
+        }
     
-    async def _process_image(self, image: Image.Image, document_type: str) -> Dict[str, Any]:
-        """Process single image with OCR"""
+    def _engine_metadata(self, page_results: List[Dict[str, Any]], document_type: str) -> Dict[str, Any]:
+        """Winning OCR engine per page and time spent in each engine (summed over pages)"""
+        engines = [result.get("engine") or result.get("source", "ocr") for result in page_results]
+        timings: Dict[str, float] = {}
+        cancelled: Dict[str, int] = {}
+        for result in page_results:
+            for engine, seconds in result.get("engine_timings", {}).items():
+                timings[engine] = round(timings.get(engine, 0.0) + seconds, 4)
+            for engine in result.get("cancelled_engines", []):
+                cancelled[engine] = cancelled.get(engine, 0) + 1
+        return {
+            "ocr_strategy": self.strategy_for(document_type),
+            "ocr_engine": engines[0] if len(set(engines)) == 1 else "mixed",
+            "page_engines": engines,
+            "engine_timings": timings,
+            "cancelled_engines": cancelled
+        }
+    
+    @staticmethod
+    def _write_temp_pdf(pdf_view: memoryview) -> str:
+        """Write the PDF once to a temp file that poppler can render page ranges from"""
+        fd, path = tempfile.mkstemp(suffix=".pdf")
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf_view)
+        return path
+    
+    async def _process_image(self, image: Union[Image.Image, np.ndarray], document_type: str) -> Dict[str, Any]:
+        """Process single image with the OCR engine strategy configured for its document type"""
         try:
             # Preprocess image
             processed_image = await self._preprocess_image(image)
             
-            # Try EasyOCR first (generally more accurate)
-            if self.easyocr_ready:
-                result = await self._easyocr_extract(processed_image)
-                if result['confidence'] > 0.5:  # Good confidence
-                    return result
+            strategy = self.strategy_for(document_type)
+            ready = {"easyocr": self.easyocr_ready, "tesseract": self.tesseract_ready}
+            engines = [engine for engine in OCR_STRATEGIES[strategy] if ready[engine]]
+            if not engines:
+                raise Exception("No OCR engine available")
             
-            # Fallback to Tesseract
-            if self.tesseract_ready:
-                result = await self._tesseract_extract(processed_image, document_type)
-                return result
+            timings: Dict[str, float] = {}
+            if strategy == "race" and len(engines) > 1:
+                result, cancelled = await self._race_engines(engines, processed_image, document_type, timings)
+            else:
+                # Cascade keeps the last engine's answer (as before); cheapest-first keeps the more confident one
+                result = await self._run_engines_in_order(
+                    engines, processed_image, document_type, timings, keep_best=strategy == "cheapest_first"
+                )
+                cancelled = []
             
-            raise Exception("No OCR engine available")
+            return {**result, "strategy": strategy, "engine_timings": timings, "cancelled_engines": cancelled}
             
         except Exception as e:
             logger.error(f"❌ Error processing image: {e}")
             return {"text": "", "confidence": 0.0, "error": str(e)}
     
-    async def _preprocess_image(self, image: Image.Image) -> np.ndarray:
-        """Preprocess image for better OCR results"""
+    async def _run_engine(self, engine: str, image: np.ndarray, document_type: str, timings: Dict[str, float]) -> Dict[str, Any]:
+        """Run one engine, recording its wall time (also when cancelled)"""
+        start_time = time.perf_counter()
         try:
-            # Convert PIL to OpenCV format
-            opencv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-            
-            # Convert to grayscale
-            gray = cv2.cvtColor(opencv_image, cv2.COLOR_BGR2GRAY)
+            if engine == "easyocr":
+                result = await self._easyocr_extract(image)
+            else:
+                result = await self._tesseract_extract(image, document_type)
+            return {**result, "engine": engine}
+        finally:
+            timings[engine] = round(time.perf_counter() - start_time, 4)
+    
+    async def _run_engines_in_order(
+        self,
+        engines: List[str],
+        image: np.ndarray,
+        document_type: str,
+        timings: Dict[str, float],
+        keep_best: bool
+    ) -> Dict[str, Any]:
+        """Run engines one after another until one is confident enough"""
+        best = None
+        for engine in engines:
+            result = await self._run_engine(engine, image, document_type, timings)
+            if best is None or not keep_best or result['confidence'] > best['confidence']:
+                best = result
+            if result['confidence'] > self.confidence_threshold:
+                return result
+        return best
+    
+    async def _race_engines(
+        self,
+        engines: List[str],
+        image: np.ndarray,
+        document_type: str,
+        timings: Dict[str, float]
+    ):
+        """
+        Run engines concurrently and take the first result above the confidence threshold.
+        
+        The losing engines are cancelled: a queued EasyOCR image is dropped from its
+        micro-batch and a Tesseract call that has not started never runs. A call already
+        running in an OCR process finishes there, but its result is discarded.
+        If no engine is confident, the most confident result wins.
+        """
+        tasks = {
+            asyncio.create_task(self._run_engine(engine, image, document_type, timings)): engine
+            for engine in engines
+        }
+        pending = set(tasks)
+        best = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if best is None or result['confidence'] > best['confidence']:
+                        best = result
+                if best['confidence'] > self.confidence_threshold:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        
+        return best, [tasks[task] for task in pending]
+    
+    async def _preprocess_image(self, image: Union[Image.Image, np.ndarray]) -> np.ndarray:
+        """Preprocess image for better OCR results (runs on the CPU thread pool)"""
+        return await self.pools.run_in_thread(self._preprocess, image)
+    
+    def _preprocess(self, image: Union[Image.Image, np.ndarray]) -> np.ndarray:
+        """Denoise and binarize one page (a grayscale array from ingest_image, or a rendered PDF page)"""
+        try:
+            # Grayscale in one conversion whatever the page's mode
+            gray = as_image_array(image, "gray")
             
             # Noise removal
             denoised = cv2.medianBlur(gray, 5)
@@ -172,12 +699,22 @@ class OCRService:
         except Exception as e:
             logger.warning(f"⚠️ Image preprocessing failed: {e}")
             # Return original image as numpy array
-            return np.array(image.convert('L'))
+            return as_image_array(image, "gray")
+    
+    async def _run_easyocr_batch(self, images: List[np.ndarray]) -> List[List[Any]]:
+        return await self.pools.run_in_process(easyocr_readtext_batch, images, self.recognizer_batch_size)
+    
+    def get_batching_stats(self) -> Optional[Dict[str, Any]]:
+        """EasyOCR micro-batching histograms for the health endpoint"""
+        return self.easyocr_batcher.get_stats() if self.easyocr_batcher else None
     
     async def _easyocr_extract(self, image: np.ndarray) -> Dict[str, Any]:
         """Extract text using EasyOCR"""
         try:
-            results = self.easyocr_reader.readtext(image, detail=1)
+            if self.easyocr_batcher:
+                results = await self.easyocr_batcher.submit(image)
+            else:
+                results = await self.pools.run_in_process(easyocr_readtext, image)
             
             extracted_text = []
             confidence_scores = []
@@ -213,11 +750,8 @@ class OCRService:
             # Configure Tesseract based on document type
             config = self._get_tesseract_config(document_type)
             
-            # Extract text
-            text = pytesseract.image_to_string(image, config=config)
-            
-            # Get confidence data
-            data = pytesseract.image_to_data(image, config=config, output_type=pytesseract.Output.DICT)
+            # Extract text and confidence data
+            text, data = await self.pools.run_in_process(tesseract_read, image, config)
             
             # Calculate average confidence
             confidences = [int(conf) for conf in data['conf'] if int(conf) > 0]
@@ -255,128 +789,3 @@ class OCRService:
             "general": "--psm 3"  # Fully automatic page segmentation
         }
         return configs.get(document_type, "--psm 3")
-    
-    async def _extract_structured_data(self, text: str, document_type: str) -> Dict[str, Any]:
-        """Extract structured data based on document type"""
-        try:
-            structured_data = {}
-            
-            # Common patterns
-            structured_data["amounts"] = self._extract_amounts(text)
-            structured_data["dates"] = self._extract_dates(text)
-            structured_data["phone_numbers"] = self._extract_phone_numbers(text)
-            structured_data["emails"] = self._extract_emails(text)
-            
-            # Document-specific extraction
-            if document_type == "medical_bill":
-                structured_data.update(self._extract_medical_data(text))
-            elif document_type == "vehicle_estimate":
-                structured_data.update(self._extract_vehicle_data(text))
-            elif document_type in ["invoice", "receipt"]:
-                structured_data.update(self._extract_invoice_data(text))
-            
-            return structured_data
-            
-        except Exception as e:
-            logger.error(f"❌ Error extracting structured data: {e}")
-            return {}
-    
-    def _extract_amounts(self, text: str) -> List[float]:
-        """Extract monetary amounts from text"""
-        # Pattern for currency amounts
-        pattern = r'\$?\s*\d{1,3}(?:,\d{3})*(?:\.\d{2})?'
-        matches = re.findall(pattern, text)
-        
-        amounts = []
-        for match in matches:
-            try:
-                # Clean and convert to float
-                clean_amount = re.sub(r'[^\d.]', '', match)
-                if clean_amount and '.' in clean_amount:
-                    amounts.append(float(clean_amount))
-            except ValueError:
-                continue
-        
-        return sorted(amounts, reverse=True)  # Return highest amounts first
-    
-    def _extract_dates(self, text: str) -> List[str]:
-        """Extract dates from text"""
-        date_patterns = [
-            r'\d{1,2}/\d{1,2}/\d{4}',  # MM/DD/YYYY
-            r'\d{1,2}-\d{1,2}-\d{4}',  # MM-DD-YYYY
-            r'\d{4}-\d{1,2}-\d{1,2}',  # YYYY-MM-DD
-            r'\w+ \d{1,2}, \d{4}',     # Month DD, YYYY
-        ]
-        
-        dates = []
-        for pattern in date_patterns:
-            matches = re.findall(pattern, text)
-            dates.extend(matches)
-        
-        return list(set(dates))  # Remove duplicates
-    
-    def _extract_phone_numbers(self, text: str) -> List[str]:
-        """Extract phone numbers from text"""
-        pattern = r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'
-        return re.findall(pattern, text)
-    
-    def _extract_emails(self, text: str) -> List[str]:
-        """Extract email addresses from text"""
-        pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        return re.findall(pattern, text)
-    
-    def _extract_medical_data(self, text: str) -> Dict[str, Any]:
-        """Extract medical-specific data"""
-        data = {}
-        
-        # Look for patient name (after "Patient:" or similar)
-        patient_pattern = r'(?:Patient|Name):\s*([A-Za-z\s]+)'
-        patient_match = re.search(patient_pattern, text, re.IGNORECASE)
-        if patient_match:
-            data["patient_name"] = patient_match.group(1).strip()
-        
-        # Look for diagnosis codes (ICD-10)
-        icd_pattern = r'\b[A-Z]\d{2}(?:\.\d{1,2})?\b'
-        data["diagnosis_codes"] = re.findall(icd_pattern, text)
-        
-        # Look for procedure codes (CPT)
-        cpt_pattern = r'\b\d{5}\b'
-        data["procedure_codes"] = re.findall(cpt_pattern, text)
-        
-        return data
-    
-    def _extract_vehicle_data(self, text: str) -> Dict[str, Any]:
-        """Extract vehicle-specific data"""
-        data = {}
-        
-        # Look for VIN
-        vin_pattern = r'\b[A-HJ-NPR-Z0-9]{17}\b'
-        vin_match = re.search(vin_pattern, text)
-        if vin_match:
-            data["vin"] = vin_match.group()
-        
-        # Look for license plate
-        plate_pattern = r'\b[A-Z0-9]{2,8}\b'
-        plates = re.findall(plate_pattern, text)
-        if plates:
-            data["license_plates"] = plates
-        
-        return data
-    
-    def _extract_invoice_data(self, text: str) -> Dict[str, Any]:
-        """Extract invoice-specific data"""
-        data = {}
-        
-        # Look for invoice number
-        invoice_pattern = r'(?:Invoice|Receipt|Bill)\s*#?\s*(\w+)'
-        invoice_match = re.search(invoice_pattern, text, re.IGNORECASE)
-        if invoice_match:
-            data["invoice_number"] = invoice_match.group(1)
-        
-        # Look for tax amounts
-        tax_pattern = r'(?:Tax|GST|VAT):\s*\$?(\d+(?:\.\d{2})?)'
-        tax_match = re.search(tax_pattern, text, re.IGNORECASE)
-        if tax_match:
-            data["tax_amount"] = float(tax_match.group(1))
-        
-        return data 
\ No newline at end of file
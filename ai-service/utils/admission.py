@@ -0,0 +1,205 @@
+import math
+import time
+import heapq
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Tuple
+from loguru import logger
+
+# Used when a route class has no configured limits
+DEFAULT_LIMITS = {"max_concurrent": 4, "max_queue": 8, "queue_timeout_seconds": 15}
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; carries a Retry-After hint"""
+
+    def __init__(self, route_class: str, reason: str, retry_after: int):
+        super().__init__(f"{route_class} is overloaded ({reason}), retry in {retry_after}s")
+        self.route_class = route_class
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class RouteGate:
+    """
+    Concurrency limit plus a short priority wait queue for one route class.
+
+    Requests beyond max_concurrent wait in a queue ordered by client priority
+    (then arrival). A full queue sheds the lowest-priority waiter if the new
+    request outranks it, otherwise the new request is rejected immediately.
+
+    A request that runs several units of work at once (a batch) acquires a
+    weight of that many slots, capped at max_concurrent. Waiters are admitted
+    strictly in queue order, so a heavy request at the head is not starved by
+    lighter ones behind it.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout_seconds: float):
+        self.name = name
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout_seconds = queue_timeout_seconds
+
+        self.in_flight = 0
+        self.queued = 0
+        self._waiters: List[Tuple[int, int, int, int, asyncio.Future]] = []  # (-priority, seq, priority, weight, future)
+        self._sequence = itertools.count()
+
+        self.stats = {
+            "admitted": 0,
+            "queued_total": 0,
+            "rejected_queue_full": 0,
+            "rejected_timeout": 0,
+            "shed_for_priority": 0,
+            "completed": 0,
+        }
+        self.peak_queued = 0
+        self.avg_service_seconds = 0.0
+        self.total_wait_seconds = 0.0
+
+    def weight_for(self, units: int) -> int:
+        """Slots a request running `units` pieces of work at once is charged"""
+        return min(max(1, units), self.max_concurrent)
+
+    async def acquire(self, priority: int = 0, weight: int = 1) -> float:
+        """Wait for `weight` slots, returning the time spent queued"""
+        weight = self.weight_for(weight)
+        if self.in_flight + weight <= self.max_concurrent and self.queued == 0:
+            self.in_flight += weight
+            self.stats["admitted"] += 1
+            return 0.0
+
+        if self.queued >= self.max_queue and not self._shed_lower_priority(priority):
+            self.stats["rejected_queue_full"] += 1
+            raise AdmissionRejected(self.name, "queue full", self.retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (-priority, next(self._sequence), priority, weight, future))
+        self.queued += 1
+        self.stats["queued_total"] += 1
+        self.peak_queued = max(self.peak_queued, self.queued)
+        wait_start = time.time()
+
+        try:
+            await asyncio.wait({future}, timeout=self.queue_timeout_seconds)
+        except asyncio.CancelledError:
+            # Client went away; give back a slot that may have been handed over meanwhile
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self.release(weight=weight)
+            elif not future.done():
+                future.cancel()
+                self.queued -= 1
+                self._admit_waiters()
+            raise
+
+        if not future.done():
+            future.cancel()
+            self.queued -= 1
+            self.stats["rejected_timeout"] += 1
+            self._admit_waiters()
+            raise AdmissionRejected(self.name, "queue timeout", self.retry_after())
+
+        future.result()  # Raises AdmissionRejected if shed for a higher-priority request
+        waited = time.time() - wait_start
+        self.total_wait_seconds += waited
+        self.stats["admitted"] += 1
+        return waited
+
+    def release(self, service_seconds: Optional[float] = None, weight: int = 1):
+        """Free `weight` slots, handing them straight to the highest-priority waiters"""
+        if service_seconds is not None:
+            self.stats["completed"] += 1
+            # Exponentially weighted so Retry-After tracks current load
+            if self.avg_service_seconds == 0.0:
+                self.avg_service_seconds = service_seconds
+            else:
+                self.avg_service_seconds = 0.8 * self.avg_service_seconds + 0.2 * service_seconds
+
+        self.in_flight -= self.weight_for(weight)
+        self._admit_waiters()
+
+    def _admit_waiters(self):
+        """Admit waiters in queue order while the one at the head fits"""
+        while self._waiters:
+            _, _, _, weight, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)  # Timed out or shed
+                continue
+            if self.in_flight + weight > self.max_concurrent:
+                return
+            heapq.heappop(self._waiters)
+            self.queued -= 1
+            self.in_flight += weight
+            future.set_result(True)
+
+    def _shed_lower_priority(self, priority: int) -> bool:
+        """Reject the lowest-priority waiter if it ranks below `priority`"""
+        pending = [entry for entry in self._waiters if not entry[4].done()]
+        if not pending:
+            return False
+        lowest = max(pending, key=lambda entry: (entry[0], entry[1]))  # Lowest priority, newest
+        if lowest[2] >= priority:
+            return False
+        lowest[4].set_exception(AdmissionRejected(self.name, "shed for higher priority", self.retry_after()))
+        self.queued -= 1
+        self.stats["shed_for_priority"] += 1
+        return True
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to free up"""
+        service = self.avg_service_seconds or 1.0
+        backlog = (self.queued + 1) / self.max_concurrent
+        return max(1, math.ceil(service * backlog))
+
+    @asynccontextmanager
+    async def slot(self, priority: int = 0, weight: int = 1):
+        """Hold `weight` slots for the duration of the block"""
+        await self.acquire(priority, weight)
+        start_time = time.time()
+        try:
+            yield
+        finally:
+            self.release(time.time() - start_time, weight)
+
+    def snapshot(self) -> Dict[str, Any]:
+        admitted = self.stats["admitted"]
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queued,
+            "peak_queue_depth": self.peak_queued,
+            "rejected": self.stats["rejected_queue_full"] + self.stats["rejected_timeout"] + self.stats["shed_for_priority"],
+            **self.stats,
+            "avg_service_seconds": round(self.avg_service_seconds, 4),
+            "avg_wait_seconds": round(self.total_wait_seconds / admitted, 4) if admitted else 0.0,
+        }
+
+
+class AdmissionController:
+    """Per-route-class admission gates configured from AI_SERVICE_CONFIG["admission"]"""
+
+    def __init__(self, limits: Dict[str, Dict[str, Any]]):
+        self.gates: Dict[str, RouteGate] = {}
+        for name, config in limits.items():
+            self.gates[name] = self._build_gate(name, config)
+
+    @staticmethod
+    def _build_gate(name: str, config: Dict[str, Any]) -> RouteGate:
+        merged = {**DEFAULT_LIMITS, **config}
+        return RouteGate(name, merged["max_concurrent"], merged["max_queue"], merged["queue_timeout_seconds"])
+
+    def gate(self, route_class: str) -> RouteGate:
+        if route_class not in self.gates:
+            logger.warning(f"⚠️ No admission limits configured for {route_class}, using defaults")
+            self.gates[route_class] = self._build_gate(route_class, {})
+        return self.gates[route_class]
+
+    def slot(self, route_class: str, priority: int = 0, weight: int = 1):
+        """Async context manager holding `weight` slots in `route_class`"""
+        return self.gate(route_class).slot(priority, weight)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and rejection counts for the health endpoint"""
+        return {name: gate.snapshot() for name, gate in self.gates.items()}
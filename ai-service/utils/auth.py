@@ -4,7 +4,7 @@ from loguru import logger
 import hashlib
 import hmac
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 # API key configuration
 API_KEYS = {
@@ -87,14 +87,21 @@ def get_client_permissions(client_name: str) -> Dict[str, bool]:
     return permissions.get(client_name, {})
 
 def get_rate_limit(client_name: str) -> Dict[str, int]:
-    """Get rate limits for client (requests per minute)"""
+    """Get rate limits for client (requests per minute, admission priority - higher is served first)"""
     rate_limits = {
-        "chainsure_backend": {"requests_per_minute": 100},
-        "chainsure_admin": {"requests_per_minute": 200},
-        "chainsure_test": {"requests_per_minute": 10}
+        "chainsure_backend": {"requests_per_minute": 100, "priority": 2},
+        "chainsure_admin": {"requests_per_minute": 200, "priority": 2},
+        "chainsure_test": {"requests_per_minute": 10, "priority": 0}
     }
     
-    return rate_limits.get(client_name, {"requests_per_minute": 10})
+    return rate_limits.get(client_name, {"requests_per_minute": 10, "priority": 0})
+
+def get_client_priority(api_key: Optional[str]) -> int:
+    """Admission priority for an API key (unknown or missing keys get the lowest tier)"""
+    for client_name, valid_key in API_KEYS.items():
+        if api_key and hmac.compare_digest(api_key, valid_key):
+            return get_rate_limit(client_name)["priority"]
+    return get_rate_limit("")["priority"]
 
 async def check_rate_limit(api_key: str, rate_limit: Dict[str, int]):
     """Check rate limiting for API key"""
@@ -0,0 +1,39 @@
+import sys
+from contextlib import contextmanager
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+
+@contextmanager
+def file_lock(path: str, exclusive: bool = True):
+    """
+    Hold an advisory lock on `path` (created if missing) shared by every process.
+
+    Uses flock where available. On Windows it falls back to msvcrt.locking on the
+    file's first byte, which has no shared mode, so readers lock exclusively too.
+    The file is opened per call: flock is shared across fork(), so an inherited
+    descriptor would let every pre-forked worker hold the "exclusive" lock at once.
+    """
+    with open(path, "a+b") as lock_file:
+        if sys.platform == "win32":
+            lock_file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)  # Retries for ~10s, then raises
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
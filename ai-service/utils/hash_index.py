@@ -0,0 +1,242 @@
+import os
+import time
+import itertools
+from typing import Any, Dict, List, Optional
+import numpy as np
+from loguru import logger
+
+from utils.file_lock import file_lock
+
+# One fixed-size record per indexed image
+RECORD_DTYPE = np.dtype([
+    ("phash", "<u8"),
+    ("dhash", "<u8"),
+    ("ahash", "<u8"),
+    ("created_at", "<f8"),
+    ("content_sha256", "S32"),
+    ("claim_id", "S40"),
+])
+
+# Multi-index hashing: the 64-bit pHash is split into 4 chunks of 16 bits
+CHUNKS = 4
+CHUNK_BITS = 16
+TABLES_MAGIC = b"PHIX0001"
+
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def hamming_distances(values: np.ndarray, query: int) -> np.ndarray:
+    """Hamming distance between each uint64 in `values` and `query`"""
+    xor = np.bitwise_xor(values.astype(np.uint64), np.uint64(query))
+    return _POPCOUNT8[xor.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+def _chunk(value: int, index: int) -> int:
+    return (value >> (index * CHUNK_BITS)) & 0xFFFF
+
+
+def _chunk_neighbors(value: int, radius: int) -> List[int]:
+    """All 16-bit values within `radius` bit flips of `value`"""
+    neighbors = [value]
+    for flips in range(1, radius + 1):
+        for bits in itertools.combinations(range(CHUNK_BITS), flips):
+            flipped = value
+            for bit in bits:
+                flipped ^= 1 << bit
+            neighbors.append(flipped)
+    return neighbors
+
+
+class PerceptualHashIndex:
+    """
+    Persistent near-duplicate index over perceptual image hashes.
+
+    Records live in an append-only, memory-mapped file. Lookups use multi-index
+    hashing: by pigeonhole, two pHashes within Hamming distance r agree to
+    within r // 4 bits on at least one of their four 16-bit chunks, so each
+    query probes a few hundred keys in four sorted chunk tables (binary search
+    over memory-mapped arrays) instead of scanning every record. Records added
+    since the tables were last built are scanned directly until the tail grows
+    past rebuild_threshold. Writers serialize on an flock, so pre-forked
+    workers can share one index directory.
+    """
+
+    def __init__(self, index_dir: str, max_distance: int = 8, rebuild_threshold: int = 4096):
+        self.index_dir = index_dir
+        self.max_distance = max_distance
+        self.rebuild_threshold = rebuild_threshold
+
+        self.records_path = os.path.join(index_dir, "records.bin")
+        self.tables_path = os.path.join(index_dir, "chunk_tables.bin")
+        self.lock_path = os.path.join(index_dir, "index.lock")
+
+        self._records: Optional[np.memmap] = None
+        self._records_size = -1
+        self._tables: Optional[Dict[str, Any]] = None
+        self._tables_mtime = None
+
+        self.stats = {"queries": 0, "inserts": 0, "rebuilds": 0, "candidates_checked": 0, "matches": 0}
+
+        os.makedirs(index_dir, exist_ok=True)
+        open(self.records_path, "ab").close()
+
+    def _locked(self, exclusive: bool):
+        return file_lock(self.lock_path, exclusive)
+
+    def __len__(self) -> int:
+        return os.path.getsize(self.records_path) // RECORD_DTYPE.itemsize
+
+    def _load_records(self) -> np.ndarray:
+        """Memory-map the records file, remapping only when it has grown"""
+        size = os.path.getsize(self.records_path)
+        if size != self._records_size:
+            count = size // RECORD_DTYPE.itemsize
+            if count == 0:
+                self._records = np.zeros(0, dtype=RECORD_DTYPE)
+            else:
+                self._records = np.memmap(self.records_path, dtype=RECORD_DTYPE, mode="r", shape=(count,))
+            self._records_size = size
+        return self._records
+
+    def _load_tables(self) -> Optional[Dict[str, Any]]:
+        """Memory-map the chunk tables, reloading after another worker rebuilt them"""
+        try:
+            mtime = os.stat(self.tables_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime == self._tables_mtime:
+            return self._tables
+
+        raw = np.memmap(self.tables_path, dtype=np.uint8, mode="r")
+        if bytes(raw[:8]) != TABLES_MAGIC:
+            logger.warning("⚠️ Ignoring perceptual hash tables with unknown format")
+            return None
+        count = int(raw[8:16].view("<u8")[0])
+        offset = 16
+        values, ids = [], []
+        for _ in range(CHUNKS):
+            values.append(raw[offset:offset + count * 2].view("<u2"))
+            offset += count * 2
+            ids.append(raw[offset:offset + count * 4].view("<u4"))
+            offset += count * 4
+
+        self._tables = {"count": count, "values": values, "ids": ids}
+        self._tables_mtime = mtime
+        return self._tables
+
+    def query(
+        self,
+        phash: int,
+        dhash: Optional[int] = None,
+        ahash: Optional[int] = None,
+        max_distance: Optional[int] = None,
+        limit: int = 10,
+    ) -> List[Dict[str, Any]]:
+        """Find indexed images whose pHash is within max_distance bits, closest first"""
+        radius = self.max_distance if max_distance is None else max_distance
+        with self._locked(exclusive=False):
+            records = self._load_records()
+            tables = self._load_tables()
+
+        candidates = self._candidates(phash, radius, records, tables)
+        self.stats["queries"] += 1
+        self.stats["candidates_checked"] += len(candidates)
+        if len(candidates) == 0:
+            return []
+
+        selected = records[candidates]
+        distances = hamming_distances(selected["phash"], phash)
+        within = distances <= radius
+        selected, distances, candidates = selected[within], distances[within], candidates[within]
+
+        order = np.argsort(distances, kind="stable")[:limit]
+        matches = []
+        for i in order:
+            record = selected[i]
+            matches.append({
+                "record_id": int(candidates[i]),
+                "claim_id": record["claim_id"].decode("utf-8", errors="replace") or None,
+                "content_sha256": record["content_sha256"].hex(),
+                "phash_distance": int(distances[i]),
+                "dhash_distance": int(hamming_distances(np.array([record["dhash"]]), dhash)[0]) if dhash is not None else None,
+                "ahash_distance": int(hamming_distances(np.array([record["ahash"]]), ahash)[0]) if ahash is not None else None,
+                "first_seen": float(record["created_at"]),
+            })
+        self.stats["matches"] += len(matches)
+        return matches
+
+    def _candidates(self, phash: int, radius: int, records: np.ndarray, tables: Optional[Dict[str, Any]]) -> np.ndarray:
+        covered = tables["count"] if tables else 0
+        found = []
+
+        if covered:
+            chunk_radius = radius // CHUNKS
+            for index in range(CHUNKS):
+                keys = np.array(_chunk_neighbors(_chunk(phash, index), chunk_radius), dtype=np.uint16)
+                values = tables["values"][index]
+                lo = np.searchsorted(values, keys, side="left")
+                hi = np.searchsorted(values, keys, side="right")
+                for start, end in zip(lo, hi):
+                    if end > start:
+                        found.append(np.asarray(tables["ids"][index][start:end], dtype=np.int64))
+
+        # Records appended since the tables were built
+        if len(records) > covered:
+            found.append(np.arange(covered, len(records), dtype=np.int64))
+
+        if not found:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(found))
+
+    def add(self, phash: int, dhash: int, ahash: int, content_sha256: str, claim_id: Optional[str] = None) -> int:
+        """Append an image to the index, returning its record id"""
+        record = np.zeros(1, dtype=RECORD_DTYPE)
+        record["phash"] = phash
+        record["dhash"] = dhash
+        record["ahash"] = ahash
+        record["created_at"] = time.time()
+        record["content_sha256"] = bytes.fromhex(content_sha256)
+        record["claim_id"] = (claim_id or "").encode("utf-8")[:40]
+
+        with self._locked(exclusive=True):
+            with open(self.records_path, "ab") as f:
+                record_id = f.tell() // RECORD_DTYPE.itemsize
+                f.write(record.tobytes())
+
+            tables = self._load_tables()
+            covered = tables["count"] if tables else 0
+            if record_id + 1 - covered >= self.rebuild_threshold:
+                self._rebuild_tables()
+
+        self.stats["inserts"] += 1
+        return record_id
+
+    def _rebuild_tables(self):
+        """Rebuild the sorted chunk tables over all records (caller holds the write lock)"""
+        start_time = time.time()
+        records = self._load_records()
+        count = len(records)
+        phashes = np.asarray(records["phash"], dtype=np.uint64)
+
+        tmp_path = f"{self.tables_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(TABLES_MAGIC)
+            f.write(np.array([count], dtype="<u8").tobytes())
+            for index in range(CHUNKS):
+                chunk = ((phashes >> np.uint64(index * CHUNK_BITS)) & np.uint64(0xFFFF)).astype("<u2")
+                order = np.argsort(chunk, kind="stable").astype("<u4")
+                f.write(chunk[order].tobytes())
+                f.write(order.tobytes())
+        os.replace(tmp_path, self.tables_path)
+
+        self.stats["rebuilds"] += 1
+        logger.info(f"🗂️ Rebuilt perceptual hash tables over {count} images in {time.time() - start_time:.2f}s")
+
+    def get_stats(self) -> Dict[str, Any]:
+        tables = self._load_tables()
+        return {
+            "indexed_images": len(self),
+            "table_coverage": tables["count"] if tables else 0,
+            "max_distance": self.max_distance,
+            **self.stats,
+        }
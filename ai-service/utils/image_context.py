@@ -0,0 +1,146 @@
+import time
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+import cv2
+import numpy as np
+
+# Canny thresholds shared by every analyzer that looks at edges
+CANNY_LOW = 50
+CANNY_HIGH = 150
+
+
+def _bgr(ctx: "ImageContext") -> np.ndarray:
+    return ctx.image
+
+
+def _gray(ctx: "ImageContext") -> np.ndarray:
+    return cv2.cvtColor(ctx.bgr, cv2.COLOR_BGR2GRAY)
+
+
+def _hsv(ctx: "ImageContext") -> np.ndarray:
+    return cv2.cvtColor(ctx.bgr, cv2.COLOR_BGR2HSV)
+
+
+def _lab(ctx: "ImageContext") -> np.ndarray:
+    return cv2.cvtColor(ctx.bgr, cv2.COLOR_BGR2LAB)
+
+
+def _edges(ctx: "ImageContext") -> np.ndarray:
+    return cv2.Canny(ctx.gray, CANNY_LOW, CANNY_HIGH)
+
+
+def _laplacian(ctx: "ImageContext") -> np.ndarray:
+    return cv2.Laplacian(ctx.gray, cv2.CV_64F)
+
+
+def _laplacian_var(ctx: "ImageContext") -> float:
+    return float(ctx.laplacian.var())
+
+
+def _edge_contours(ctx: "ImageContext") -> Tuple[np.ndarray, ...]:
+    contours, _ = cv2.findContours(ctx.edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return tuple(contours)
+
+
+# View name -> (views it is derived from, builder)
+VIEWS: Dict[str, Tuple[Tuple[str, ...], Callable[["ImageContext"], Any]]] = {
+    "bgr": ((), _bgr),
+    "gray": (("bgr",), _gray),
+    "hsv": (("bgr",), _hsv),
+    "lab": (("bgr",), _lab),
+    "edges": (("gray",), _edges),
+    "laplacian": (("gray",), _laplacian),
+    "laplacian_var": (("laplacian",), _laplacian_var),
+    "edge_contours": (("edges",), _edge_contours),
+}
+
+
+class ImageContext:
+    """
+    Derived views of one decoded image, computed on first use and shared by every analyzer.
+
+    Each view (BGR, grayscale, HSV, LAB, Canny edges, Laplacian, edge contours) is
+    built at most once per request, under a per-view lock so analyzers running on
+    different threads never build the same view twice. Arrays are returned read-only
+    because they are shared. `timings` records the time spent building each view,
+    excluding the views it was derived from.
+
+    `image` is the decoded BGR array from utils/image_ingest.py, possibly a downscaled
+    copy of the upload; `source_size` is the original (width, height) and `scale`
+    the analysis/original ratio.
+    """
+
+    def __init__(self, image: np.ndarray, source_size: Optional[Tuple[int, int]] = None, scale: float = 1.0):
+        self.image = image
+        self.source_size = source_size or (image.shape[1], image.shape[0])
+        self.scale = scale
+        self.timings: Dict[str, float] = {}
+        self._views: Dict[str, Any] = {}
+        self._locks = {name: threading.Lock() for name in VIEWS}
+
+    def view(self, name: str) -> Any:
+        """Get a derived view, building it (and the views it depends on) if needed"""
+        if name in self._views:
+            return self._views[name]
+
+        dependencies, build = VIEWS[name]
+        for dependency in dependencies:
+            self.view(dependency)
+
+        with self._locks[name]:
+            if name not in self._views:
+                start_time = time.perf_counter()
+                value = build(self)
+                if isinstance(value, np.ndarray):
+                    value.flags.writeable = False
+                self.timings[name] = time.perf_counter() - start_time
+                self._views[name] = value
+        return self._views[name]
+
+    @property
+    def bgr(self) -> np.ndarray:
+        return self.view("bgr")
+
+    @property
+    def gray(self) -> np.ndarray:
+        return self.view("gray")
+
+    @property
+    def hsv(self) -> np.ndarray:
+        return self.view("hsv")
+
+    @property
+    def lab(self) -> np.ndarray:
+        return self.view("lab")
+
+    @property
+    def edges(self) -> np.ndarray:
+        """Canny edges of the grayscale view"""
+        return self.view("edges")
+
+    @property
+    def laplacian(self) -> np.ndarray:
+        return self.view("laplacian")
+
+    @property
+    def laplacian_var(self) -> float:
+        """Variance of the Laplacian (focus measure)"""
+        return self.view("laplacian_var")
+
+    @property
+    def edge_contours(self) -> Tuple[np.ndarray, ...]:
+        """External contours of the Canny edges"""
+        return self.view("edge_contours")
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.bgr.shape
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the views built so far"""
+        return sum(value.nbytes for value in self._views.values() if isinstance(value, np.ndarray))
+
+    def get_timings(self) -> Dict[str, float]:
+        """Milliseconds spent building each view"""
+        return {name: round(seconds * 1000, 3) for name, seconds in self.timings.items()}
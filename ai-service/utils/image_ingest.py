@@ -0,0 +1,227 @@
+import time
+import warnings
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple, Union
+import cv2
+import numpy as np
+from PIL import Image
+from loguru import logger
+
+from utils.uploads import DocumentContent, as_memoryview, open_stream
+
+# Long side images are normalized to for analysis (none of the heuristics need more)
+DEFAULT_ANALYSIS_MAX_SIDE = 2048
+
+# Largest image decoded at full size (about 190MB as BGR); bigger images must support reduced decoding
+DEFAULT_MAX_DECODE_PIXELS = 64_000_000
+
+# Array layouts consumers can ask for: OpenCV flags and channels per pixel
+LAYOUTS = {
+    "bgr": (cv2.IMREAD_COLOR, 3),
+    "gray": (cv2.IMREAD_GRAYSCALE, 1),
+}
+
+# imdecode flags that also shrink the image by 2, 4 or 8 while decoding (DCT scaling for JPEG)
+REDUCED_FLAGS = {
+    "bgr": {2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8},
+    "gray": {2: cv2.IMREAD_REDUCED_GRAYSCALE_2, 4: cv2.IMREAD_REDUCED_GRAYSCALE_4, 8: cv2.IMREAD_REDUCED_GRAYSCALE_8},
+}
+
+# Formats whose decoder produces the reduced size directly (others decode in full, then shrink)
+NATIVE_REDUCED_FORMATS = {"JPEG", "MPO"}
+
+
+class ImageRejectedError(Exception):
+    """Raised when an image header declares a size we refuse to decode"""
+
+
+@dataclass
+class ImageHeader:
+    """What the header says about an image, read without decoding any pixels"""
+    size: Tuple[int, int]
+    format: Optional[str]
+    mode: str
+    bands: int
+    exif: Optional[Dict[int, Any]] = None
+    exif_error: Optional[str] = None
+
+
+@dataclass
+class IngestedImage:
+    """An image decoded at (at most) the analysis resolution, with what we know about the original"""
+    array: np.ndarray  # Contiguous uint8, HxWx3 BGR or HxW grayscale
+    header: ImageHeader
+    source_bytes: Optional[int]
+    scale: float  # Analysis width / source width
+    reduction: int  # Factor the decoder shrank by (1, 2, 4 or 8)
+    estimated_peak_bytes: int  # Pixel memory held at once while decoding, computed from array sizes (not measured)
+    decode_seconds: float
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def source_size(self) -> Tuple[int, int]:
+        return self.header.size
+
+    @property
+    def exif(self) -> Optional[Dict[int, Any]]:
+        return self.header.exif
+
+    @property
+    def exif_error(self) -> Optional[str]:
+        return self.header.exif_error
+
+
+def analysis_size(size: Tuple[int, int], max_side: Optional[int]) -> Tuple[int, int]:
+    """Size an image is normalized to: the long side capped at max_side, aspect ratio kept"""
+    width, height = size
+    longest = max(width, height)
+    if not max_side or longest <= max_side:
+        return width, height
+    ratio = max_side / longest
+    return max(1, round(width * ratio)), max(1, round(height * ratio))
+
+
+def read_header(content: DocumentContent) -> ImageHeader:
+    """Read size, format, mode and EXIF from the header (PIL opens lazily, so no pixels are decoded)"""
+    try:
+        with warnings.catch_warnings():
+            # We apply our own pixel limit; PIL's hard limit still raises
+            warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+            image = Image.open(open_stream(content))
+    except Image.DecompressionBombError as e:
+        raise ImageRejectedError(str(e)) from e
+
+    exif, exif_error = None, None
+    try:
+        exif = image._getexif() if hasattr(image, "_getexif") else None
+    except Exception as e:
+        exif_error = str(e)
+
+    return ImageHeader(
+        size=image.size,
+        format=image.format,
+        mode=image.mode,
+        bands=len(image.getbands()),
+        exif=exif,
+        exif_error=exif_error
+    )
+
+
+def ingest_image(
+    content: DocumentContent,
+    layout: str = "bgr",
+    max_side: Optional[int] = DEFAULT_ANALYSIS_MAX_SIDE,
+    max_decode_pixels: int = DEFAULT_MAX_DECODE_PIXELS
+) -> IngestedImage:
+    """
+    Decode an uploaded image straight from the upload buffer into the array layout asked for.
+
+    OpenCV decodes from a zero-copy view of the upload into a contiguous uint8 array:
+    BGR (3 channels) or grayscale, whatever the source mode (palette, RGBA, 16-bit,
+    CMYK and grayscale files all normalize here), with EXIF orientation ignored like
+    PIL does. Only the header is read before deciding how to decode. Images larger
+    than max_side are decoded at 1/2, 1/4 or 1/8 scale (directly by the JPEG decoder)
+    to the smallest size still at least the analysis size, then area-resampled.
+    Decodes that would exceed max_decode_pixels raise ImageRejectedError.
+    """
+    start_time = time.perf_counter()
+    flags, channels = LAYOUTS[layout]
+    header = read_header(content)
+    source_size = header.size
+    target_size = analysis_size(source_size, max_side)
+
+    reduction = 1
+    for factor in (8, 4, 2):
+        if max(source_size) / factor >= max(target_size):
+            reduction = factor
+            break
+
+    # Pixels the decoder materializes: reduced directly for JPEG, in full (then shrunk) otherwise
+    native = header.format in NATIVE_REDUCED_FORMATS
+    decode_pixels = source_size[0] * source_size[1]
+    if native:
+        decode_pixels = -(-source_size[0] // reduction) * -(-source_size[1] // reduction)
+    if decode_pixels > max_decode_pixels:
+        raise ImageRejectedError(
+            f"Image of {source_size[0]}x{source_size[1]} pixels ({header.format}) exceeds the decode limit "
+            f"of {max_decode_pixels} pixels"
+        )
+
+    buffer = np.frombuffer(as_memoryview(content), dtype=np.uint8)
+    if reduction > 1:
+        flags = REDUCED_FLAGS[layout][reduction]
+    array = cv2.imdecode(buffer, flags | cv2.IMREAD_IGNORE_ORIENTATION)
+    if array is None:
+        array = _pil_decode(content, layout, reduction if native else 1)
+        if array is None:
+            raise ValueError(f"Could not decode {header.format or 'unknown'} image")
+        decoder = "pil"
+    else:
+        decoder = "opencv"
+
+    # Estimated from the arrays involved; decoder-internal buffers are not counted
+    peak_bytes = array.nbytes
+    if not native and reduction > 1:
+        peak_bytes += source_size[0] * source_size[1] * channels
+    decoded_size = (array.shape[1], array.shape[0])
+    if decoded_size != target_size:
+        resized = cv2.resize(array, target_size, interpolation=cv2.INTER_AREA)
+        peak_bytes = max(peak_bytes, array.nbytes + resized.nbytes)
+        array = resized
+
+    decode_seconds = time.perf_counter() - start_time
+    if target_size != source_size:
+        logger.debug(
+            f"Decoded {header.format} {source_size[0]}x{source_size[1]} at 1/{reduction} "
+            f"({decoded_size[0]}x{decoded_size[1]}), analyzing at {target_size[0]}x{target_size[1]}"
+        )
+
+    return IngestedImage(
+        array=np.ascontiguousarray(array),
+        header=header,
+        source_bytes=len(content) if hasattr(content, "__len__") else None,
+        scale=target_size[0] / source_size[0] if source_size[0] else 1.0,
+        reduction=reduction,
+        estimated_peak_bytes=peak_bytes,
+        decode_seconds=decode_seconds,
+        stats={
+            "format": header.format,
+            "mode": header.mode,
+            "source": f"{source_size[0]}x{source_size[1]}",
+            "decoded": f"{decoded_size[0]}x{decoded_size[1]}",
+            "decoder": decoder,
+            "layout": layout,
+            "shape": list(array.shape),
+            "est_peak_mb": round(peak_bytes / (1024 * 1024), 2),
+        }
+    )
+
+
+def _pil_decode(content: DocumentContent, layout: str, reduction: int) -> Optional[np.ndarray]:
+    """Decode with PIL, letting JPEG shrink by reduction while decoding; None if PIL cannot decode it either"""
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+            image = Image.open(open_stream(content))
+            if reduction > 1:
+                image.draft(image.mode, (image.size[0] // reduction, image.size[1] // reduction))
+            image.load()
+        return pil_to_array(image, layout)
+    except Exception as e:
+        logger.debug(f"PIL could not decode image either: {e}")
+        return None
+
+
+def pil_to_array(image: Image.Image, layout: str = "bgr") -> np.ndarray:
+    """Convert an already decoded PIL image (e.g. a rendered PDF page) to a uint8 array in one conversion"""
+    if layout == "gray":
+        return np.asarray(image if image.mode == "L" else image.convert("L"))
+    rgb = image if image.mode == "RGB" else image.convert("RGB")
+    return cv2.cvtColor(np.asarray(rgb), cv2.COLOR_RGB2BGR)
+
+
+def as_image_array(image: Union[Image.Image, np.ndarray], layout: str = "bgr") -> np.ndarray:
+    """Arrays from ingest_image pass through; PIL images are converted"""
+    if isinstance(image, np.ndarray):
+        return image
+    return pil_to_array(image, layout)
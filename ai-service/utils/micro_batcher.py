@@ -0,0 +1,127 @@
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from loguru import logger
+
+# Upper bounds (ms) of the queue-wait histogram buckets
+WAIT_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 250)
+
+
+class MicroBatcher:
+    """
+    Dynamic micro-batching for model inference.
+
+    Callers submit single items and await their own result. Items are
+    collected until max_batch_size is reached or the oldest item has waited
+    max_wait_ms, then run as one call to `run_batch`, which must return one
+    result per item in order. At most max_concurrent_batches run at once;
+    while they are all busy, pending items keep accumulating into a bigger
+    batch, so batch size grows with load and stays at ~1 when idle.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+        max_concurrent_batches: int = 1,
+    ):
+        self.name = name
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_seconds = max(0.0, max_wait_ms) / 1000
+        self.max_concurrent_batches = max(1, max_concurrent_batches)
+
+        self._pending: List[Tuple[Any, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._expired = False
+        self._in_flight = 0
+
+        self.batch_size_histogram: Dict[int, int] = {}
+        self.wait_histogram: Dict[str, int] = {f"le_{bucket}ms": 0 for bucket in WAIT_BUCKETS_MS}
+        self.wait_histogram["gt_250ms"] = 0
+        self.stats = {"items": 0, "batches": 0, "failed_batches": 0, "flush_full": 0, "flush_timeout": 0}
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, time.perf_counter()))
+        self.stats["items"] += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None and not self._expired:
+            self._timer = loop.call_later(self.max_wait_seconds, self._on_timeout)
+        return await future
+
+    def _on_timeout(self):
+        self._timer = None
+        self._expired = True
+        self._flush()
+
+    def _flush(self):
+        while self._in_flight < self.max_concurrent_batches:
+            # Callers that gave up (e.g. a cancelled engine race) don't take batch slots
+            self._pending = [entry for entry in self._pending if not entry[1].done()]
+            full = len(self._pending) >= self.max_batch_size
+            if not self._pending or not (full or self._expired):
+                break
+
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            self.stats["flush_full" if full else "flush_timeout"] += 1
+            self._in_flight += 1
+            asyncio.get_running_loop().create_task(self._run(batch))
+
+        if not self._pending:
+            self._expired = False
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        elif self._timer is None and not self._expired:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait_seconds, self._on_timeout)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future, float]]):
+        start = time.perf_counter()
+        self._record_batch(batch, start)
+        try:
+            results = await self.run_batch([item for item, _, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"{self.name}: batch returned {len(results)} results for {len(batch)} items")
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            self.stats["failed_batches"] += 1
+            logger.error(f"❌ {self.name} batch of {len(batch)} failed: {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._in_flight -= 1
+            self._flush()
+
+    def _record_batch(self, batch: List[Tuple[Any, asyncio.Future, float]], start: float):
+        self.stats["batches"] += 1
+        self.batch_size_histogram[len(batch)] = self.batch_size_histogram.get(len(batch), 0) + 1
+        for _, _, queued_at in batch:
+            wait_ms = (start - queued_at) * 1000
+            bucket = next((f"le_{b}ms" for b in WAIT_BUCKETS_MS if wait_ms <= b), "gt_250ms")
+            self.wait_histogram[bucket] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Batch-size and queue-wait histograms for tuning throughput against latency"""
+        batches = self.stats["batches"]
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_seconds * 1000,
+            "max_concurrent_batches": self.max_concurrent_batches,
+            "pending": len(self._pending),
+            "in_flight_batches": self._in_flight,
+            "avg_batch_size": round(sum(size * count for size, count in self.batch_size_histogram.items()) / batches, 2) if batches else 0.0,
+            "batch_size_histogram": dict(sorted(self.batch_size_histogram.items())),
+            "queue_wait_histogram": self.wait_histogram,
+            **self.stats,
+        }
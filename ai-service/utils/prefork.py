@@ -0,0 +1,235 @@
+import os
+import gc
+import sys
+import time
+import signal
+import socket
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+import uvicorn
+from loguru import logger
+
+
+def apply_thread_limits(threads: int):
+    """Cap native thread pools (Torch, OpenCV, BLAS) for this process"""
+    threads = max(1, threads)
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except Exception:
+        pass
+    try:
+        import cv2
+        cv2.setNumThreads(threads)
+    except Exception:
+        pass
+
+
+class PreforkServer:
+    """
+    Pre-fork process manager for production serving.
+
+    The master loads every model once, freezes the heap and then forks the
+    workers. Workers share the model pages copy-on-write with the master, so
+    memory grows far less than N times and a crashed worker is replaced by a
+    fork in milliseconds instead of re-running service initialization.
+
+    A worker that dies within min_uptime seconds of being forked is respawned
+    after an exponential backoff (backoff_base doubling up to backoff_max). If
+    one worker slot crashes that way max_fast_crashes times in a row, the
+    master stops every worker and exits with status 1 so the supervisor
+    (Docker, systemd) sees the failure instead of a silent fork loop.
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        host: str,
+        port: int,
+        workers: int,
+        worker_threads: int,
+        preload: Callable[[], Awaitable[None]],
+        log_level: str = "info",
+        graceful_timeout: int = 30,
+        min_uptime: float = 10.0,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        max_fast_crashes: int = 5,
+    ):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self.worker_threads = max(1, worker_threads)
+        self.preload = preload
+        self.log_level = log_level
+        self.graceful_timeout = graceful_timeout
+        self.min_uptime = min_uptime
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_fast_crashes = max(1, max_fast_crashes)
+
+        self.socket: Optional[socket.socket] = None
+        self.children: Dict[int, int] = {}  # pid -> worker index
+        self.spawned_at: Dict[int, float] = {}  # worker index -> fork time
+        self.fast_crashes: Dict[int, int] = {}  # worker index -> consecutive deaths right after start
+        self.respawn_at: Dict[int, float] = {}  # worker index -> when its backoff ends
+        self.shutting_down = False
+        self.exit_code = 0
+
+    def run(self):
+        """Preload models, fork the workers and supervise them"""
+        start_time = time.time()
+        apply_thread_limits(self.worker_threads)
+
+        logger.info(f"📦 Master {os.getpid()} preloading models...")
+        asyncio.run(self.preload())
+
+        # Keep preloaded objects out of future GC passes so the collector
+        # doesn't touch (and un-share) their pages in the workers
+        gc.collect()
+        gc.freeze()
+        logger.info(f"📦 Models preloaded in {time.time() - start_time:.2f}s")
+
+        self.socket = self._bind_socket()
+
+        signal.signal(signal.SIGTERM, self._handle_shutdown)
+        signal.signal(signal.SIGINT, self._handle_shutdown)
+
+        for index in range(self.workers):
+            self._spawn_worker(index)
+
+        logger.info(f"🚀 Serving on {self.host}:{self.port} with {self.workers} pre-forked workers")
+        self._supervise()
+        if self.exit_code:
+            sys.exit(self.exit_code)
+
+    def _bind_socket(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+
+    def _spawn_worker(self, index: int):
+        fork_time = time.time()
+        pid = os.fork()
+        if pid != 0:
+            self.children[pid] = index
+            self.spawned_at[index] = fork_time
+            return
+
+        # Worker process
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        apply_thread_limits(self.worker_threads)
+        os.environ["AI_SERVICE_WORKER_INDEX"] = str(index)
+        logger.info(f"👷 Worker {index} (pid {os.getpid()}) ready in {(time.time() - fork_time) * 1000:.1f}ms")
+
+        exit_code = 0
+        try:
+            config = uvicorn.Config(
+                self.app,
+                log_level=self.log_level,
+                access_log=True,
+                lifespan="on",
+            )
+            uvicorn.Server(config).run(sockets=[self.socket])
+        except Exception as e:
+            logger.error(f"❌ Worker {index} crashed: {e}")
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def _supervise(self):
+        while self.children or self.respawn_at:
+            self._respawn_due()
+            try:
+                if self.respawn_at:
+                    # A respawn is pending: poll so it isn't held up by a blocking wait
+                    pid, status = os.waitpid(-1, os.WNOHANG)
+                    if pid == 0:
+                        time.sleep(0.1)
+                        continue
+                else:
+                    pid, status = os.wait()
+            except ChildProcessError:
+                if self.respawn_at:
+                    time.sleep(0.1)
+                    continue
+                break
+            except InterruptedError:
+                continue
+
+            index = self.children.pop(pid, None)
+            if index is None:
+                continue
+
+            if self.shutting_down:
+                logger.info(f"👷 Worker {index} (pid {pid}) exited")
+            else:
+                self._schedule_respawn(index, pid, status)
+
+        signal.alarm(0)
+        if self.socket is not None:
+            self.socket.close()
+        logger.info("🛑 Pre-fork master stopped")
+
+    def _schedule_respawn(self, index: int, pid: int, status: int):
+        uptime = time.time() - self.spawned_at.get(index, 0.0)
+        if uptime >= self.min_uptime:
+            self.fast_crashes[index] = 0
+            logger.warning(f"⚠️ Worker {index} (pid {pid}) died with status {status} after {uptime:.1f}s, respawning")
+            self._spawn_worker(index)
+            return
+
+        crashes = self.fast_crashes.get(index, 0) + 1
+        self.fast_crashes[index] = crashes
+        if crashes >= self.max_fast_crashes:
+            logger.error(
+                f"❌ Worker {index} died {crashes} times in a row within {self.min_uptime:.0f}s of starting "
+                f"(last status {status}), stopping the server"
+            )
+            self.exit_code = 1
+            self._handle_shutdown(signal.SIGTERM, None)
+            return
+
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (crashes - 1))
+        logger.warning(
+            f"⚠️ Worker {index} (pid {pid}) died with status {status} after {uptime:.1f}s, "
+            f"respawning in {delay:.1f}s ({crashes}/{self.max_fast_crashes})"
+        )
+        self.respawn_at[index] = time.time() + delay
+
+    def _respawn_due(self):
+        now = time.time()
+        for index, when in list(self.respawn_at.items()):
+            if when <= now and not self.shutting_down:
+                self.respawn_at.pop(index, None)
+                self._spawn_worker(index)
+
+    def _handle_shutdown(self, signum, frame):
+        if self.shutting_down:
+            # Second signal: stop waiting for graceful shutdown
+            for pid in list(self.children):
+                self._signal_child(pid, signal.SIGKILL)
+            return
+
+        self.shutting_down = True
+        self.respawn_at.clear()
+        logger.info(f"🛑 Master received signal {signum}, stopping {len(self.children)} workers...")
+        for pid in list(self.children):
+            self._signal_child(pid, signal.SIGTERM)
+
+        # Escalate if workers ignore the graceful shutdown
+        signal.signal(signal.SIGALRM, lambda *_: self._handle_shutdown(signum, None))
+        signal.alarm(self.graceful_timeout)
+
+    def _signal_child(self, pid: int, sig: int):
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
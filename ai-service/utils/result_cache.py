@@ -0,0 +1,315 @@
+import os
+import time
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from loguru import logger
+
+from utils.uploads import DocumentContent, UploadBuffer, as_memoryview
+from utils.worker_pool import get_worker_pools
+
+# Default sizes (overridden by AI_SERVICE_CONFIG["result_cache"] in main.py)
+DEFAULT_MEMORY_MAX_MB = 64
+DEFAULT_DISK_MAX_MB = 1024
+DEFAULT_DISK_DIR = "temp/cache"
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Workers share the disk store, so each one re-reads its real size this often (seconds)
+DISK_RESYNC_INTERVAL = 300
+
+
+def content_digest(content: DocumentContent) -> str:
+    """SHA-256 of document content, hashed in place (memoryview or chunked file reads)"""
+    if isinstance(content, (bytes, bytearray, memoryview, UploadBuffer)):
+        return hashlib.sha256(as_memoryview(content)).hexdigest()
+
+    digest = hashlib.sha256()
+    content.seek(0)
+    for chunk in iter(lambda: content.read(HASH_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier content-addressed cache for analysis results.
+
+    Keys combine the SHA-256 of the uploaded bytes with the analysis parameters
+    and the engine version tag of the service that produced the result, so a
+    model or pipeline change never serves stale results. Values are pickled
+    once and stored as bytes in an in-memory LRU (per worker) and in a shared
+    on-disk store; both tiers are bounded in bytes and evict least recently
+    used entries.
+
+    get() and set() block on pickling and disk I/O; request handlers use
+    get_async() and set_async(), which run them on the shared thread pool.
+    The disk tier keeps a running size counter and an LRU index of its files,
+    so writes and evictions never walk the store. Other workers write to the
+    same directory, so the index is rebuilt from a scan every
+    DISK_RESYNC_INTERVAL seconds (on the thread pool, during a write).
+    """
+
+    def __init__(
+        self,
+        memory_max_bytes: int = DEFAULT_MEMORY_MAX_MB * 1024 * 1024,
+        disk_max_bytes: int = DEFAULT_DISK_MAX_MB * 1024 * 1024,
+        disk_dir: Optional[str] = DEFAULT_DISK_DIR,
+        enabled: bool = True,
+    ):
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.disk_dir = disk_dir
+        self.enabled = enabled
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._disk_index: "OrderedDict[str, int]" = OrderedDict()  # path -> size, least recently used first
+        self._disk_bytes = 0
+        self._disk_synced_at = 0.0
+
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "errors": 0,
+        }
+
+        if self.enabled and self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._resync_disk()
+
+    @staticmethod
+    def make_key(namespace: str, digest: str, version: str, *params: Any) -> str:
+        """Cache key for a result of `namespace` over content `digest`"""
+        raw = "|".join([namespace, version, digest, *(str(param) for param in params)])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Look a result up in memory, then on disk (promoting disk hits to memory)"""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+
+        if data is None:
+            data = self._disk_get(key)
+            if data is None:
+                with self._lock:
+                    self.stats["misses"] += 1
+                return None
+            with self._lock:
+                self.stats["disk_hits"] += 1
+            self._memory_put(key, data)
+
+        try:
+            return pickle.loads(data)
+        except Exception as e:
+            logger.warning(f"⚠️ Dropping unreadable cache entry {key[:12]}: {e}")
+            self.stats["errors"] += 1
+            return None
+
+    def set(self, key: str, value: Any):
+        """Store a result in both tiers"""
+        if not self.enabled:
+            return
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.warning(f"⚠️ Result not cacheable: {e}")
+            self.stats["errors"] += 1
+            return
+
+        self._memory_put(key, data)
+        self._disk_put(key, data)
+        with self._lock:
+            self.stats["writes"] += 1
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        """get() on the thread pool, keeping unpickling and disk reads off the event loop"""
+        if not self.enabled:
+            return None
+        return await get_worker_pools().run_in_thread(self.get, key)
+
+    async def set_async(self, key: str, value: Any):
+        """set() on the thread pool, keeping pickling, disk writes and eviction off the event loop"""
+        if not self.enabled:
+            return
+        await get_worker_pools().run_in_thread(self.set, key, value)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters for the health endpoint"""
+        with self._lock:
+            lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            return {
+                "enabled": self.enabled,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "memory_max_bytes": self.memory_max_bytes,
+                "disk_bytes": self._disk_bytes,
+                "disk_max_bytes": self.disk_max_bytes,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                **self.stats,
+            }
+
+    def _memory_put(self, key: str, data: bytes):
+        if len(data) > self.memory_max_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+            self._memory[key] = data
+            self._memory_bytes += len(data)
+            while self._memory_bytes > self.memory_max_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+                self.stats["memory_evictions"] += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.pkl")
+
+    def _disk_get(self, key: str) -> Optional[bytes]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # Mark as recently used for other workers' scans
+        except FileNotFoundError:
+            with self._lock:
+                self._disk_forget(path)
+            return None
+        except OSError as e:
+            logger.warning(f"⚠️ Cache read failed for {key[:12]}: {e}")
+            self.stats["errors"] += 1
+            return None
+
+        with self._lock:
+            if path in self._disk_index:
+                self._disk_index.move_to_end(path)
+            else:
+                self._disk_index[path] = len(data)
+                self._disk_bytes += len(data)
+        return data
+
+    def _disk_put(self, key: str, data: bytes):
+        if not self.disk_dir or len(data) > self.disk_max_bytes:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"⚠️ Cache write failed for {key[:12]}: {e}")
+            self.stats["errors"] += 1
+            return
+
+        with self._lock:
+            self._disk_forget(path)
+            self._disk_index[path] = len(data)
+            self._disk_bytes += len(data)
+            over_limit = self._disk_bytes > self.disk_max_bytes
+
+        if time.time() - self._disk_synced_at > DISK_RESYNC_INTERVAL:
+            self._resync_disk()
+            with self._lock:
+                over_limit = self._disk_bytes > self.disk_max_bytes
+        if over_limit:
+            self._evict_disk()
+
+    def _disk_forget(self, path: str):
+        """Drop a file from the index (caller holds the lock)"""
+        size = self._disk_index.pop(path, None)
+        if size is not None:
+            self._disk_bytes -= size
+
+    def _scan_disk_entries(self):
+        entries = []
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                if not name.endswith(".pkl"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _resync_disk(self):
+        """Rebuild the index and size counter from the files actually on disk (written by any worker)"""
+        entries = sorted(self._scan_disk_entries())
+        with self._lock:
+            self._disk_index = OrderedDict((path, size) for _, size, path in entries)
+            self._disk_bytes = sum(self._disk_index.values())
+            self._disk_synced_at = time.time()
+
+    def _evict_disk(self):
+        """Remove least recently used files until the store is under 90% of its cap"""
+        start_time = time.time()
+        target = int(self.disk_max_bytes * 0.9)
+        evicted = 0
+
+        while True:
+            with self._lock:
+                if self._disk_bytes <= target or not self._disk_index:
+                    break
+                path, _ = next(iter(self._disk_index.items()))
+                self._disk_forget(path)
+            try:
+                os.remove(path)
+                evicted += 1
+            except FileNotFoundError:
+                pass  # Already evicted by another worker
+            except OSError as e:
+                logger.warning(f"⚠️ Cache eviction failed for {os.path.basename(path)[:12]}: {e}")
+
+        with self._lock:
+            self.stats["disk_evictions"] += evicted
+        logger.info(f"🧹 Evicted {evicted} cached results from disk in {time.time() - start_time:.3f}s")
+
+
+# Process-wide cache (configured at startup)
+_result_cache: Optional[ResultCache] = None
+
+
+def init_result_cache(config: Dict[str, Any]) -> ResultCache:
+    """Configure the shared result cache from AI_SERVICE_CONFIG["result_cache"]"""
+    global _result_cache
+    _result_cache = ResultCache(
+        memory_max_bytes=int(config.get("memory_max_mb", DEFAULT_MEMORY_MAX_MB) * 1024 * 1024),
+        disk_max_bytes=int(config.get("disk_max_mb", DEFAULT_DISK_MAX_MB) * 1024 * 1024),
+        disk_dir=config.get("disk_dir", DEFAULT_DISK_DIR),
+        enabled=config.get("enabled", True),
+    )
+    logger.info(
+        f"🗄️ Result cache: {config.get('memory_max_mb', DEFAULT_MEMORY_MAX_MB)}MB memory, "
+        f"{config.get('disk_max_mb', DEFAULT_DISK_MAX_MB)}MB disk at {_result_cache.disk_dir}"
+    )
+    return _result_cache
+
+
+def get_result_cache() -> ResultCache:
+    """Get the shared result cache, creating a memory-only default if not configured"""
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache(disk_dir=None)
+    return _result_cache
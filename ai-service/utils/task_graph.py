@@ -0,0 +1,70 @@
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Tuple
+
+# Node name -> (names of the nodes it depends on, zero-argument function)
+TaskGraph = Dict[str, Tuple[Iterable[str], Callable[[], Any]]]
+
+
+def topological_order(nodes: TaskGraph) -> List[str]:
+    """Node names ordered so every node comes after its dependencies (insertion order otherwise)"""
+    order: List[str] = []
+    state: Dict[str, str] = {}
+
+    def visit(name: str, path: Tuple[str, ...]):
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(f"Dependency cycle: {' -> '.join(path + (name,))}")
+        if name not in nodes:
+            raise ValueError(f"Unknown dependency {name} (required by {path[-1] if path else '?'})")
+        state[name] = "visiting"
+        for dependency in nodes[name][0]:
+            visit(dependency, path + (name,))
+        state[name] = "done"
+        order.append(name)
+
+    for name in nodes:
+        visit(name, ())
+    return order
+
+
+async def run_graph(
+    nodes: TaskGraph,
+    run: Callable[[Callable[[], Any]], Awaitable[Any]],
+    max_parallel: int = 4,
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    Run a dependency graph of blocking functions, each through `run` (e.g. the thread pool).
+
+    A node starts as soon as all of its dependencies have finished, with at most
+    max_parallel nodes running at once. Returns (results, seconds per node); both
+    are keyed by node name, so callers that combine results by name get the same
+    answer whatever order the nodes complete in. The first failure cancels the
+    remaining nodes and is raised.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_parallel))
+    results: Dict[str, Any] = {}
+    timings: Dict[str, float] = {}
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def run_node(name: str):
+        dependencies, func = nodes[name]
+        for dependency in dependencies:
+            await tasks[dependency]
+        async with semaphore:
+            start_time = time.perf_counter()
+            results[name] = await run(func)
+            timings[name] = time.perf_counter() - start_time
+
+    # Tasks are created in dependency order, so every dependency's task already exists
+    for name in topological_order(nodes):
+        tasks[name] = asyncio.create_task(run_node(name))
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+    return results, timings
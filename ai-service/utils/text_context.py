@@ -0,0 +1,183 @@
+import re
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from utils.text_patterns import PatternSet, TextScan
+
+# Monetary amounts as fraud detection and validation both read them ("$1,234.56")
+AMOUNT_PATTERN = re.compile(r'\$?\s*\d{1,3}(?:,\d{3})*(?:\.\d{2})?')
+NON_AMOUNT_CHARS = re.compile(r'[^\d.]')
+
+# Dates in the three layouts OCR text uses
+SLASH_DATE_PATTERN = re.compile(r'\d{1,2}/\d{1,2}/\d{4}')
+DASH_DATE_PATTERN = re.compile(r'\d{1,2}-\d{1,2}-\d{4}')
+ISO_DATE_PATTERN = re.compile(r'\d{4}-\d{1,2}-\d{1,2}')
+
+# Characters fraud detection counts as punctuation
+PUNCTUATION_CHARS = '!@#$%^&*()'
+
+# ASCII bytes of each character class (same classes as str.isupper/isalnum/isspace)
+_ASCII_UPPER = bytes(c for c in range(128) if chr(c).isupper())
+_ASCII_ALNUM = bytes(c for c in range(128) if chr(c).isalnum())
+_ASCII_SPACE = bytes(c for c in range(128) if chr(c).isspace())
+_ASCII_PUNCTUATION = PUNCTUATION_CHARS.encode()
+
+
+def _count_bytes(data: bytes, chars: bytes) -> int:
+    """Occurrences of any of chars in data (deleting them is a single C pass)"""
+    return len(data) - len(data.translate(None, chars))
+
+
+def count_char_classes(text: str) -> Dict[str, int]:
+    """Uppercase, alphanumeric, whitespace, punctuation and other (special) characters in text"""
+    if text.isascii():
+        data = text.encode("ascii")
+        counts = {
+            "upper": _count_bytes(data, _ASCII_UPPER),
+            "alnum": _count_bytes(data, _ASCII_ALNUM),
+            "space": _count_bytes(data, _ASCII_SPACE),
+            "punctuation": _count_bytes(data, _ASCII_PUNCTUATION),
+        }
+    else:
+        counts = {
+            "upper": sum(map(str.isupper, text)),
+            "alnum": sum(map(str.isalnum, text)),
+            "space": sum(map(str.isspace, text)),
+            "punctuation": sum(text.count(c) for c in PUNCTUATION_CHARS),
+        }
+    # No character is both alphanumeric and whitespace
+    counts["special"] = len(text) - counts["alnum"] - counts["space"]
+    return counts
+
+
+def parse_amounts(matches: List[str]) -> List[float]:
+    """Amount matches with a decimal part, as floats (whole numbers are not amounts)"""
+    amounts = []
+    for match in matches:
+        if '.' not in match:
+            continue  # Whole numbers need no cleaning
+        try:
+            clean_amount = NON_AMOUNT_CHARS.sub('', match)
+            if clean_amount and '.' in clean_amount:
+                amounts.append(float(clean_amount))
+        except ValueError:
+            continue
+    return amounts
+
+
+class TextAnalysisContext:
+    """
+    Tokens and statistics of one document's text, computed on first use and shared by
+    fraud detection and document validation.
+
+    Every statistic (lowercase text, tokens, character-class counts, line indentation,
+    parsed amounts and dates) is computed at most once per text, however many checks
+    and services read it, and the keyword/regex scans of each PatternSet run once
+    too (see scan()). Nothing is computed until asked for, so building a context for
+    a text whose validation result turns out to be cached costs nothing. Safe to share
+    between threads.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self._values: Dict[str, Any] = {}
+        self._scans: Dict[int, TextScan] = {}
+        self._lock = threading.RLock()
+
+    def _get(self, name: str, build) -> Any:
+        if name not in self._values:
+            with self._lock:
+                if name not in self._values:
+                    self._values[name] = build()
+        return self._values[name]
+
+    @property
+    def text_lower(self) -> str:
+        return self._get("text_lower", self.text.lower)
+
+    @property
+    def digest(self) -> str:
+        """SHA-256 of the text (cache keys)"""
+        return self._get("digest", lambda: hashlib.sha256(self.text.encode()).hexdigest())
+
+    @property
+    def tokens(self) -> List[str]:
+        """Lowercased whitespace-separated words (the same words as text.split())"""
+        return self._get("tokens", self.text_lower.split)
+
+    @property
+    def word_count(self) -> int:
+        return len(self.tokens)
+
+    @property
+    def unique_word_count(self) -> int:
+        return self._get("unique_word_count", lambda: len(set(self.tokens)))
+
+    @property
+    def sentence_count(self) -> int:
+        """Pieces between full stops (len(text.split('.')))"""
+        return self.text.count('.') + 1
+
+    @property
+    def char_counts(self) -> Dict[str, int]:
+        """Character-class counts: upper, alnum, space, punctuation ('!@#$%^&*()') and special"""
+        return self._get("char_counts", lambda: count_char_classes(self.text))
+
+    @property
+    def line_indents(self) -> List[int]:
+        """Leading whitespace of every non-blank line"""
+        return self._get("line_indents", lambda: [
+            len(line) - len(line.lstrip()) for line in self.text.split('\n') if line.strip()
+        ])
+
+    @property
+    def amounts(self) -> List[float]:
+        """Monetary amounts with cents, in text order"""
+        return self._get("amounts", lambda: parse_amounts(AMOUNT_PATTERN.findall(self.text)))
+
+    @property
+    def slash_dates(self) -> List[str]:
+        """MM/DD/YYYY dates in text order, repeats included"""
+        return self._get("slash_dates", lambda: SLASH_DATE_PATTERN.findall(self.text) if '/' in self.text else [])
+
+    @property
+    def dates(self) -> List[str]:
+        """Distinct dates in any of the slash, dash and ISO layouts"""
+        def build():
+            dates = list(self.slash_dates)
+            if '-' in self.text:
+                dates.extend(DASH_DATE_PATTERN.findall(self.text))
+                dates.extend(ISO_DATE_PATTERN.findall(self.text))
+            return list(set(dates))
+        return self._get("dates", build)
+
+    @property
+    def parsed_slash_dates(self) -> Optional[List[datetime]]:
+        """The slash dates as datetimes, or None when any of them is not a valid date"""
+        def build():
+            parsed = []
+            for date_str in dict.fromkeys(self.slash_dates):
+                month, day, year = (int(part) for part in date_str.split('/'))
+                try:
+                    parsed.append(datetime(year, month, day))
+                except ValueError:
+                    return None
+            return parsed
+        return self._get("parsed_slash_dates", build)
+
+    @property
+    def slash_date_range(self) -> Optional[timedelta]:
+        """Time between the earliest and latest slash date (None without valid dates)"""
+        parsed = self.parsed_slash_dates
+        return max(parsed) - min(parsed) if parsed else None
+
+    def scan(self, pattern_set: PatternSet) -> TextScan:
+        """Keyword and regex hits against a PatternSet, scanned once per pattern set"""
+        key = id(pattern_set)
+        if key not in self._scans:
+            with self._lock:
+                if key not in self._scans:
+                    self._scans[key] = pattern_set.scan(self.text, self.text_lower)
+        return self._scans[key]
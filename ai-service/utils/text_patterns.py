@@ -0,0 +1,138 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import ahocorasick  # pyahocorasick: C Aho-Corasick automaton (optional, falls back to substring search)
+except ImportError:
+    ahocorasick = None
+
+
+class KeywordMatcher:
+    """
+    Finds which of a fixed set of keywords occur in a text (substring semantics, like `kw in text`).
+
+    With pyahocorasick installed, every keyword is found in one pass over the text by an
+    Aho-Corasick automaton built once. Without it, each keyword is looked up with str's
+    C substring search, which beats any pure-Python automaton.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: Tuple[str, ...] = tuple(dict.fromkeys(keywords))
+        self._automaton = None
+        if ahocorasick is not None and self.keywords:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+
+    @property
+    def backend(self) -> str:
+        return "aho-corasick" if self._automaton is not None else "substring"
+
+    def find(self, text: str) -> Set[str]:
+        """Keywords that occur in text (pass text already lowercased for case-insensitive keywords)"""
+        if self._automaton is None:
+            return {keyword for keyword in self.keywords if keyword in text}
+        found: Set[str] = set()
+        for _, keyword in self._automaton.iter(text):
+            found.add(keyword)
+            if len(found) == len(self.keywords):
+                break
+        return found
+
+
+@dataclass(frozen=True)
+class TextPattern:
+    """
+    A named regex with the literals it cannot match without.
+
+    `anchors` are lowercase strings at least one of which occurs in every match (e.g.
+    "provider:" for r'(?:Provider|Doctor):...'); when none occurs in the lowercased text
+    the regex is not run at all. A pattern with no anchors always runs. Case-insensitive
+    patterns are only skipped on ASCII text, because re.IGNORECASE also matches
+    characters whose str.lower() differs (e.g. 'ſ' matches 's').
+    """
+    name: str
+    regex: str
+    flags: int = 0
+    anchors: Tuple[str, ...] = ()
+
+
+class PatternSet:
+    """
+    Keyword lists and regexes compiled once (at service start) and scanned together.
+
+    scan() makes a single keyword pass over the lowercased text that covers both the
+    keyword lists and every regex's anchors. Regexes are then run lazily, and only
+    those whose anchors were found, so the common case (no placeholder text, no
+    "Provider:" label, no '@') costs no regex pass at all. Results are the same as
+    running each `kw in text_lower` and re.search/re.findall separately.
+    """
+
+    def __init__(self, keywords: Optional[Dict[str, Iterable[str]]] = None, patterns: Iterable[TextPattern] = ()):
+        self.keyword_lists: Dict[str, Tuple[str, ...]] = {
+            name: tuple(word.lower() for word in words) for name, words in (keywords or {}).items()
+        }
+        self.patterns: Dict[str, TextPattern] = {}
+        self.compiled: Dict[str, "re.Pattern"] = {}
+        for pattern in patterns:
+            self.patterns[pattern.name] = pattern
+            self.compiled[pattern.name] = re.compile(pattern.regex, pattern.flags)
+
+        vocabulary: List[str] = []
+        for words in self.keyword_lists.values():
+            vocabulary.extend(words)
+        for pattern in self.patterns.values():
+            vocabulary.extend(pattern.anchors)
+        self.vocabulary: Set[str] = set(vocabulary)
+        self.matcher = KeywordMatcher(vocabulary)
+
+    def scan(self, text: str, text_lower: Optional[str] = None) -> "TextScan":
+        """Find every keyword and anchor in one pass; regex results are computed on demand"""
+        if text_lower is None:
+            text_lower = text.lower()
+        return TextScan(self, text, self.matcher.find(text_lower), text_lower.isascii())
+
+
+class TextScan:
+    """Keyword and pattern hits of one text against a PatternSet"""
+
+    def __init__(self, pattern_set: PatternSet, text: str, present: Set[str], ascii_text: bool = True):
+        self.pattern_set = pattern_set
+        self.text = text
+        self.present = present
+        self.ascii_text = ascii_text
+        self._searches: Dict[str, Any] = {}
+        self._findalls: Dict[str, List[Any]] = {}
+
+    def keywords(self, name: str) -> List[str]:
+        """Keywords of a registered list that occur in the text, in list order"""
+        return [word for word in self.pattern_set.keyword_lists[name] if word in self.present]
+
+    def has(self, word: str) -> bool:
+        """Whether a registered keyword occurs in the text"""
+        if word not in self.pattern_set.vocabulary:
+            raise KeyError(f"{word!r} is not a registered keyword")
+        return word in self.present
+
+    def any(self, words: Iterable[str]) -> bool:
+        return any(self.has(word) for word in words)
+
+    def _may_match(self, name: str) -> bool:
+        pattern = self.pattern_set.patterns[name]
+        if not pattern.anchors or (pattern.flags & re.IGNORECASE and not self.ascii_text):
+            return True
+        return any(anchor in self.present for anchor in pattern.anchors)
+
+    def search(self, name: str) -> Optional["re.Match"]:
+        """re.search of a registered pattern (None without running it when no anchor is present)"""
+        if name not in self._searches:
+            self._searches[name] = self.pattern_set.compiled[name].search(self.text) if self._may_match(name) else None
+        return self._searches[name]
+
+    def findall(self, name: str) -> List[Any]:
+        """re.findall of a registered pattern ([] without running it when no anchor is present)"""
+        if name not in self._findalls:
+            self._findalls[name] = self.pattern_set.compiled[name].findall(self.text) if self._may_match(name) else []
+        return self._findalls[name]
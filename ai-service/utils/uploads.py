@@ -0,0 +1,244 @@
+import io
+import os
+import mmap
+import json
+import time
+import tempfile
+from typing import Any, BinaryIO, Dict, Optional, Union
+from fastapi import HTTPException, UploadFile
+from loguru import logger
+
+# Bytes read per chunk when copying an upload
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Bodies above this size are kept on disk when detached from the request
+SPOOL_MAX_MEMORY_BYTES = 1024 * 1024
+
+# Multipart boundaries, headers and form fields on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+DocumentContent = Union[bytes, bytearray, memoryview, BinaryIO, "UploadBuffer"]
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured size limit"""
+
+
+class UploadBuffer:
+    """
+    Read-only view of an uploaded file that never copies the body into a bytes object.
+
+    Starlette spools each multipart file to a SpooledTemporaryFile (in memory up to
+    1MB, on disk beyond that). The buffer exposes that storage as a memoryview:
+    the in-memory buffer directly, or an mmap of the temp file. Call close() (or use
+    it as a context manager) before the request ends so the spool can be released.
+    """
+
+    def __init__(self, fileobj: BinaryIO, size: int, filename: str = "", owns_file: bool = False):
+        self.file = fileobj
+        self.size = size
+        self.filename = filename
+        self.owns_file = owns_file
+        self._view: Optional[memoryview] = None
+        self._mmap: Optional[mmap.mmap] = None
+
+    @classmethod
+    def from_upload(cls, upload: UploadFile, max_bytes: int) -> "UploadBuffer":
+        """Wrap an UploadFile, raising UploadTooLargeError without reading an oversize body"""
+        fileobj = upload.file
+        fileobj.seek(0, os.SEEK_END)
+        size = fileobj.tell()
+        fileobj.seek(0)
+        if size > max_bytes:
+            raise UploadTooLargeError(
+                f"File too large: {size / (1024 * 1024):.1f}MB (maximum: {max_bytes / (1024 * 1024):.0f}MB)"
+            )
+        return cls(fileobj, size, upload.filename or "")
+
+    @property
+    def view(self) -> memoryview:
+        """Zero-copy memoryview of the whole body"""
+        if self._view is None:
+            raw = getattr(self.file, "_file", self.file)  # SpooledTemporaryFile keeps its buffer in _file
+            if self.size == 0:
+                self._view = memoryview(b"")
+            elif isinstance(raw, io.BytesIO):
+                self._view = raw.getbuffer()[:self.size]
+            else:
+                self._mmap = mmap.mmap(raw.fileno(), 0, access=mmap.ACCESS_READ)
+                self._view = memoryview(self._mmap)[:self.size]
+        return self._view
+
+    def __len__(self) -> int:
+        return self.size
+
+    def detach(self) -> "UploadBuffer":
+        """Copy the body into storage owned by this buffer so it outlives the request"""
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY_BYTES)
+        self.file.seek(0)
+        while True:
+            chunk = self.file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            spool.write(chunk)
+        spool.seek(0)
+        return UploadBuffer(spool, self.size, self.filename, owns_file=True)
+
+    def close(self):
+        """Release the memoryview / mmap (and the storage, if this buffer owns it)"""
+        try:
+            if self._view is not None:
+                self._view.release()
+            if self._mmap is not None:
+                self._mmap.close()
+        except BufferError:
+            # A worker thread still holds a slice (e.g. after a timeout); GC releases it
+            logger.debug(f"Upload buffer {self.filename} still exported, deferring release")
+        self._view = None
+        self._mmap = None
+        if self.owns_file:
+            self.file.close()
+
+    def __enter__(self) -> "UploadBuffer":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class MemoryviewReader(io.RawIOBase):
+    """Seekable file object over a memoryview (io.BytesIO would copy it)"""
+
+    def __init__(self, view: memoryview):
+        self._view = view.cast("B") if view.format != "B" else view
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), len(self._view) - self._pos)
+        if size <= 0:
+            return 0
+        buffer[:size] = self._view[self._pos:self._pos + size]
+        self._pos += size
+        return size
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_SET:
+            self._pos = offset
+        elif whence == os.SEEK_CUR:
+            self._pos += offset
+        elif whence == os.SEEK_END:
+            self._pos = len(self._view) + offset
+        self._pos = max(0, self._pos)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+
+def as_memoryview(content: DocumentContent) -> memoryview:
+    """Get a memoryview over document content without copying where possible"""
+    if isinstance(content, UploadBuffer):
+        return content.view
+    if isinstance(content, memoryview):
+        return content
+    if isinstance(content, (bytes, bytearray)):
+        return memoryview(content)
+    # Plain file object: read it once
+    content.seek(0)
+    return memoryview(content.read())
+
+
+def open_stream(content: DocumentContent) -> BinaryIO:
+    """Get a seekable file object over document content (for PIL and friends)"""
+    if isinstance(content, bytes):
+        return io.BytesIO(content)  # BytesIO shares an immutable bytes object
+    if isinstance(content, (UploadBuffer, memoryview, bytearray)):
+        return MemoryviewReader(as_memoryview(content))
+    content.seek(0)
+    return content
+
+
+class UploadLimitMiddleware:
+    """
+    ASGI middleware that rejects oversize request bodies while they stream in.
+
+    Requests that declare a Content-Length above the limit get a 413 before any
+    body is read. Chunked requests are counted as they arrive and aborted with
+    413 as soon as they cross the limit, so the multipart parser never spools
+    the rest of the upload.
+    """
+
+    def __init__(self, app, max_body_bytes: int, path_limits: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.path_limits = path_limits or {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT", "PATCH"):
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.path_limits.get(scope["path"], self.max_body_bytes)
+
+        content_length = self._content_length(scope)
+        if content_length is not None and content_length > limit:
+            logger.warning(f"⚠️ Rejected {scope['path']}: body of {content_length} bytes exceeds {limit}")
+            await self._reject(send, limit)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    logger.warning(f"⚠️ Aborted {scope['path']}: body exceeded {limit} bytes while streaming")
+                    raise HTTPException(status_code=413, detail=self._detail(limit))
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    @staticmethod
+    def _content_length(scope) -> Optional[int]:
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    return int(value)
+                except ValueError:
+                    return None
+        return None
+
+    @staticmethod
+    def _detail(limit: int) -> str:
+        return f"Request body too large (maximum: {limit / (1024 * 1024):.0f}MB)"
+
+    async def _reject(self, send, limit: int):
+        body = json.dumps({"error": self._detail(limit), "timestamp": time.time()}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def upload_limits(config: Dict[str, Any]) -> Dict[str, int]:
+    """Per-file and per-request byte limits derived from AI_SERVICE_CONFIG"""
+    max_file_bytes = config["max_file_size_mb"] * 1024 * 1024
+    return {
+        "max_file_bytes": max_file_bytes,
+        "max_body_bytes": max_file_bytes + MULTIPART_OVERHEAD_BYTES,
+        "max_batch_body_bytes": max_file_bytes * config.get("max_batch_files", 1) + MULTIPART_OVERHEAD_BYTES,
+    }
@@ -0,0 +1,230 @@
+import os
+import sys
+import asyncio
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Callable, Optional, Tuple
+from loguru import logger
+
+# Default pool sizes (overridden by AI_SERVICE_CONFIG in main.py)
+DEFAULT_THREAD_WORKERS = min(8, (os.cpu_count() or 1) + 2)
+DEFAULT_PROCESS_WORKERS = max(1, (os.cpu_count() or 1) // 2)
+
+
+class _PoolStats:
+    """Counters for a single executor"""
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.peak_in_flight = 0
+        self.total_wait_time = 0.0
+        self._lock = threading.Lock()
+
+    def started(self):
+        with self._lock:
+            self.submitted += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def finished(self, duration: float, failed: bool = False):
+        with self._lock:
+            self.in_flight -= 1
+            self.total_wait_time += duration
+            if failed:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                "max_workers": self.max_workers,
+                "in_flight": self.in_flight,
+                "queued": max(0, self.in_flight - self.max_workers),
+                "utilization": round(min(1.0, self.in_flight / max(self.max_workers, 1)), 3),
+                "saturated": self.in_flight >= self.max_workers,
+                "peak_in_flight": self.peak_in_flight,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "avg_task_seconds": round(self.total_wait_time / finished, 4) if finished else 0.0,
+            }
+
+
+class WorkerPoolManager:
+    """
+    Execution layer for CPU-bound work.
+
+    OpenCV/NumPy kernels release the GIL, so they run on a thread pool.
+    Tesseract and EasyOCR run on a process pool so a long OCR job never
+    stalls the event loop or competes with request handling for the GIL.
+
+    Forking a process that has other threads running can deadlock the child
+    on a lock one of those threads held, so the OCR processes are forked by
+    start_process_pool() while the process is still single-threaded. A pool
+    created later (after a crash) comes from a forkserver that preloads
+    process_preload instead.
+    """
+
+    def __init__(
+        self,
+        thread_workers: int = DEFAULT_THREAD_WORKERS,
+        process_workers: int = DEFAULT_PROCESS_WORKERS,
+        process_initializer: Optional[Callable] = None,
+        process_initargs: tuple = (),
+        process_preload: Tuple[str, ...] = (),
+    ):
+        self.thread_workers = max(1, thread_workers)
+        self.process_workers = max(1, process_workers)
+        self.process_initializer = process_initializer
+        self.process_initargs = process_initargs
+        self.process_preload = process_preload
+
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+        self.thread_stats = _PoolStats("thread", self.thread_workers)
+        self.process_stats = _PoolStats("process", self.process_workers)
+
+    @property
+    def thread_pool(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(
+                    max_workers=self.thread_workers,
+                    thread_name_prefix="cpu-worker"
+                )
+            return self._thread_pool
+
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._process_pool is None:
+                context = self._process_context()
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.process_workers,
+                    mp_context=context,
+                    initializer=self.process_initializer,
+                    initargs=self.process_initargs
+                )
+                start_method = context.get_start_method() if context is not None else "spawn"
+                logger.info(f"⚙️ OCR process pool started with {self.process_workers} workers ({start_method})")
+            return self._process_pool
+
+    def _process_context(self):
+        if sys.platform == "win32":
+            return None
+        if threading.active_count() == 1:
+            # fork lets OCR workers inherit models already loaded in this process
+            return multiprocessing.get_context("fork")
+        # Other threads are running: fork from a single-threaded server process instead
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(list(self.process_preload))
+        return context
+
+    def start_process_pool(self):
+        """Fork the OCR processes now (call before any other thread starts)"""
+        # With fork, the executor launches all of its processes on the first submit,
+        # before it starts its own management thread
+        self.process_pool.submit(os.getpid).result()
+
+    async def run_in_thread(self, func: Callable, *args) -> Any:
+        """Run a GIL-releasing function (OpenCV, NumPy) on the thread pool"""
+        loop = asyncio.get_running_loop()
+        return await self._dispatch(self.thread_stats, loop.run_in_executor(self.thread_pool, func, *args))
+
+    async def run_in_process(self, func: Callable, *args) -> Any:
+        """Run a picklable function (Tesseract, EasyOCR) on the process pool"""
+        loop = asyncio.get_running_loop()
+        try:
+            return await self._dispatch(self.process_stats, loop.run_in_executor(self.process_pool, func, *args))
+        except BrokenProcessPool:
+            logger.error("❌ OCR process pool crashed, restarting it")
+            self._reset_process_pool()
+            raise
+
+    async def _dispatch(self, stats: _PoolStats, future: asyncio.Future) -> Any:
+        stats.started()
+        start_time = time.time()
+        failed = False
+        try:
+            return await future
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            stats.finished(time.time() - start_time, failed)
+
+    def _reset_process_pool(self):
+        with self._pool_lock:
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=False, cancel_futures=True)
+                self._process_pool = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool saturation for the health endpoint"""
+        return {
+            "thread_pool": self.thread_stats.snapshot(),
+            "process_pool": self.process_stats.snapshot(),
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Stop both executors"""
+        with self._pool_lock:
+            if self._thread_pool is not None:
+                self._thread_pool.shutdown(wait=wait, cancel_futures=True)
+                self._thread_pool = None
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=wait, cancel_futures=True)
+                self._process_pool = None
+
+
+# Process-wide pools (configured at startup; the thread pool is created on first use)
+_worker_pools: Optional[WorkerPoolManager] = None
+
+
+def init_worker_pools(config: Dict[str, Any], process_initializer: Optional[Callable] = None,
+                      process_initargs: tuple = (), process_preload: Tuple[str, ...] = ()) -> WorkerPoolManager:
+    """Configure the shared worker pools from AI_SERVICE_CONFIG"""
+    global _worker_pools
+    if _worker_pools is not None:
+        _worker_pools.shutdown(wait=False)
+
+    _worker_pools = WorkerPoolManager(
+        thread_workers=config.get("thread_pool_workers", DEFAULT_THREAD_WORKERS),
+        process_workers=config.get("process_pool_workers", DEFAULT_PROCESS_WORKERS),
+        process_initializer=process_initializer,
+        process_initargs=process_initargs,
+        process_preload=process_preload
+    )
+    logger.info(
+        f"⚙️ Worker pools configured: {_worker_pools.thread_workers} threads, "
+        f"{_worker_pools.process_workers} OCR processes"
+    )
+    return _worker_pools
+
+
+def get_worker_pools() -> WorkerPoolManager:
+    """Get the shared worker pools, creating defaults if not configured"""
+    global _worker_pools
+    if _worker_pools is None:
+        _worker_pools = WorkerPoolManager()
+    return _worker_pools
+
+
+def shutdown_worker_pools():
+    """Shut down the shared worker pools"""
+    global _worker_pools
+    if _worker_pools is not None:
+        _worker_pools.shutdown(wait=False)
+        _worker_pools = None